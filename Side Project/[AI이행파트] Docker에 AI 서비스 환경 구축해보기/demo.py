@@ -7,20 +7,17 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 import uvicorn
+import os
+import sys
 import time
-import re
 from datetime import datetime
 
-# 간단한 감정분석 규칙
-POSITIVE_WORDS = [
-    "좋다", "훌륭", "멋져", "최고", "완벽", "사랑", "행복", "기쁘", "만족",
-    "amazing", "great", "awesome", "perfect", "love", "happy", "excellent", "good"
-]
+# 서비스의 fallback 모델과 같은 감정 사전(컴파일된 키워드 오토마톤)을 사용
+# models.lexicon은 표준 라이브러리만 쓰므로 서비스 설정(utils.config, .env)은 불러오지 않음
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "실습결과", "src"))
+from models.lexicon import LexiconEngine, verdict
 
-NEGATIVE_WORDS = [
-    "나쁘", "별로", "싫어", "최악", "실망", "화가", "짜증", "슬프", "무서",
-    "terrible", "bad", "awful", "worst", "hate", "angry", "sad", "disappointed"
-]
+lexicon = LexiconEngine()
 
 class PredictRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=512)
@@ -40,27 +37,11 @@ def analyze_sentiment_simple(text: str) -> dict:
     """간단한 규칙 기반 감정분석"""
     start_time = time.time()
 
-    text_lower = text.lower()
-    positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
-    negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
-
-    if positive_count > negative_count:
-        sentiment = "positive"
-        confidence = min(0.9, 0.6 + (positive_count - negative_count) * 0.1)
-    elif negative_count > positive_count:
-        sentiment = "negative"
-        confidence = min(0.9, 0.6 + (negative_count - positive_count) * 0.1)
-    else:
-        sentiment = "neutral"
-        confidence = 0.7
+    result = verdict(lexicon.score(text))
 
     processing_time = time.time() - start_time
-
-    return {
-        "sentiment": sentiment,
-        "confidence": round(confidence, 3),
-        "processing_time": round(processing_time, 3)
-    }
+    result["processing_time"] = round(processing_time, 3)
+    return result
 
 # FastAPI 앱 생성
 app = FastAPI(
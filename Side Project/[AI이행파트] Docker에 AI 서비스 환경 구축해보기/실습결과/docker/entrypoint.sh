@@ -21,17 +21,8 @@ echo "  Port: $SERVER_PORT"
 echo "  Debug: $DEBUG_MODE"
 echo "  Log Level: $LOG_LEVEL"
 
-# Download and cache model if not present
-echo "Checking AI model availability..."
-python -c "
-from src.models.sentiment_model import SentimentModel
-try:
-    model = SentimentModel()
-    print('Model loaded successfully')
-except Exception as e:
-    print(f'Model loading failed: {e}')
-    exit(1)
-"
+# The model is loaded by the app itself in the background (MODEL_BACKGROUND_LOADING);
+# /health reports 503 until it is ready, so the server starts without waiting for it here.
 
 echo "Starting FastAPI server..."
 exec uvicorn src.main:app \
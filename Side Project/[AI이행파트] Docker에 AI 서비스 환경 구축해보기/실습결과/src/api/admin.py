@@ -0,0 +1,161 @@
+"""
+Admin API: runtime configuration, profiling and memory diagnostics
+
+Protected by ADMIN_TOKEN (sent as the X-Admin-Token header); the admin routes answer 403
+while no token is configured. Changes go through utils/runtime_config.py, so they are
+validated, applied atomically and audited.
+"""
+
+import asyncio
+import hmac
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from utils.config import get_settings
+from utils.memory import get_allocation_tracker
+from utils.profiling import ProfileBusyError, capture_profile
+from utils.runtime_config import RELOADABLE_FIELDS, ConfigError, RuntimeConfig
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency rejecting requests without the configured admin token"""
+    token = get_settings().admin_token
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (set ADMIN_TOKEN)")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _runtime_config(request: Request) -> RuntimeConfig:
+    return request.app.state.runtime_config
+
+
+@router.get(
+    "/admin/config",
+    dependencies=[Depends(require_admin)],
+    summary="Get runtime configuration",
+    description="Current values of the settings that can be changed without a restart."
+)
+async def get_runtime_config(request: Request) -> Dict[str, Any]:
+    """Get reloadable settings and the config version"""
+    runtime_config = _runtime_config(request)
+    return {
+        "version": runtime_config.version,
+        "values": runtime_config.snapshot(),
+        "reloadable": sorted(RELOADABLE_FIELDS)
+    }
+
+
+@router.patch(
+    "/admin/config",
+    dependencies=[Depends(require_admin)],
+    responses={400: {"description": "Invalid or non-reloadable settings (nothing was applied)"}},
+    summary="Change runtime configuration",
+    description="Validate and apply a set of reloadable settings atomically, e.g. {\"batch_max_wait_ms\": 2}."
+)
+async def update_runtime_config(request: Request, changes: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    """Apply reloadable settings and return the audit entry"""
+    actor = request.client.host if request.client else None
+    try:
+        return _runtime_config(request).apply(changes, source="api", actor=actor)
+    except ConfigError as e:
+        raise HTTPException(status_code=400, detail={"message": "Invalid configuration", "errors": e.errors})
+
+
+@router.get(
+    "/admin/config/history",
+    dependencies=[Depends(require_admin)],
+    summary="Get runtime configuration history",
+    description="Recent applied changes (audit log), oldest first."
+)
+async def get_runtime_config_history(request: Request) -> List[Dict[str, Any]]:
+    """Get recent config changes"""
+    return list(_runtime_config(request).history)
+
+
+@router.post(
+    "/admin/profile",
+    dependencies=[Depends(require_admin)],
+    responses={
+        200: {"description": "Folded stacks (text/plain) or a JSON report"},
+        409: {"description": "Another profile is being captured"}
+    },
+    summary="Profile the serving process",
+    description="Sample Python stacks (and torch operators when loaded) for a few seconds while traffic is served."
+)
+async def profile_process(
+    seconds: float = Query(
+        5.0, gt=0, description="Capture duration (capped by PROFILE_MAX_SECONDS, PROFILE_TORCH_MAX_SECONDS with torch)"
+    ),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Stack sampling interval"),
+    torch: bool = Query(False, description="Also record torch operator timings (buffers every operator call)"),
+    include_idle: bool = Query(False, description="Keep stacks of threads that are only waiting"),
+    format: str = Query("folded", pattern="^(folded|json)$", description="folded: flamegraph input; json: full report")
+):
+    """Capture a time-boxed profile"""
+    settings = get_settings()
+    duration = min(seconds, settings.profile_torch_max_seconds if torch else settings.profile_max_seconds)
+    try:
+        # Sampling runs in a worker thread so the event loop keeps serving (and shows up in the profile)
+        report = await asyncio.to_thread(
+            capture_profile, duration, interval_ms / 1000, include_torch=torch, include_idle=include_idle
+        )
+    except ProfileBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "json":
+        return report
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return PlainTextResponse(
+        report["folded"] + "\n",
+        headers={"Content-Disposition": f'attachment; filename="profile-{stamp}.folded"'}
+    )
+
+
+@router.post(
+    "/admin/memory/snapshot",
+    dependencies=[Depends(require_admin)],
+    summary="Diff allocations since the last snapshot",
+    description="The first call starts tracemalloc and takes a baseline; each later call returns the "
+                "allocation sites that grew since the previous call. Tracing slows allocations down "
+                "until DELETE /admin/memory/snapshot."
+)
+async def memory_snapshot(limit: int = Query(20, ge=1, le=200)) -> Dict[str, Any]:
+    """Take a tracemalloc snapshot and compare it with the previous one"""
+    return await asyncio.to_thread(get_allocation_tracker().diff, limit)
+
+
+@router.delete(
+    "/admin/memory/snapshot",
+    dependencies=[Depends(require_admin)],
+    summary="Stop allocation tracing",
+    description="Stop tracemalloc and drop the baseline snapshot."
+)
+async def stop_memory_tracing() -> Dict[str, Any]:
+    """Stop tracemalloc"""
+    return {"stopped": get_allocation_tracker().stop()}
+
+
+@router.get(
+    "/metrics/memory",
+    summary="Get memory accounting",
+    description="Process RSS and its growth rate, allocator stats, and the size of caches and queues."
+)
+async def get_memory_metrics(request: Request) -> Dict[str, Any]:
+    """Get memory usage by component"""
+    return request.app.state.memory_monitor.get_stats()
+
+
+@router.get(
+    "/metrics/config",
+    summary="Get runtime configuration metrics",
+    description="Config version, rejected change sets and the source of the last change."
+)
+async def get_config_metrics(request: Request) -> Dict[str, Any]:
+    """Get config version metrics"""
+    return _runtime_config(request).get_metrics()
@@ -0,0 +1,284 @@
+"""
+Admission control and load shedding
+
+Requests to controlled routes are admitted only if they can plausibly finish within the SLO.
+Under overload, rejecting early with 503 + Retry-After keeps the latency of admitted requests
+stable instead of letting every request slow down until clients time out.
+
+- Per-route concurrency limits and a global in-flight limit
+- Estimated sojourn time per route via Little's law: (in_flight + 1) / service_rate, where
+  service_rate is completions per busy second (exponentially decayed, so it tracks recent load)
+- Optional per-client token buckets (429 + Retry-After)
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _RouteState:
+    """In-flight count and decayed service-rate estimate for one route"""
+
+    def __init__(self, limit: int, decay_seconds: float, now: float):
+        self.limit = limit
+        self.decay_seconds = decay_seconds
+        self.in_flight = 0
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = 0
+        # Exponentially decayed completions and busy time
+        self._completions = 0.0
+        self._busy = 0.0
+        self._last_update = now
+
+    def _advance(self, now: float):
+        elapsed = max(now - self._last_update, 0.0)
+        if elapsed > 0:
+            decay = math.exp(-elapsed / self.decay_seconds)
+            self._completions *= decay
+            # Busy time accrues only while requests are in flight
+            self._busy = self._busy * decay + (elapsed if self.in_flight else 0.0)
+        self._last_update = now
+
+    def service_rate(self) -> Optional[float]:
+        """Completions per busy second, or None before the first completions"""
+        if self._completions < 1.0 or self._busy <= 0.0:
+            return None
+        return self._completions / self._busy
+
+    def estimated_wait(self, now: float) -> Optional[float]:
+        """Expected time for one more request to complete (Little's law)"""
+        self._advance(now)
+        rate = self.service_rate()
+        return None if rate is None else (self.in_flight + 1) / rate
+
+    def start(self, now: float):
+        self._advance(now)
+        self.in_flight += 1
+        self.admitted += 1
+
+    def finish(self, now: float):
+        self._advance(now)
+        self.in_flight -= 1
+        self.completed += 1
+        self._completions += 1.0
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success, otherwise seconds until a token is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Decides whether a request to a controlled route is admitted
+
+    Args:
+        route_limits: Max in-flight requests per path; other paths are not controlled
+        max_in_flight: Max in-flight requests across all controlled routes
+        slo: Target completion time in seconds; requests estimated to exceed it are shed
+        client_rate: Per-client requests per second (0 disables client rate limiting)
+        client_burst: Per-client bucket size
+        max_clients: Number of client buckets kept (least recently seen are dropped)
+        decay_seconds: Time constant of the service-rate estimate
+        clock: Time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        route_limits: Dict[str, int],
+        max_in_flight: int = 256,
+        slo: float = 1.0,
+        client_rate: float = 0.0,
+        client_burst: int = 20,
+        max_clients: int = 10000,
+        decay_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_in_flight = max_in_flight
+        self.slo = slo
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self.decay_seconds = decay_seconds
+        self.clock = clock
+
+        now = clock()
+        self.routes = {path: _RouteState(limit, decay_seconds, now) for path, limit in route_limits.items()}
+        self.in_flight = 0
+        self.rejections: Dict[str, int] = {"route_limit": 0, "global_limit": 0, "slo": 0, "client_rate": 0}
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def reconfigure(
+        self,
+        route_limits: Dict[str, int],
+        max_in_flight: int,
+        slo: float,
+        client_rate: float,
+        client_burst: int
+    ):
+        """
+        Apply new limits at runtime without resetting in-flight counts or service-rate estimates
+
+        Routes are added or updated, never removed, so requests already admitted can still be released.
+        """
+        now = self.clock()
+        for path, limit in route_limits.items():
+            if path in self.routes:
+                self.routes[path].limit = limit
+            else:
+                self.routes[path] = _RouteState(limit, self.decay_seconds, now)
+        self.max_in_flight = max_in_flight
+        self.slo = slo
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        for bucket in self._clients.values():
+            bucket.rate = client_rate
+            bucket.burst = client_burst
+            bucket.tokens = min(bucket.tokens, client_burst)
+
+    def controls(self, path: str) -> bool:
+        """Whether admission control applies to the path"""
+        return path in self.routes
+
+    def _reject(self, route: _RouteState, reason: str, status: int, retry_after: float) -> Tuple[int, str, float]:
+        route.rejected += 1
+        self.rejections[reason] += 1
+        return status, reason, max(retry_after, 1.0)
+
+    def _client_bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst, now)
+            self._clients[client] = bucket
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+        return bucket
+
+    def try_admit(self, path: str, client: Optional[str] = None) -> Optional[Tuple[int, str, float]]:
+        """
+        Try to admit a request
+
+        Returns:
+            None if admitted (the caller must call release), otherwise (status_code, reason, retry_after_seconds)
+        """
+        now = self.clock()
+        route = self.routes[path]
+
+        if self.client_rate > 0 and client is not None:
+            wait = self._client_bucket(client, now).take(now)
+            if wait > 0:
+                return self._reject(route, "client_rate", 429, wait)
+
+        if route.in_flight >= route.limit:
+            return self._reject(route, "route_limit", 503, route.estimated_wait(now) or 1.0)
+        if self.in_flight >= self.max_in_flight:
+            return self._reject(route, "global_limit", 503, route.estimated_wait(now) or 1.0)
+
+        estimated = route.estimated_wait(now)
+        if estimated is not None and estimated > self.slo:
+            # Retry once the queue ahead has had time to drain below the SLO
+            return self._reject(route, "slo", 503, estimated - self.slo)
+
+        route.start(now)
+        self.in_flight += 1
+        return None
+
+    def release(self, path: str):
+        """Mark an admitted request as finished"""
+        self.routes[path].finish(self.clock())
+        self.in_flight -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Admission statistics per route"""
+        now = self.clock()
+        routes = {}
+        for path, route in self.routes.items():
+            estimated = route.estimated_wait(now)
+            rate = route.service_rate()
+            routes[path] = {
+                "in_flight": route.in_flight,
+                "limit": route.limit,
+                "admitted": route.admitted,
+                "rejected": route.rejected,
+                "service_rate": round(rate, 2) if rate is not None else None,
+                "estimated_wait_ms": round(estimated * 1000, 1) if estimated is not None else None
+            }
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "slo_ms": self.slo * 1000,
+            "rejections": dict(self.rejections),
+            "tracked_clients": len(self._clients),
+            "routes": routes
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.controls(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        client = scope["client"][0] if scope.get("client") else None
+        rejection = self.controller.try_admit(path, client)
+        if rejection is not None:
+            status, reason, retry_after = rejection
+            await self._send_rejection(send, status, reason, retry_after)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(path)
+
+    @staticmethod
+    async def _send_rejection(send, status: int, reason: str, retry_after: float):
+        detail = "Too many requests" if status == 429 else "Service overloaded, retry later"
+        body = json.dumps({"detail": detail, "reason": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_admission_controller(settings) -> AdmissionController:
+    """Build the controller from Settings"""
+    return AdmissionController(
+        route_limits=settings.admission_route_limits,
+        max_in_flight=settings.admission_max_in_flight,
+        slo=settings.admission_slo_ms / 1000.0,
+        client_rate=settings.admission_client_rate,
+        client_burst=settings.admission_client_burst
+    )
@@ -0,0 +1,255 @@
+"""
+Rolling sentiment aggregates per caller-supplied key
+
+Predictions made through /predict, /predict/batch and /ws/predict with a `key` (topic,
+product id, channel...) update windowed statistics for that key as they stream through:
+
+- Sliding window (last `window_seconds`): a ring of `window_seconds / bucket_seconds`
+  time buckets plus running totals. Expired buckets are subtracted from the totals as the
+  ring advances, so reading the window is O(labels), independent of history length.
+  Buckets are allocated on first use, so a key costs memory for the buckets it actually
+  filled (most keys are sparse), not for the whole ring.
+- Tumbling window (aligned `tumbling_seconds` periods): the current and previous period.
+
+Only the most recently updated `max_keys` keys are kept.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from api.schemas import AggregateResponse
+from utils.config import get_settings
+
+LABELS = ("negative", "neutral", "positive")
+_LABEL_INDEX = {label: i for i, label in enumerate(LABELS)}
+
+router = APIRouter()
+
+
+def _zeros() -> List[float]:
+    return [0.0] * len(LABELS)
+
+
+def _summary(counts: List[float], confidence: List[float], start: float, end: float) -> Dict[str, Any]:
+    total = int(sum(counts))
+    return {
+        "start": start,
+        "end": end,
+        "count": total,
+        "labels": {
+            label: {
+                "count": int(counts[i]),
+                "share": round(counts[i] / total, 4) if total else 0.0,
+                "mean_confidence": round(confidence[i] / counts[i], 4) if counts[i] else None
+            }
+            for i, label in enumerate(LABELS)
+        }
+    }
+
+
+class _KeyWindows:
+    """Ring-buffer sliding window and tumbling periods for one key"""
+
+    def __init__(self, num_buckets: int, epoch: int, period: int):
+        self.num_buckets = num_buckets
+        self.buckets: Dict[int, tuple] = {}  # slot -> (counts, confidence), non-empty slots only
+        self.total_counts = _zeros()
+        self.total_confidence = _zeros()
+        self.head = epoch  # newest bucket epoch
+
+        self.period = period
+        self.period_counts, self.period_confidence = _zeros(), _zeros()
+        self.previous_counts, self.previous_confidence = _zeros(), _zeros()
+
+    def advance(self, epoch: int):
+        """Move the ring forward to bucket `epoch`, expiring buckets that fall out of the window"""
+        steps = epoch - self.head
+        if steps <= 0:
+            return
+        for step in range(1, min(steps, self.num_buckets) + 1):
+            bucket = self.buckets.pop((self.head + step) % self.num_buckets, None)
+            if bucket is None:
+                continue
+            counts, confidence = bucket
+            for i in range(len(LABELS)):
+                if counts[i]:
+                    self.total_counts[i] -= counts[i]
+                    self.total_confidence[i] -= confidence[i]
+                    # Avoid drift from repeated float subtraction
+                    if self.total_counts[i] == 0:
+                        self.total_confidence[i] = 0.0
+        self.head = epoch
+
+    def roll_period(self, period: int):
+        """Start tumbling period `period` (the current one becomes previous only if adjacent)"""
+        if period <= self.period:
+            return
+        if period == self.period + 1:
+            self.previous_counts, self.previous_confidence = self.period_counts, self.period_confidence
+        else:
+            self.previous_counts, self.previous_confidence = _zeros(), _zeros()
+        self.period_counts, self.period_confidence = _zeros(), _zeros()
+        self.period = period
+
+    def add(self, epoch: int, period: int, index: int, confidence: float):
+        self.advance(epoch)
+        self.roll_period(period)
+        # Late records (clock moved back) are counted in the newest bucket
+        slot = self.head % self.num_buckets
+        bucket = self.buckets.get(slot)
+        if bucket is None:
+            bucket = self.buckets[slot] = (_zeros(), _zeros())
+        bucket[0][index] += 1
+        bucket[1][index] += confidence
+        self.total_counts[index] += 1
+        self.total_confidence[index] += confidence
+        if period == self.period:
+            self.period_counts[index] += 1
+            self.period_confidence[index] += confidence
+
+
+class SentimentAggregator:
+    """
+    Windowed sentiment statistics per key
+
+    Args:
+        bucket_seconds: Sliding-window resolution
+        window_seconds: Sliding-window length (rounded up to whole buckets)
+        tumbling_seconds: Tumbling period length
+        max_keys: Keys kept (least recently updated are dropped)
+        clock: Wall-clock time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 10.0,
+        window_seconds: float = 3600.0,
+        tumbling_seconds: float = 300.0,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.time
+    ):
+        if bucket_seconds <= 0 or window_seconds < bucket_seconds or tumbling_seconds <= 0:
+            raise ValueError("Aggregate windows must be positive and window_seconds >= bucket_seconds")
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = int(-(-window_seconds // bucket_seconds))
+        self.window_seconds = self.num_buckets * bucket_seconds
+        self.tumbling_seconds = tumbling_seconds
+        self.max_keys = max_keys
+        self.clock = clock
+        self._keys: "OrderedDict[str, _KeyWindows]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.evicted_keys = 0
+
+    def _epochs(self, now: float):
+        return int(now // self.bucket_seconds), int(now // self.tumbling_seconds)
+
+    def record(self, key: str, results: Iterable[Dict[str, Any]]):
+        """Add prediction results (dicts with sentiment/confidence) to the key's windows"""
+        now = self.clock()
+        epoch, period = self._epochs(now)
+        with self._lock:
+            windows = self._keys.get(key)
+            if windows is None:
+                windows = _KeyWindows(self.num_buckets, epoch, period)
+                self._keys[key] = windows
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+                    self.evicted_keys += 1
+            else:
+                self._keys.move_to_end(key)
+
+            for result in results:
+                index = _LABEL_INDEX.get(result.get("sentiment"))
+                if index is None:
+                    continue  # "unknown" results of failed predictions
+                windows.add(epoch, period, index, float(result.get("confidence", 0.0)))
+                self.recorded += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Current sliding and tumbling aggregates for the key, or None if it was never recorded"""
+        now = self.clock()
+        epoch, period = self._epochs(now)
+        with self._lock:
+            windows = self._keys.get(key)
+            if windows is None:
+                return None
+            windows.advance(epoch)
+            windows.roll_period(period)
+
+            period_start = windows.period * self.tumbling_seconds
+            return {
+                "key": key,
+                "timestamp": now,
+                "sliding": _summary(
+                    windows.total_counts, windows.total_confidence,
+                    (epoch + 1) * self.bucket_seconds - self.window_seconds, now
+                ),
+                "tumbling": _summary(
+                    windows.period_counts, windows.period_confidence,
+                    period_start, period_start + self.tumbling_seconds
+                ),
+                "previous_tumbling": _summary(
+                    windows.previous_counts, windows.previous_confidence,
+                    period_start - self.tumbling_seconds, period_start
+                )
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._keys),
+                "buckets": sum(len(windows.buckets) for windows in self._keys.values()),
+                "max_keys": self.max_keys,
+                "evicted_keys": self.evicted_keys,
+                "recorded": self.recorded,
+                "bucket_seconds": self.bucket_seconds,
+                "window_seconds": self.window_seconds,
+                "tumbling_seconds": self.tumbling_seconds
+            }
+
+
+@lru_cache()
+def get_aggregator() -> Optional[SentimentAggregator]:
+    """Shared aggregator built from Settings (None when aggregates are disabled)"""
+    settings = get_settings()
+    if not settings.aggregates_enabled:
+        return None
+    return SentimentAggregator(
+        bucket_seconds=settings.aggregates_bucket_seconds,
+        window_seconds=settings.aggregates_window_seconds,
+        tumbling_seconds=settings.aggregates_tumbling_seconds,
+        max_keys=settings.aggregates_max_keys
+    )
+
+
+def record_results(key: Optional[str], results: Iterable[Dict[str, Any]]):
+    """Record results for a key if one was given and aggregates are enabled"""
+    if key is None:
+        return
+    aggregator = get_aggregator()
+    if aggregator is not None:
+        aggregator.record(key, results)
+
+
+@router.get(
+    "/aggregates/{key}",
+    response_model=AggregateResponse,
+    responses={404: {"description": "No predictions recorded for the key"}},
+    summary="Get rolling sentiment aggregates",
+    description="Counts, label shares and mean confidence for a key over the sliding window and tumbling periods."
+)
+async def get_aggregates(key: str) -> AggregateResponse:
+    """Get windowed sentiment statistics for a key"""
+    aggregator = get_aggregator()
+    if aggregator is None:
+        raise HTTPException(status_code=404, detail="Aggregates are disabled")
+    snapshot = aggregator.get(key)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No predictions recorded for key: {key}")
+    return AggregateResponse(**snapshot)
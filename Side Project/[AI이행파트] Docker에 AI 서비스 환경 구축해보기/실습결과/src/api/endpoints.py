@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+import base64
 import logging
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
-from api.schemas import PredictRequest, PredictResponse, ErrorResponse, BatchPredictRequest, BatchPredictResponse
-# from models.sentiment_model import SentimentModel  # 기존 영어 전용 모델
-from models.sentiment_model_improved import SentimentModelImproved as SentimentModel  # 개선된 다국어 모델
+from api.schemas import (
+    PredictRequest, PredictResponse, ErrorResponse, BatchPredictRequest, BatchPredictResponse,
+    DocumentPredictRequest, DocumentPredictResponse, PredictionQueryResponse,
+    EmbeddingArray, EmbeddingOptions, EmbedRequest, EmbedResponse
+)
+from api.aggregates import record_results
+# Model classes are resolved lazily through the registry so importing this module never loads torch
+from models.registry import SentimentPredictor as SentimentModel
+from models.dedup import SingleFlight, dedupe_texts, normalize_text, scatter_results
+from models.rule_based_model import RuleBasedSentimentModel, get_fallback_model
+from utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +25,9 @@ router = APIRouter()
 # Global model instance (will be set by main.py)
 _model_instance = None
 
+# Coalesces identical in-flight texts across concurrent requests
+_single_flight = SingleFlight()
+
 def get_model() -> SentimentModel:
     """Dependency to get the model instance"""
     global _model_instance
@@ -23,6 +37,171 @@ def get_model() -> SentimentModel:
         _model_instance = main_get_model()
     return _model_instance
 
+def get_batcher():
+    """Micro-batcher started by main.py, or None when requests should call the model directly"""
+    from main import get_batcher as main_get_batcher
+    batcher = main_get_batcher()
+    return batcher if batcher is not None and batcher.running else None
+
+def get_prediction_store():
+    """Prediction store opened by main.py, or None when persistence is disabled"""
+    from main import get_prediction_store as main_get_prediction_store
+    return main_get_prediction_store()
+
+def get_shadow_evaluator():
+    """Shadow evaluator started by main.py, or None when shadow mode is off"""
+    from main import get_shadow_evaluator as main_get_shadow_evaluator
+    return main_get_shadow_evaluator()
+
+def get_model_or_fallback():
+    """
+    Dependency returning the AI model, or the rule-based fallback when the service must degrade:
+    while the model is still warming up, or when the inference queue exceeds the threshold.
+    """
+    settings = get_settings()
+    try:
+        model = get_model()
+    except HTTPException:
+        if not settings.fallback_enabled:
+            raise
+        logger.debug("Model not loaded yet, serving rule-based fallback")
+        return get_fallback_model()
+
+    batcher = get_batcher()
+    if (settings.fallback_enabled and batcher is not None
+            and batcher.queue_depth >= settings.fallback_queue_threshold):
+        logger.debug("Inference queue saturated (%d), serving rule-based fallback", batcher.queue_depth)
+        return get_fallback_model()
+
+    return model
+
+def shadowed(predict_batch: Callable[..., List[Dict[str, Any]]]) -> Callable[..., List[Dict[str, Any]]]:
+    """
+    Wrap a model call so every executed batch is offered to the shadow evaluator
+
+    The batch is timed where it runs (micro-batcher or request thread), so the evaluator gets
+    the served per-text latency and batch size without running the production model again.
+    """
+    def run(texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        results = predict_batch(texts, **kwargs)
+        shadow = get_shadow_evaluator()
+        if shadow is not None:
+            shadow.offer(texts, results, batch_seconds=time.perf_counter() - started)
+        return results
+    return run
+
+def _predict_one(model: SentimentModel, text: str) -> Dict[str, Any]:
+    """model.predict offered to the shadow evaluator as a batch of one"""
+    return shadowed(lambda texts: [model.predict(texts[0])])([text])[0]
+
+async def _record_fresh(store, texts: List[str], prediction: Awaitable) -> Any:
+    """
+    Await a model prediction and hand it to the prediction store
+
+    Called once per executed inference (not per coalesced caller or cache hit), so the store
+    sees each fresh model result exactly once. (The shadow evaluator is fed by shadowed().)
+    """
+    results = await prediction
+    if store is not None:
+        store.record(texts, results if isinstance(results, list) else [results])
+    return results
+
+async def infer_many(
+    model: SentimentModel,
+    texts: List[str],
+    cached: bool = True,
+    embedding: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Predict unique, normalized texts through the shared inference path
+
+    Texts already in the prediction store's warm cache are answered without the model
+    (unless `cached` is false: the store keeps sentiment only, not emotions).
+    Identical in-flight texts are coalesced across requests and distinct texts are
+    micro-batched with every other caller when the batcher is running.
+
+    With an `embedding` pooling, each result also carries the sentence vector of the same
+    forward pass; those requests run their own pass (the batcher and the store have no vectors).
+    """
+    if isinstance(model, RuleBasedSentimentModel):
+        return model.predict_batch(texts)
+    batcher = get_batcher()
+    store = get_prediction_store()
+    if embedding is not None:
+        return await _record_fresh(store, texts, run_in_threadpool(shadowed(model.predict_batch), texts, embedding=embedding))
+    execute = (
+        batcher.submit_many if batcher is not None
+        else lambda pending: run_in_threadpool(shadowed(model.predict_batch), pending)
+    )
+
+    results: List[Optional[Dict[str, Any]]] = (
+        [store.get(text) for text in texts] if store is not None and cached else [None] * len(texts)
+    )
+    missing = [text for text, result in zip(texts, results) if result is None]
+    if missing:
+        fresh = iter(await _single_flight.do_many(
+            missing, lambda pending: _record_fresh(store, pending, execute(pending))
+        ))
+        results = [result if result is not None else next(fresh) for result in results]
+    return results
+
+def _check_tasks(model: SentimentModel, tasks: List[str]):
+    """Reject tasks the serving model has no head for (every model has the sentiment head)"""
+    missing = [task for task in tasks if task != "sentiment" and task not in getattr(model, "tasks", ())]
+    if not missing:
+        return
+    if isinstance(model, RuleBasedSentimentModel):
+        raise HTTPException(status_code=503, detail=f"{', '.join(missing)} is unavailable while the model "
+                                                    "is warming up or overloaded")
+    # Only the in-process model (INFERENCE_BACKEND=thread) loads heads; the other backends never have them
+    hint = "set EMOTION_HEAD_PATH" if hasattr(model, "tasks") else "requires INFERENCE_BACKEND=thread with EMOTION_HEAD_PATH"
+    raise HTTPException(status_code=400, detail=f"Task not available for this model: {', '.join(missing)} ({hint})")
+
+def _check_embedding(model: SentimentModel):
+    """Reject embedding requests the serving model has no encoder vectors for"""
+    if isinstance(model, RuleBasedSentimentModel):
+        raise HTTPException(status_code=503, detail="Embeddings are unavailable while the model "
+                                                    "is warming up or overloaded")
+    if not hasattr(model, "embed"):
+        raise HTTPException(status_code=400, detail="Embeddings require INFERENCE_BACKEND=thread")
+
+def _check_document(model: SentimentModel):
+    """Reject document requests the serving model cannot window (e.g. INFERENCE_BACKEND=stub)"""
+    if not hasattr(model, "predict_document"):
+        raise HTTPException(status_code=400, detail="Document prediction requires INFERENCE_BACKEND=thread or process")
+
+def _encode_vectors(vectors: Sequence, options: EmbeddingOptions) -> Tuple[bytes, List[int]]:
+    """Float32 vectors as little-endian row-major bytes (L2-normalized and cast per options) and their shape"""
+    import numpy as np  # imported on first use, like the model
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if options.normalize:
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+    data = np.ascontiguousarray(vectors, dtype="<f2" if options.dtype == "float16" else "<f4").tobytes()
+    return data, list(vectors.shape)
+
+def _embedding_array(vectors: Sequence, options: EmbeddingOptions) -> EmbeddingArray:
+    """Vectors ((hidden,) or a sequence of them) as a base64 EmbeddingArray"""
+    data, shape = _encode_vectors(vectors, options)
+    return EmbeddingArray(
+        data=base64.b64encode(data).decode("ascii"),
+        shape=shape,
+        dtype=options.dtype,
+        pooling=options.pooling,
+        normalized=options.normalize
+    )
+
+def _select_tasks(result: Dict[str, Any], tasks: List[str]) -> Dict[str, Any]:
+    """Keep the requested heads' fields of a model result (all heads run in the same pass)"""
+    selected = dict(result)
+    if "sentiment" not in tasks:
+        selected.pop("sentiment", None)
+        selected.pop("confidence", None)
+    if "emotion" not in tasks:
+        selected.pop("emotions", None)
+    return selected
+
 @router.post(
     "/predict",
     response_model=PredictResponse,
@@ -36,7 +215,7 @@ def get_model() -> SentimentModel:
 )
 async def predict_sentiment(
     request: PredictRequest,
-    model: SentimentModel = Depends(get_model)
+    model: SentimentModel = Depends(get_model_or_fallback)
 ) -> PredictResponse:
     """
     Predict sentiment for the given text.
@@ -45,23 +224,55 @@ async def predict_sentiment(
     - sentiment: positive, negative, or neutral
     - confidence: confidence score between 0 and 1
     - processing_time: time taken for prediction in seconds
+    - degraded: true when the rule-based fallback answered (model warming up or overloaded)
+    - emotions: emotion labels and scores, when "emotion" is in tasks
+    - embedding: the sentence embedding of the same encoder pass, with include_embedding
     """
+    _check_tasks(model, request.tasks)
+    if request.include_embedding:
+        _check_embedding(model)
     try:
-        logger.info(f"Processing sentiment prediction for text length: {len(request.text)}")
-
-        # Get prediction from model
-        result = model.predict(request.text)
+        # Get prediction from model (identical in-flight texts share one inference,
+        # concurrent distinct texts are micro-batched when the batcher is running)
+        text = normalize_text(request.text)
+        batcher = get_batcher()
+        store = None if isinstance(model, RuleBasedSentimentModel) else get_prediction_store()
+        cached = "emotion" not in request.tasks and not request.include_embedding
+        result = store.get(text) if store is not None and cached else None
+        if result is not None:
+            pass  # answered from the prediction store's warm cache
+        elif isinstance(model, RuleBasedSentimentModel):
+            result = model.predict(text)
+        elif request.include_embedding:
+            result = (await infer_many(model, [text], embedding=request.embedding.pooling))[0]
+        elif batcher is not None:
+            result = await _single_flight.do(text, lambda: _record_fresh(store, [text], batcher.submit(text)))
+        else:
+            result = await _single_flight.do(
+                text, lambda: _record_fresh(store, [text], run_in_threadpool(_predict_one, model, text))
+            )
 
-        logger.info(f"Prediction completed: {result['sentiment']} (confidence: {result['confidence']:.3f})")
+        logger.info("Prediction completed", extra={
+            "route": "/predict",
+            "text_length": len(request.text),
+            "sentiment": result["sentiment"],
+            "confidence": result["confidence"],
+            "degraded": result.get("degraded", False)
+        })
 
-        return PredictResponse(**result)
+        record_results(request.key, [result])
+        response = _select_tasks(result, request.tasks)
+        vector = response.pop("embedding", None)
+        if vector is not None:
+            response["embedding"] = _embedding_array(vector, request.embedding)
+        return PredictResponse(**response)
 
     except ValueError as e:
-        logger.warning(f"Invalid input: {e}")
+        logger.warning("Invalid input: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
-        logger.error(f"Prediction failed: {e}")
+        logger.error("Prediction failed: %s", e, extra={"route": "/predict"})
         raise HTTPException(status_code=500, detail="Prediction failed")
 
 @router.get(
@@ -74,7 +285,7 @@ async def get_model_info(model: SentimentModel = Depends(get_model)) -> dict[str
     try:
         return model.get_model_info()
     except Exception as e:
-        logger.error(f"Failed to get model info: {e}")
+        logger.error("Failed to get model info: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get model information")
 
 @router.post(
@@ -91,13 +302,84 @@ async def check_model_health(model: SentimentModel = Depends(get_model)) -> dict
             "status": "healthy" if is_healthy else "unhealthy"
         }
     except Exception as e:
-        logger.error(f"Model health check failed: {e}")
+        logger.error("Model health check failed: %s", e)
         return {
             "model_healthy": False,
             "status": "unhealthy",
             "error": str(e)
         }
 
+@router.get(
+    "/metrics/batching",
+    summary="Get micro-batching metrics",
+    description="Current micro-batching window, queue depth, adaptive controller decisions and tokenizer cache usage."
+)
+async def get_batching_metrics() -> dict[str, Any]:
+    """Get micro-batcher, adaptive controller and tokenizer cache metrics"""
+    from models.token_cache import get_token_cache  # numpy; imported on first use
+
+    store = get_prediction_store()
+    shared = {
+        "single_flight": _single_flight.get_stats(),
+        "token_cache": get_token_cache().get_stats(),
+        "prediction_store": store.get_stats() if store is not None else None
+    }
+    batcher = get_batcher()
+    if batcher is None:
+        return {"enabled": False, **shared}
+    return {"enabled": True, **batcher.get_metrics(), **shared}
+
+@router.get(
+    "/metrics/admission",
+    summary="Get admission control metrics",
+    description="In-flight requests, estimated wait and rejections per controlled route."
+)
+async def get_admission_metrics(request: Request) -> dict[str, Any]:
+    """Get admission controller metrics"""
+    controller = getattr(request.app.state, "admission", None)
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.get_metrics()}
+
+@router.get(
+    "/predictions/query",
+    response_model=PredictionQueryResponse,
+    responses={404: {"model": ErrorResponse, "description": "Prediction store disabled"}},
+    summary="Query stored predictions",
+    description="Look up persisted predictions by text, label and time range (newest first)."
+)
+async def query_predictions(
+    text: Optional[str] = Query(None, max_length=512, description="Exact text (normalized like /predict)"),
+    sentiment: Optional[str] = Query(None, description="positive, negative or neutral"),
+    since: Optional[float] = Query(None, description="Created at or after (unix seconds)"),
+    until: Optional[float] = Query(None, description="Created before (unix seconds)"),
+    model_id: Optional[str] = Query(None, description="Only results of this model (default: any)"),
+    limit: int = Query(100, ge=1, le=1000)
+) -> PredictionQueryResponse:
+    """Query persisted predictions through the store's indexes"""
+    store = get_prediction_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Prediction store is disabled")
+    rows = await run_in_threadpool(
+        store.query,
+        text=normalize_text(text) if text is not None else None,
+        sentiment=sentiment, since=since, until=until, model_id=model_id, limit=limit
+    )
+    return PredictionQueryResponse(results=rows, count=len(rows))
+
+async def _predict_or_unknown(model: SentimentModel, text: str) -> Dict[str, Any]:
+    """Predict a single text, returning an 'unknown' result instead of raising"""
+    try:
+        return await run_in_threadpool(model.predict, text)
+    except Exception as e:
+        logger.warning("Failed to predict for text: %.50s... Error: %s", text, e)
+        # Add a default result for failed predictions
+        return {
+            "sentiment": "unknown",
+            "confidence": 0.0,
+            "processing_time": 0.0
+        }
+
 @router.post(
     "/predict/batch",
     response_model=BatchPredictResponse,
@@ -111,7 +393,7 @@ async def check_model_health(model: SentimentModel = Depends(get_model)) -> dict
 )
 async def batch_predict_sentiment(
     request: BatchPredictRequest,
-    model: SentimentModel = Depends(get_model)
+    model: SentimentModel = Depends(get_model_or_fallback)
 ) -> BatchPredictResponse:
     """
     Predict sentiment for multiple texts in batch.
@@ -123,41 +405,173 @@ async def batch_predict_sentiment(
     - results: List of prediction results
     - total_processed: Number of texts processed
     - total_time: Total processing time
+    - embeddings: one row per result from the same encoder pass, with include_embedding
     """
     import time
 
+    _check_tasks(model, request.tasks)
+    if request.include_embedding:
+        _check_embedding(model)
     try:
         start_time = time.time()
-        logger.info(f"Processing batch sentiment prediction for {len(request.texts)} texts")
-
-        results = []
-        for text in request.texts:
-            try:
-                result = model.predict(text)
-                results.append(PredictResponse(**result))
-            except Exception as e:
-                logger.warning(f"Failed to predict for text: {text[:50]}... Error: {e}")
-                # Add a default result for failed predictions
-                results.append(PredictResponse(
-                    sentiment="unknown",
-                    confidence=0.0,
-                    processing_time=0.0
-                ))
+
+        # Collapse duplicates within the batch, then coalesce with in-flight requests
+        unique_texts, index = dedupe_texts(request.texts)
+        embedding = request.embedding.pooling if request.include_embedding else None
+
+        try:
+            unique_results = await infer_many(
+                model, unique_texts, cached="emotion" not in request.tasks, embedding=embedding
+            )
+        except Exception as e:
+            if embedding is not None:
+                raise  # the per-text fallback has no vectors
+            logger.warning("Batch inference failed, falling back to per-text prediction: %s", e)
+            unique_results = [await _predict_or_unknown(model, text) for text in unique_texts]
+
+        vectors = [result.pop("embedding") for result in unique_results] if embedding is not None else None
+        raw_results = scatter_results(unique_results, index)
+        record_results(request.key, raw_results)
+        results = [PredictResponse(**_select_tasks(result, request.tasks)) for result in raw_results]
 
         total_time = time.time() - start_time
 
-        logger.info(f"Batch prediction completed: {len(results)} texts in {total_time:.3f}s")
+        logger.info("Batch prediction completed", extra={
+            "route": "/predict/batch",
+            "texts": len(results),
+            "unique_texts": len(unique_texts),
+            "total_time": round(total_time, 3)
+        })
 
         return BatchPredictResponse(
             results=results,
             total_processed=len(results),
+            unique_processed=len(unique_texts),
+            total_time=total_time,
+            embeddings=_embedding_array([vectors[pos] for pos in index], request.embedding) if vectors else None
+        )
+
+    except ValueError as e:
+        logger.warning("Invalid input: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception as e:
+        logger.error("Batch prediction failed: %s", e, extra={"route": "/predict/batch"})
+        raise HTTPException(status_code=500, detail="Batch prediction failed")
+
+@router.post(
+    "/embed",
+    response_model=EmbedResponse,
+    responses={
+        200: {"content": {"application/octet-stream": {}}, "description": "JSON, or raw array bytes with format=binary"},
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        503: {"model": ErrorResponse, "description": "Service Unavailable"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+    },
+    summary="Embed texts",
+    description="Pooled hidden states of the sentiment model's encoder (the pass /predict runs), as a compact float32 or float16 array."
+)
+async def embed_texts(
+    request: EmbedRequest,
+    model: SentimentModel = Depends(get_model_or_fallback)
+):
+    """
+    Sentence embeddings for RAG and similarity search.
+
+    Returns (format=base64):
+    - embeddings: base64 array of shape [texts, hidden], rows in request order
+    - model: the encoder, so vectors from different models are never mixed
+
+    With format=binary the body is the raw array (little-endian, row-major) and the shape,
+    dtype and pooling are in the X-Embedding-* headers.
+    """
+    import time
+
+    _check_embedding(model)
+    try:
+        start_time = time.time()
+
+        unique_texts, index = dedupe_texts(request.texts)
+        unique_vectors = await run_in_threadpool(model.embed, unique_texts, pooling=request.pooling)
+        vectors = [unique_vectors[pos] for pos in index]
+
+        total_time = time.time() - start_time
+
+        logger.info("Embedding completed", extra={
+            "route": "/embed",
+            "texts": len(request.texts),
+            "unique_texts": len(unique_texts),
+            "total_time": round(total_time, 3)
+        })
+
+        if request.format == "binary":
+            data, shape = _encode_vectors(vectors, request)
+            return Response(content=data, media_type="application/octet-stream", headers={
+                "X-Embedding-Shape": ",".join(str(size) for size in shape),
+                "X-Embedding-Dtype": request.dtype,
+                "X-Embedding-Pooling": request.pooling,
+                "X-Embedding-Normalized": str(request.normalize).lower(),
+                "X-Embedding-Model": model.model_name
+            })
+        return EmbedResponse(
+            embeddings=_embedding_array(vectors, request),
+            model=model.model_name,
+            total_processed=len(request.texts),
+            unique_processed=len(unique_texts),
             total_time=total_time
         )
 
     except ValueError as e:
-        logger.warning(f"Invalid input: {e}")
+        logger.warning("Invalid input: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception as e:
+        logger.error("Embedding failed: %s", e, extra={"route": "/embed"})
+        raise HTTPException(status_code=500, detail="Embedding failed")
+
+@router.post(
+    "/predict/document",
+    response_model=DocumentPredictResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        503: {"model": ErrorResponse, "description": "Service Unavailable"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+    },
+    summary="Predict long-document sentiment",
+    description="Split a long document into overlapping token windows, score all windows in one batched pass and aggregate them."
+)
+async def predict_document_sentiment(
+    request: DocumentPredictRequest,
+    model: SentimentModel = Depends(get_model)
+) -> DocumentPredictResponse:
+    """
+    Predict sentiment for a long document.
+
+    Unlike /predict, the text is not truncated: it is scored window by window
+    and the window scores are pooled (mean, max or length_weighted).
+    """
+    _check_document(model)
+    try:
+        result = await run_in_threadpool(
+            model.predict_document,
+            request.text,
+            pooling=request.pooling,
+            include_windows=request.include_windows
+        )
+
+        logger.info("Document prediction completed", extra={
+            "route": "/predict/document",
+            "text_length": len(request.text),
+            "sentiment": result["sentiment"],
+            "num_windows": result["num_windows"]
+        })
+
+        return DocumentPredictResponse(**result)
+
+    except ValueError as e:
+        logger.warning("Invalid input: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
-        logger.error(f"Batch prediction failed: {e}")
-        raise HTTPException(status_code=500, detail="Batch prediction failed")
\ No newline at end of file
+        logger.error("Document prediction failed: %s", e, extra={"route": "/predict/document"})
+        raise HTTPException(status_code=500, detail="Document prediction failed")
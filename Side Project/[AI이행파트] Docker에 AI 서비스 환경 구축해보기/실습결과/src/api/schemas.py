@@ -1,5 +1,53 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
+
+# Classification heads that share one encoder pass (see models/sentiment_model_improved.py)
+TASKS = ("sentiment", "emotion")
+
+# Sentence embeddings from the same encoder pass (see POST /embed)
+EMBEDDING_POOLINGS = ("cls", "mean")
+EMBEDDING_DTYPES = ("float32", "float16")
+
+class EmbeddingOptions(BaseModel):
+    """How sentence embeddings are pooled and encoded"""
+    pooling: str = Field(
+        "cls",
+        description="cls: first token's last hidden state, mean: average over non-padding tokens",
+        example="mean"
+    )
+    dtype: str = Field(
+        "float32",
+        description="Element type of the returned array: float32 or float16 (half the size)",
+        example="float16"
+    )
+    normalize: bool = Field(
+        False,
+        description="L2-normalize each vector (dot product = cosine similarity)"
+    )
+
+    @validator('pooling')
+    def validate_pooling(cls, v):
+        if v not in EMBEDDING_POOLINGS:
+            raise ValueError(f"pooling must be one of: {', '.join(EMBEDDING_POOLINGS)}")
+        return v
+
+    @validator('dtype')
+    def validate_dtype(cls, v):
+        if v not in EMBEDDING_DTYPES:
+            raise ValueError(f"dtype must be one of: {', '.join(EMBEDDING_DTYPES)}")
+        return v
+
+class EmbeddingArray(BaseModel):
+    """A compact array of embeddings"""
+    data: str = Field(
+        ...,
+        description="Base64 of the little-endian, row-major array bytes",
+        example="AAAAAA..."
+    )
+    shape: List[int] = Field(..., description="Array shape ([hidden] or [texts, hidden])", example=[3, 768])
+    dtype: str = Field(..., description="float32 or float16", example="float16")
+    pooling: str = Field(..., description="Pooling used", example="mean")
+    normalized: bool = Field(..., description="Whether vectors are L2-normalized", example=False)
 
 class PredictRequest(BaseModel):
     """Request schema for sentiment prediction"""
@@ -10,6 +58,26 @@ class PredictRequest(BaseModel):
         description="Text to analyze for sentiment",
         example="I love this product! It's amazing."
     )
+    key: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=128,
+        description="Optional aggregation key (topic, product id...); results are added to /aggregates/{key}",
+        example="product-42"
+    )
+    tasks: List[str] = Field(
+        ["sentiment"],
+        description="Heads to return from the shared encoder pass: sentiment, emotion or both",
+        example=["sentiment", "emotion"]
+    )
+    include_embedding: bool = Field(
+        False,
+        description="Also return the sentence embedding computed by the same encoder pass"
+    )
+    embedding: EmbeddingOptions = Field(
+        default_factory=EmbeddingOptions,
+        description="Pooling and encoding of the embedding (with include_embedding)"
+    )
 
     @validator('text')
     def validate_text(cls, v):
@@ -17,26 +85,61 @@ class PredictRequest(BaseModel):
             raise ValueError('Text cannot be empty or only whitespace')
         return v.strip()
 
+    @validator('tasks')
+    def validate_tasks(cls, v):
+        unknown = [task for task in v if task not in TASKS]
+        if unknown:
+            raise ValueError(f"Unknown task: {', '.join(unknown)} (available: {', '.join(TASKS)})")
+        if not v:
+            raise ValueError('At least one task is required')
+        return list(dict.fromkeys(v))
+
+class EmotionResult(BaseModel):
+    """Emotion categories from the emotion head (multi-label)"""
+    labels: List[str] = Field(
+        ...,
+        description="Emotions at or above the threshold, most likely first",
+        example=["joy"]
+    )
+    scores: Dict[str, float] = Field(
+        ...,
+        description="Independent probability per emotion",
+        example={"joy": 0.91, "anger": 0.02, "sadness": 0.04}
+    )
+
 class PredictResponse(BaseModel):
     """Response schema for sentiment prediction"""
-    sentiment: str = Field(
-        ...,
-        description="Predicted sentiment",
+    sentiment: Optional[str] = Field(
+        None,
+        description="Predicted sentiment (null when the sentiment task was not requested)",
         example="positive"
     )
-    confidence: float = Field(
-        ...,
+    confidence: Optional[float] = Field(
+        None,
         ge=0.0,
         le=1.0,
         description="Confidence score between 0 and 1",
         example=0.95
     )
+    emotions: Optional[EmotionResult] = Field(
+        None,
+        description="Emotion categories (only when the emotion task was requested)"
+    )
+    embedding: Optional[EmbeddingArray] = Field(
+        None,
+        description="Sentence embedding, shape [hidden] (only with include_embedding)"
+    )
     processing_time: float = Field(
         ...,
         ge=0.0,
         description="Processing time in seconds",
         example=0.12
     )
+    degraded: bool = Field(
+        False,
+        description="True when served by the rule-based fallback instead of the AI model",
+        example=False
+    )
 
 class HealthResponse(BaseModel):
     """Response schema for health check"""
@@ -78,6 +181,26 @@ class BatchPredictRequest(BaseModel):
         description="List of texts to analyze for sentiment",
         example=["I love this!", "This is terrible", "It's okay"]
     )
+    key: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=128,
+        description="Optional aggregation key (topic, product id...); results are added to /aggregates/{key}",
+        example="product-42"
+    )
+    tasks: List[str] = Field(
+        ["sentiment"],
+        description="Heads to return from the shared encoder pass: sentiment, emotion or both",
+        example=["sentiment", "emotion"]
+    )
+    include_embedding: bool = Field(
+        False,
+        description="Also return the sentence embedding computed by the same encoder pass"
+    )
+    embedding: EmbeddingOptions = Field(
+        default_factory=EmbeddingOptions,
+        description="Pooling and encoding of the embedding (with include_embedding)"
+    )
 
     @validator('texts')
     def validate_texts(cls, v):
@@ -95,6 +218,15 @@ class BatchPredictRequest(BaseModel):
             raise ValueError('No valid texts provided')
         return validated
 
+    @validator('tasks')
+    def validate_tasks(cls, v):
+        unknown = [task for task in v if task not in TASKS]
+        if unknown:
+            raise ValueError(f"Unknown task: {', '.join(unknown)} (available: {', '.join(TASKS)})")
+        if not v:
+            raise ValueError('At least one task is required')
+        return list(dict.fromkeys(v))
+
 class BatchPredictResponse(BaseModel):
     """Response schema for batch sentiment prediction"""
     results: List[PredictResponse] = Field(
@@ -106,9 +238,170 @@ class BatchPredictResponse(BaseModel):
         description="Total number of texts processed",
         example=3
     )
+    unique_processed: Optional[int] = Field(
+        None,
+        description="Number of distinct texts actually sent to the model after deduplication",
+        example=3
+    )
     total_time: float = Field(
         ...,
         ge=0.0,
         description="Total processing time in seconds",
         example=0.35
-    )
\ No newline at end of file
+    )
+    embeddings: Optional[EmbeddingArray] = Field(
+        None,
+        description="Sentence embeddings, shape [texts, hidden], row i for results[i] (only with include_embedding)"
+    )
+
+class EmbedRequest(EmbeddingOptions):
+    """Request schema for sentence embeddings"""
+    texts: List[str] = Field(
+        ...,
+        min_items=1,
+        max_items=100,
+        description="Texts to embed (row order of the returned array)",
+        example=["배송이 빨라요", "The battery died after a week"]
+    )
+    format: str = Field(
+        "base64",
+        description="base64: JSON with a base64 array, binary: raw array bytes (application/octet-stream)",
+        example="base64"
+    )
+
+    @validator('texts')
+    def validate_texts(cls, v):
+        # Unlike /predict/batch, empty texts are rejected: skipping them would shift the rows
+        validated = []
+        for text in v:
+            if not text or not text.strip():
+                raise ValueError('Texts cannot be empty or only whitespace')
+            if len(text) > 512:
+                raise ValueError(f'Text too long (max 512 characters): {text[:50]}...')
+            validated.append(text.strip())
+        return validated
+
+    @validator('format')
+    def validate_format(cls, v):
+        if v not in ('base64', 'binary'):
+            raise ValueError('format must be one of: base64, binary')
+        return v
+
+class EmbedResponse(BaseModel):
+    """Response schema for sentence embeddings"""
+    embeddings: EmbeddingArray = Field(..., description="Embeddings, shape [texts, hidden]")
+    model: str = Field(..., description="Encoder that produced the vectors", example="nlptown/bert-base-multilingual-uncased-sentiment")
+    total_processed: int = Field(..., description="Number of texts embedded", example=2)
+    unique_processed: int = Field(..., description="Distinct texts sent to the model", example=2)
+    total_time: float = Field(..., ge=0.0, description="Total processing time in seconds", example=0.08)
+
+class DocumentPredictRequest(BaseModel):
+    """Request schema for long-document sentiment prediction"""
+    text: str = Field(
+        ...,
+        min_length=1,
+        description="Document to analyze (split into overlapping token windows, up to MAX_DOCUMENT_LENGTH characters)",
+        example="배송은 빨랐지만 포장이 엉망이었습니다. 그래도 제품 자체는 아주 만족스럽습니다..."
+    )
+    pooling: str = Field(
+        "mean",
+        description="How window scores are aggregated: mean, max or length_weighted",
+        example="mean"
+    )
+    include_windows: bool = Field(
+        False,
+        description="Include per-window results in the response"
+    )
+
+    @validator('text')
+    def validate_text(cls, v):
+        if not v or not v.strip():
+            raise ValueError('Text cannot be empty or only whitespace')
+        return v.strip()
+
+    @validator('pooling')
+    def validate_pooling(cls, v):
+        if v not in ('mean', 'max', 'length_weighted'):
+            raise ValueError('pooling must be one of: mean, max, length_weighted')
+        return v
+
+class WindowResult(BaseModel):
+    """Sentiment result for a single document window"""
+    start: int = Field(..., description="Start character offset of the window", example=0)
+    end: int = Field(..., description="End character offset of the window", example=1530)
+    num_tokens: int = Field(..., description="Number of tokens in the window", example=510)
+    sentiment: str = Field(..., description="Predicted sentiment for the window", example="positive")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Window confidence", example=0.88)
+    scores: Dict[str, float] = Field(..., description="Window scores per sentiment")
+
+class DocumentPredictResponse(BaseModel):
+    """Response schema for long-document sentiment prediction"""
+    sentiment: str = Field(
+        ...,
+        description="Aggregated document sentiment",
+        example="positive"
+    )
+    confidence: float = Field(
+        ...,
+        ge=0.0,
+        le=1.0,
+        description="Aggregated confidence score between 0 and 1",
+        example=0.81
+    )
+    scores: Dict[str, float] = Field(
+        ...,
+        description="Aggregated scores per sentiment",
+        example={"negative": 0.07, "neutral": 0.12, "positive": 0.81}
+    )
+    pooling: str = Field(..., description="Pooling method used", example="mean")
+    num_windows: int = Field(..., description="Number of token windows scored", example=7)
+    num_tokens: int = Field(..., description="Number of tokens in the document", example=2431)
+    windows: Optional[List[WindowResult]] = Field(
+        None,
+        description="Per-window results (only when include_windows is true)"
+    )
+    processing_time: float = Field(
+        ...,
+        ge=0.0,
+        description="Processing time in seconds",
+        example=0.41
+    )
+
+class LabelAggregate(BaseModel):
+    """Statistics for one sentiment label within a window"""
+    count: int = Field(..., description="Predictions with this label", example=42)
+    share: float = Field(..., ge=0.0, le=1.0, description="Fraction of the window's predictions", example=0.6)
+    mean_confidence: Optional[float] = Field(
+        None,
+        description="Mean confidence of these predictions (null when count is 0)",
+        example=0.87
+    )
+
+class WindowAggregate(BaseModel):
+    """Aggregated predictions over one time window"""
+    start: float = Field(..., description="Window start (unix seconds)", example=1760000000.0)
+    end: float = Field(..., description="Window end (unix seconds)", example=1760003600.0)
+    count: int = Field(..., description="Predictions in the window", example=70)
+    labels: Dict[str, LabelAggregate] = Field(..., description="Statistics per sentiment label")
+
+class AggregateResponse(BaseModel):
+    """Response schema for rolling sentiment aggregates"""
+    key: str = Field(..., description="Aggregation key", example="product-42")
+    timestamp: float = Field(..., description="Time of the snapshot (unix seconds)", example=1760003600.0)
+    sliding: WindowAggregate = Field(..., description="Sliding window ending now")
+    tumbling: WindowAggregate = Field(..., description="Current aligned tumbling period")
+    previous_tumbling: WindowAggregate = Field(..., description="Previous tumbling period")
+
+class StoredPrediction(BaseModel):
+    """A persisted prediction"""
+    text: str = Field(..., description="Normalized text", example="정말 최고예요")
+    model_id: str = Field(..., description="Model that produced the result", example="nlptown/bert-base-multilingual-uncased-sentiment")
+    sentiment: str = Field(..., description="Predicted sentiment", example="positive")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score", example=0.93)
+    degraded: bool = Field(False, description="Served by the rule-based fallback")
+    created_at: float = Field(..., description="Time of the prediction (unix seconds)", example=1760000000.0)
+
+class PredictionQueryResponse(BaseModel):
+    """Response schema for /predictions/query"""
+    results: List[StoredPrediction] = Field(..., description="Matching predictions, newest first")
+    count: int = Field(..., description="Number of results returned", example=1)
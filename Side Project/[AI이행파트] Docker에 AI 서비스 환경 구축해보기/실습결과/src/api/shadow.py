@@ -0,0 +1,252 @@
+"""
+Shadow evaluation of a candidate model on live traffic
+
+A sampled fraction (`shadow_fraction`) of the texts the production model actually scores is
+also scored by a candidate model (`shadow_model`, a registry name) in a background thread,
+after the production response has been produced. Requests only enqueue texts with their
+production results on a bounded queue; when the candidate falls behind, samples are
+dropped instead of delaying responses.
+
+Recorded per candidate: agreement rate, label-flip matrix (production label -> candidate
+label), mean absolute confidence difference and per-text model latency of both models.
+The production model is never run here: its latency is the measured time of the batch that
+served the text divided by that batch's size (passed to offer), reported next to the mean
+served and shadow batch sizes.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Recent per-text latencies kept for percentiles
+_LATENCY_SAMPLES = 2048
+
+_STOP = object()
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _latency_summary(values) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"mean_ms": None, "p50_ms": None, "p95_ms": None}
+    return {
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(_percentile(values, 0.5) * 1000, 3),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 3)
+    }
+
+
+class ShadowEvaluator:
+    """
+    Compare a candidate model with production results off the response path
+
+    Args:
+        candidate: Model with predict_batch (SentimentPredictor)
+        fraction: Share of production texts also sent to the candidate (0-1)
+        queue_size: Pending sampled texts; further samples are dropped
+        batch_size: Texts per candidate predict_batch call
+        name: Candidate name reported in stats
+        rng: Sampling source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        candidate,
+        fraction: float = 0.1,
+        queue_size: int = 1000,
+        batch_size: int = 32,
+        name: str = "candidate",
+        rng: Callable[[], float] = random.random
+    ):
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError("shadow fraction must be between 0 and 1")
+        self.candidate = candidate
+        self.fraction = fraction
+        self.batch_size = batch_size
+        self.name = name
+        self.rng = rng
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._offer_lock = threading.Lock()
+
+        self.offered = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.errors = 0
+        self.compared = 0
+        self.agreements = 0
+        self.confidence_delta_sum = 0.0
+        self.flips: Dict[str, Dict[str, int]] = {}
+        self.primary_latency: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self.candidate_latency: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self.primary_batch_sizes: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self.candidate_batch_sizes: deque = deque(maxlen=_LATENCY_SAMPLES)
+
+        self._worker = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._worker.start()
+
+    def offer(self, texts: List[str], results: List[Dict[str, Any]], batch_seconds: Optional[float] = None):
+        """
+        Sample production results for shadow scoring (never blocks)
+
+        Args:
+            texts: Texts of one executed production batch
+            results: Their served results
+            batch_seconds: Measured model time of that batch (no production latency without it)
+        """
+        served = (batch_seconds / len(texts), len(texts)) if batch_seconds is not None and texts else None
+        # Called from inference threads; the counters get their own lock so the worker never delays it
+        with self._offer_lock:
+            self.offered += len(texts)
+            if self.fraction <= 0.0:
+                return
+            for text, result in zip(texts, results):
+                if result.get("sentiment") == "unknown" or result.get("degraded", False):
+                    continue
+                if self.fraction < 1.0 and self.rng() >= self.fraction:
+                    continue
+                try:
+                    self._queue.put_nowait((text, result, served))
+                    self.sampled += 1
+                except queue.Full:
+                    self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._evaluate(batch)
+                    return
+                batch.append(item)
+            self._evaluate(batch)
+
+    def _evaluate(self, batch: List[tuple]):
+        texts = [text for text, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            candidate_results = self.candidate.predict_batch(texts)
+        except Exception as e:
+            self.errors += len(batch)
+            logger.warning("Shadow model %s failed on %d texts: %s", self.name, len(batch), e)
+            return
+        per_text = (time.perf_counter() - started) / len(batch)
+
+        with self._lock:
+            for (_, primary, served), candidate in zip(batch, candidate_results):
+                primary_label, candidate_label = primary["sentiment"], candidate["sentiment"]
+                row = self.flips.setdefault(primary_label, {})
+                row[candidate_label] = row.get(candidate_label, 0) + 1
+                self.compared += 1
+                self.agreements += primary_label == candidate_label
+                self.confidence_delta_sum += abs(candidate["confidence"] - primary["confidence"])
+                self.candidate_latency.append(per_text)
+                self.candidate_batch_sizes.append(len(batch))
+                if served is not None:
+                    self.primary_latency.append(served[0])
+                    self.primary_batch_sizes.append(served[1])
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until queued samples have been evaluated (True if the queue emptied in time)"""
+        deadline = time.monotonic() + timeout
+        while self.compared + self.errors < self.sampled:
+            if time.monotonic() >= deadline or not self._worker.is_alive():
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self):
+        """Stop the worker after the queued samples"""
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        if hasattr(self.candidate, "close"):
+            self.candidate.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            primary = _latency_summary(self.primary_latency)
+            candidate = _latency_summary(self.candidate_latency)
+            delta = (
+                round(candidate["mean_ms"] - primary["mean_ms"], 3)
+                if candidate["mean_ms"] is not None and primary["mean_ms"] is not None else None
+            )
+            batch_size = {
+                name: round(sum(sizes) / len(sizes), 2) if sizes else None
+                for name, sizes in (("primary", self.primary_batch_sizes), ("candidate", self.candidate_batch_sizes))
+            }
+            return {
+                "candidate": self.name,
+                "fraction": self.fraction,
+                "offered": self.offered,
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "queued": self._queue.qsize(),
+                "errors": self.errors,
+                "compared": self.compared,
+                "agreement_rate": round(self.agreements / self.compared, 4) if self.compared else None,
+                "mean_abs_confidence_delta": (
+                    round(self.confidence_delta_sum / self.compared, 4) if self.compared else None
+                ),
+                "flip_matrix": {label: dict(row) for label, row in self.flips.items()},
+                "latency": {
+                    "primary": primary, "candidate": candidate, "mean_delta_ms": delta, "batch_size": batch_size
+                }
+            }
+
+
+def create_shadow_evaluator(settings) -> Optional[ShadowEvaluator]:
+    """Load the candidate model named by `shadow_model` (None when shadow mode is off)"""
+    if not settings.shadow_model or settings.shadow_fraction <= 0:
+        return None
+    from models.registry import create_model
+
+    candidate = create_model(settings.shadow_model, **settings.shadow_model_options)
+    name = settings.shadow_model
+    if settings.shadow_model_options:
+        name += "(" + ", ".join(f"{k}={v}" for k, v in settings.shadow_model_options.items()) + ")"
+    logger.info("Shadow evaluation enabled: %s on %.0f%% of traffic", name, settings.shadow_fraction * 100)
+    return ShadowEvaluator(
+        candidate,
+        fraction=settings.shadow_fraction,
+        queue_size=settings.shadow_queue_size,
+        batch_size=settings.shadow_batch_size,
+        name=name
+    )
+
+
+@router.get(
+    "/shadow/stats",
+    summary="Get shadow evaluation results",
+    description="Agreement, label flips and latency of the candidate model against production traffic."
+)
+async def get_shadow_stats() -> Dict[str, Any]:
+    """Get shadow evaluation statistics"""
+    from main import get_shadow_evaluator
+
+    evaluator = get_shadow_evaluator()
+    if evaluator is None:
+        return {"enabled": False}
+    return {"enabled": True, **evaluator.get_stats()}
@@ -0,0 +1,226 @@
+"""
+WebSocket streaming predictions
+
+Clients keep one connection open, push messages continuously and receive results
+asynchronously, tagged with the ids they supplied (results may arrive out of order).
+
+Client -> server (text frames, JSON):
+    {"id": "c-1", "text": "..."}                      one message
+    {"id": "c-1", "text": "...", "key": "product-42"} also counted in /aggregates/product-42
+    [{"id": "c-1", "text": "..."}, {"id": 2, ...}]    several messages in one frame
+
+Server -> client:
+    {"results": [{"id": "c-1", "sentiment": "positive", "confidence": 0.93, "degraded": false},
+                 {"id": 2, "error": "Text must not be empty"}]}
+
+Every message goes through the same single-flight + micro-batcher path as /predict, so
+messages from all connected sockets are batched together. Each connection may have at
+most `ws_max_in_flight` replies outstanding (results and error replies alike); a slot is
+freed only once its reply has been sent, so a client that pushes faster than the model (or
+stops reading) stops being read and TCP backpressure reaches the sender instead of server memory.
+
+Each frame is admitted like one /predict/batch request under the "/ws/predict" entry of
+`admission_route_limits`; a shed frame gets an error reply per message instead of a 503.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from api.aggregates import record_results
+from api.endpoints import get_model_or_fallback, infer_many
+from models.dedup import dedupe_texts, scatter_results
+from utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Results sent per frame at most (ready results are coalesced into one frame)
+MAX_RESULTS_PER_FRAME = 512
+
+# Same limit as PredictRequest.text
+MAX_TEXT_LENGTH = 512
+
+# Admission control route for streamed frames
+ADMISSION_PATH = "/ws/predict"
+
+# Connection-level counters for /metrics/streaming
+_stats = {
+    "active_connections": 0, "connections": 0, "messages": 0, "errors": 0, "rejected": 0, "frames_sent": 0
+}
+
+
+class _StreamConnection:
+    """Reader/writer pair for one WebSocket with a per-connection in-flight limit"""
+
+    def __init__(self, websocket: WebSocket, max_in_flight: int, max_frame_items: int):
+        self.websocket = websocket
+        self.max_in_flight = max_in_flight
+        self.max_frame_items = min(max_frame_items, max_in_flight)
+        self.slots = asyncio.Semaphore(max_in_flight)
+        # Every queued reply holds an in-flight slot, so the outbox never exceeds max_in_flight
+        self.outbox: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self.admission = getattr(websocket.app.state, "admission", None)
+        self.client = websocket.client.host if websocket.client else None
+        self.pending: set = set()
+        self.next_id = 0
+
+    async def run(self):
+        """Serve until the client disconnects (reader ends) or a send fails (writer ends)"""
+        tasks = [asyncio.create_task(self._reader()), asyncio.create_task(self._writer())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            tasks.extend(self.pending)
+            for task in tasks:
+                task.cancel()
+            # asyncio.wait (not gather) so a cancellation of this handler by the server propagates unchanged
+            await asyncio.wait(tasks)
+            for task in tasks:
+                if not task.cancelled() and task.exception() is not None:
+                    logger.debug("Streaming task ended with %r", task.exception())
+
+    def _parse(self, raw: str) -> Tuple[List[Tuple[Any, str, Optional[str]]], List[Dict[str, Any]]]:
+        """Frame -> ([(id, text, key), ...], [error results])"""
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return [], [{"id": None, "error": "Invalid JSON"}]
+
+        items = payload if isinstance(payload, list) else [payload]
+        if len(items) > self.max_frame_items:
+            return [], [{"id": None, "error": f"Too many messages in one frame (max {self.max_frame_items})"}]
+
+        messages, errors = [], []
+        for item in items:
+            if not isinstance(item, dict):
+                errors.append({"id": None, "error": "Each message must be an object with 'text'"})
+                continue
+            message_id = item.get("id")
+            if message_id is None:
+                message_id = self.next_id
+                self.next_id += 1
+            text = item.get("text")
+            if not isinstance(text, str) or not text.strip():
+                errors.append({"id": message_id, "error": "Text must not be empty"})
+                continue
+            if len(text) > MAX_TEXT_LENGTH:
+                errors.append({"id": message_id, "error": f"Text must be at most {MAX_TEXT_LENGTH} characters"})
+                continue
+            key = item.get("key")
+            if key is not None and (not isinstance(key, str) or not 0 < len(key) <= 128):
+                errors.append({"id": message_id, "error": "key must be a string of 1-128 characters"})
+                continue
+            messages.append((message_id, text, key))
+        return messages, errors
+
+    async def _reader(self):
+        while True:
+            try:
+                raw = await self.websocket.receive_text()
+            except WebSocketDisconnect:
+                return
+            messages, errors = self._parse(raw)
+
+            # Stop reading once the connection has max_in_flight replies outstanding
+            for _ in range(len(messages) + len(errors)):
+                await self.slots.acquire()
+            _stats["errors"] += len(errors)
+            for error in errors:
+                self.outbox.put_nowait(error)
+            if not messages:
+                continue
+
+            if self.admission is not None:
+                rejection = self.admission.try_admit(ADMISSION_PATH, self.client)
+                if rejection is not None:
+                    _, reason, retry_after = rejection
+                    _stats["rejected"] += len(messages)
+                    for message_id, _, _ in messages:
+                        self.outbox.put_nowait({
+                            "id": message_id,
+                            "error": "Service overloaded, retry later",
+                            "reason": reason,
+                            "retry_after": math.ceil(retry_after)
+                        })
+                    continue
+
+            _stats["messages"] += len(messages)
+            task = asyncio.create_task(self._process(messages))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+            if self.admission is not None:
+                # A done callback also runs when the task is cancelled before it starts
+                task.add_done_callback(lambda _: self.admission.release(ADMISSION_PATH))
+
+    async def _process(self, messages: List[Tuple[Any, str, Optional[str]]]):
+        ids = [message_id for message_id, _, _ in messages]
+        try:
+            model = get_model_or_fallback()
+            unique_texts, index = dedupe_texts([text for _, text, _ in messages])
+            results = scatter_results(await infer_many(model, unique_texts), index)
+            for (_, _, key), result in zip(messages, results):
+                record_results(key, [result])
+            payloads = [
+                {
+                    "id": message_id,
+                    "sentiment": result["sentiment"],
+                    "confidence": result["confidence"],
+                    "degraded": result.get("degraded", False)
+                }
+                for message_id, result in zip(ids, results)
+            ]
+        except HTTPException as e:
+            payloads = [{"id": message_id, "error": e.detail} for message_id in ids]
+        except Exception as e:
+            logger.error("Streaming prediction failed: %s", e, extra={"route": "/ws/predict"})
+            payloads = [{"id": message_id, "error": "Prediction failed"} for message_id in ids]
+
+        for payload in payloads:
+            self.outbox.put_nowait(payload)
+
+    async def _writer(self):
+        while True:
+            payloads = [await self.outbox.get()]
+            while len(payloads) < MAX_RESULTS_PER_FRAME and not self.outbox.empty():
+                payloads.append(self.outbox.get_nowait())
+            try:
+                await self.websocket.send_text(json.dumps({"results": payloads}, ensure_ascii=False))
+                _stats["frames_sent"] += 1
+            finally:
+                for _ in payloads:
+                    self.slots.release()
+
+
+@router.websocket("/ws/predict")
+async def stream_predictions(websocket: WebSocket, max_in_flight: Optional[int] = None):
+    """
+    Stream sentiment predictions over a WebSocket
+
+    `max_in_flight` (query parameter) lowers the per-connection limit below `ws_max_in_flight`.
+    """
+    settings = get_settings()
+    limit = settings.ws_max_in_flight if max_in_flight is None else max(1, min(max_in_flight, settings.ws_max_in_flight))
+
+    await websocket.accept()
+    _stats["active_connections"] += 1
+    _stats["connections"] += 1
+    try:
+        await _StreamConnection(websocket, limit, settings.ws_max_frame_items).run()
+    finally:
+        _stats["active_connections"] -= 1
+
+
+@router.get(
+    "/metrics/streaming",
+    summary="Get WebSocket streaming metrics",
+    description="Connected sockets and streamed message counts."
+)
+async def get_streaming_metrics() -> Dict[str, Any]:
+    """Get WebSocket streaming counters"""
+    return dict(_stats)
@@ -2,37 +2,182 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
 import uvicorn
+import asyncio
 import os
+import sys
 from datetime import datetime
 import logging
 from contextlib import asynccontextmanager
 
-from api.endpoints import router
-# from models.sentiment_model import SentimentModel  # 기존 영어 전용 모델
-from models.sentiment_model_improved import SentimentModelImproved as SentimentModel  # 개선된 다국어 모델
+from api.admin import router as admin_router
+from api.admission import AdmissionMiddleware, create_admission_controller
+from api.endpoints import router, shadowed
+from api.streaming import router as streaming_router
+from api.aggregates import get_aggregator, router as aggregates_router
+from api.shadow import create_shadow_evaluator, router as shadow_router
+from models.registry import create_model
+from models.batcher import create_batcher
+from models.prediction_store import create_prediction_store
 from utils.config import get_settings
+from utils.logging_config import get_logging_stats, set_sample_rates, setup_logging
+from utils.memory import MemoryMonitor
+from utils.runtime_config import RuntimeConfig, changed_any
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (records are written by a background thread, flushed at exit)
+setup_logging(get_settings())
 logger = logging.getLogger(__name__)
 
 # Global model instance
 model_instance = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global model_instance
+# Global micro-batcher (None when batching is disabled)
+batcher_instance = None
+
+# Global prediction store (None when PREDICTION_STORE_PATH is unset)
+store_instance = None
+
+# Global shadow evaluator for a candidate model (None when SHADOW_MODEL is unset)
+shadow_instance = None
+
+async def load_model():
+    """Load the AI model off the event loop and start the micro-batcher"""
+    global model_instance, batcher_instance, store_instance, shadow_instance
     logger.info("Loading AI model...")
+    # torch/transformers are imported here, not at app import, so / and /health answer immediately
+    # INFERENCE_BACKEND (validated by Settings) -> registry model:
+    # "thread": multilingual model in this process ("improved"),
+    # "process": multilingual model replicated across worker processes,
+    # "stub": deterministic model with synthetic latency for load tests, no weights
+    model_name = {"thread": "improved", "process": "process", "stub": "stub"}[settings.inference_backend]
+    model = await asyncio.to_thread(create_model, model_name)
+    logger.info("Model loaded successfully")
+    _set_inference_threads(settings.inference_threads)
+
+    # Opened before the model is published so the first requests already see the warm cache
+    store_instance = await asyncio.to_thread(create_prediction_store, settings, model.get_model_info())
     try:
-        model_instance = SentimentModel()
-        logger.info("Model loaded successfully")
+        shadow_instance = await asyncio.to_thread(create_shadow_evaluator, settings)
     except Exception as e:
-        logger.error(f"Failed to load model: {e}")
-        raise
+        # A broken candidate must not keep the production model from serving
+        logger.error("Failed to load shadow model: %s", e)
+
+    if settings.batching_enabled:
+        batcher_instance = create_batcher(shadowed(model.predict_batch), settings)
+        await batcher_instance.start()
+
+    model_instance = model
+
+def _set_inference_threads(threads: int):
+    """Set torch intra-op threads (only once torch has been imported by the model)"""
+    if threads > 0 and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+def _apply_runtime_config(settings, changed):
+    """Push reloaded settings into components that copied them at startup"""
+    if "log_level" in changed:
+        logging.getLogger().setLevel(settings.log_level)
+    if "log_sample_rates" in changed:
+        set_sample_rates(settings.log_sample_rates)
+    if "inference_threads" in changed:
+        _set_inference_threads(settings.inference_threads)
+    if "token_cache_max_bytes" in changed:
+        from models.token_cache import get_token_cache
+        get_token_cache().resize(settings.token_cache_max_bytes)
+
+    if batcher_instance is not None:
+        if changed_any(changed, "batch_max_wait_ms", "batch_max_size"):
+            batcher_instance.reconfigure(settings.batch_max_wait_ms / 1000, settings.batch_max_size)
+        if batcher_instance.controller is not None and changed_any(
+                changed, "batch_target_p99_ms", "batch_min_wait_ms", "batch_max_wait_limit_ms", "batch_max_size_limit"):
+            batcher_instance.controller.reconfigure(
+                target_p99=settings.batch_target_p99_ms / 1000,
+                min_wait=settings.batch_min_wait_ms / 1000,
+                max_wait_limit=settings.batch_max_wait_limit_ms / 1000,
+                max_batch_limit=settings.batch_max_size_limit
+            )
+
+    admission = getattr(app.state, "admission", None)
+    if admission is not None and changed_any(
+            changed, "admission_route_limits", "admission_max_in_flight", "admission_slo_ms",
+            "admission_client_rate", "admission_client_burst"):
+        admission.reconfigure(
+            route_limits=settings.admission_route_limits,
+            max_in_flight=settings.admission_max_in_flight,
+            slo=settings.admission_slo_ms / 1000,
+            client_rate=settings.admission_client_rate,
+            client_burst=settings.admission_client_burst
+        )
+
+    if shadow_instance is not None and "shadow_fraction" in changed:
+        shadow_instance.fraction = settings.shadow_fraction
+    if store_instance is not None and changed_any(
+            changed, "prediction_store_flush_interval", "prediction_store_batch_size"):
+        store_instance.flush_interval = settings.prediction_store_flush_interval
+        store_instance.batch_size = settings.prediction_store_batch_size
+
+def _token_cache_stats():
+    from models.token_cache import get_token_cache  # numpy; imported on first use
+    return get_token_cache().get_stats()
+
+def _register_memory_sources(monitor: MemoryMonitor):
+    """Report everything that holds memory between requests (all should stay bounded)"""
+    monitor.register("token_cache", _token_cache_stats)
+    monitor.register("prediction_store", lambda: store_instance.get_stats() if store_instance else None)
+    monitor.register("aggregates", lambda: get_aggregator().get_stats() if get_aggregator() else None)
+    monitor.register("shadow", lambda: shadow_instance.get_stats() if shadow_instance else None)
+    monitor.register("batcher", lambda: batcher_instance.get_metrics() if batcher_instance else None)
+    monitor.register("log_queue", get_logging_stats)
+    monitor.register("model", lambda: model_instance.get_model_info() if model_instance else None)
+
+def _log_load_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Failed to load model: %s", task.exception())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_task = None
+    if settings.model_background_loading:
+        # Serve requests immediately; /predict falls back to rule-based results until the model is ready
+        load_task = asyncio.create_task(load_model())
+        load_task.add_done_callback(_log_load_failure)
+    else:
+        try:
+            await load_model()
+        except Exception as e:
+            logger.error("Failed to load model: %s", e)
+            raise
+
+    watch_task = None
+    if settings.runtime_config_path:
+        # Apply the file once before serving, then pick up edits while running
+        runtime_config.load_file(settings.runtime_config_path)
+        watch_task = asyncio.create_task(
+            runtime_config.watch(settings.runtime_config_path, settings.runtime_config_poll_seconds)
+        )
+
+    memory_task = None
+    if settings.memory_sample_seconds > 0:
+        memory_task = asyncio.create_task(memory_monitor.watch(settings.memory_sample_seconds))
 
     yield
 
     logger.info("Shutting down...")
+    if watch_task is not None:
+        watch_task.cancel()
+    if memory_task is not None:
+        memory_task.cancel()
+    if load_task is not None and not load_task.done():
+        load_task.cancel()
+    if batcher_instance is not None:
+        await batcher_instance.stop()
+    if shadow_instance is not None:
+        await asyncio.to_thread(shadow_instance.close)
+    if store_instance is not None:
+        # Write predictions still queued
+        await asyncio.to_thread(store_instance.close)
+    if hasattr(model_instance, "close"):
+        # Stop inference worker processes and release their shared memory
+        await asyncio.to_thread(model_instance.close)
 
 # Get configuration
 settings = get_settings()
@@ -47,22 +192,43 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add CORS middleware
+# Runtime-reloadable subset of the settings (PATCH /admin/config, RUNTIME_CONFIG_PATH)
+runtime_config = RuntimeConfig(settings)
+runtime_config.subscribe(_apply_runtime_config)
+app.state.runtime_config = runtime_config
+
+# RSS history and component sizes for /metrics/memory
+memory_monitor = MemoryMonitor(history_size=settings.memory_history_size)
+_register_memory_sources(memory_monitor)
+app.state.memory_monitor = memory_monitor
+
+# Add admission control (load shedding) for prediction routes
+if settings.admission_enabled:
+    app.state.admission = create_admission_controller(settings)
+    app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+
+# Add CORS middleware (added last so it is the outer layer: preflights never reach admission
+# control, and its 503/429 rejections carry CORS headers so browsers can read Retry-After)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 # Include API routes
 app.include_router(router)
+app.include_router(streaming_router)
+app.include_router(aggregates_router)
+app.include_router(shadow_router)
+app.include_router(admin_router)
 
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    logger.error(f"Global exception: {exc}")
+    logger.error("Global exception: %s", exc, extra={"route": request.url.path})
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
@@ -424,6 +590,21 @@ def get_model():
         raise HTTPException(status_code=503, detail="Model not loaded")
     return model_instance
 
+def get_batcher():
+    """Get the global micro-batcher (None if batching is disabled or not started)"""
+    global batcher_instance
+    return batcher_instance
+
+def get_prediction_store():
+    """Get the global prediction store (None if persistence is disabled or not opened yet)"""
+    global store_instance
+    return store_instance
+
+def get_shadow_evaluator():
+    """Get the global shadow evaluator (None if shadow mode is off)"""
+    global shadow_instance
+    return shadow_instance
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,220 @@
+"""
+모델 아티팩트 번들링 (오프라인 컨테이너 시작용)
+
+이미지 빌드 시점에 모델을 내려받아 하나의 디렉터리(save_pretrained 형식)로 저장하고,
+파일별 SHA-256 체크섬을 담은 manifest.json을 함께 기록합니다. 서비스는 MODEL_ARTIFACT_PATH가
+설정되면 네트워크 없이(local_files_only) 이 디렉터리에서만 로드하고, 로드 전에 체크섬을 검증합니다.
+
+- 양자화: "dynamic-int8"로 번들링하면 로드 시 Linear 층에 동적 INT8 양자화를 적용
+  (양자화된 가중치는 save_pretrained로 저장할 수 없으므로 fp32 가중치 + manifest 플래그로 기록)
+- ONNX: --onnx 옵션으로 model.onnx를 함께 내보냄 (onnx 패키지 필요, manifest에 기록)
+
+사용 예 (Dockerfile의 artifacts 단계):
+    cd src
+    python -m models.artifacts build \\
+        --model nlptown/bert-base-multilingual-uncased-sentiment \\
+        --output /opt/model --quantize none
+    python -m models.artifacts verify /opt/model
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+QUANTIZATION_MODES = ("none", "dynamic-int8")
+
+
+class ArtifactError(RuntimeError):
+    """아티팩트가 없거나 manifest/체크섬이 맞지 않음"""
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 SHA-256 (큰 가중치 파일도 청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_checksums(directory: str) -> Dict[str, Dict[str, Any]]:
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory)
+            if relative == MANIFEST_NAME:
+                continue
+            files[relative] = {"sha256": sha256_file(path), "size": os.path.getsize(path)}
+    return dict(sorted(files.items()))
+
+
+def export_onnx(model, tokenizer, path: str):
+    """ONNX 내보내기 (동적 batch/sequence 축)"""
+    try:
+        import onnx  # noqa: F401  (torch.onnx.export가 사용)
+    except ImportError as e:
+        raise ArtifactError("ONNX 변환에는 onnx 패키지가 필요합니다 (pip install onnx)") from e
+    import torch
+
+    sample = tokenizer(["sample text"], return_tensors="pt")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"}
+        }
+    )
+
+
+def bundle(
+    model,
+    tokenizer,
+    output_dir: str,
+    model_id: str,
+    quantize: str = "none",
+    onnx: bool = False,
+    revision: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    로드된 모델/토크나이저를 아티팩트 디렉터리로 저장하고 manifest 작성
+
+    Args:
+        model_id: 서비스가 기대하는 모델 이름 (로드 시 SentimentModelImproved.model_name과 비교)
+        quantize: "none" 또는 "dynamic-int8" (로드 시 적용)
+        onnx: True면 model.onnx도 함께 저장
+        revision: 요청한 원본 모델 리비전 (브랜치/태그/커밋, requested_revision으로 기록)
+
+    Returns:
+        manifest dict
+    """
+    if quantize not in QUANTIZATION_MODES:
+        raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantize} (가능: {', '.join(QUANTIZATION_MODES)})")
+
+    import torch
+    import transformers
+
+    os.makedirs(output_dir, exist_ok=True)
+    model.eval()
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    if onnx:
+        export_onnx(model, tokenizer, os.path.join(output_dir, "model.onnx"))
+
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "model_id": model_id,
+        # 실제로 내려받은 커밋 (--revision main이어도 그 시점의 commit hash로 고정)
+        "revision": getattr(model.config, "_commit_hash", None),
+        "requested_revision": revision,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "quantization": quantize,
+        "onnx": "model.onnx" if onnx else None,
+        "labels": {str(k): v for k, v in model.config.id2label.items()},
+        "versions": {"torch": torch.__version__, "transformers": transformers.__version__},
+        "files": _file_checksums(output_dir)
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"Model artifact written to {output_dir} ({len(manifest['files'])} files)")
+    return manifest
+
+
+def load_manifest(artifact_dir: str) -> Dict[str, Any]:
+    """manifest 읽기"""
+    path = os.path.join(artifact_dir, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        raise ArtifactError(f"모델 아티팩트 manifest가 없습니다: {path}")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("manifest_version") != MANIFEST_VERSION:
+        raise ArtifactError(f"지원하지 않는 manifest 버전입니다: {manifest.get('manifest_version')}")
+    return manifest
+
+
+def verify(artifact_dir: str, expected_model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    아티팩트 검증 (manifest의 모든 파일 존재 + 크기/체크섬 일치 + 모델 이름 일치)
+
+    Returns:
+        manifest dict
+    """
+    manifest = load_manifest(artifact_dir)
+
+    if expected_model_id is not None and manifest["model_id"] != expected_model_id:
+        raise ArtifactError(
+            f"아티팩트 모델({manifest['model_id']})이 설정된 모델({expected_model_id})과 다릅니다"
+        )
+
+    for relative, expected in manifest["files"].items():
+        path = os.path.join(artifact_dir, relative)
+        if not os.path.isfile(path):
+            raise ArtifactError(f"아티팩트 파일이 없습니다: {relative}")
+        if os.path.getsize(path) != expected["size"] or sha256_file(path) != expected["sha256"]:
+            raise ArtifactError(f"아티팩트 체크섬이 일치하지 않습니다: {relative}")
+
+    return manifest
+
+
+def apply_quantization(model, manifest: Dict[str, Any]):
+    """manifest에 기록된 양자화를 로드된 모델에 적용"""
+    if manifest.get("quantization") == "dynamic-int8":
+        import torch
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle a sentiment model into an offline artifact directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Download the model and write the artifact")
+    build_parser.add_argument("--model", required=True, help="Model name on the Hub or local path")
+    build_parser.add_argument("--output", required=True, help="Artifact directory")
+    build_parser.add_argument("--revision", default=None, help="Model revision (branch, tag or commit)")
+    build_parser.add_argument("--quantize", default="none", choices=QUANTIZATION_MODES)
+    build_parser.add_argument("--onnx", action="store_true", help="Also export model.onnx")
+
+    verify_parser = subparsers.add_parser("verify", help="Check manifest checksums")
+    verify_parser.add_argument("path", help="Artifact directory")
+    verify_parser.add_argument("--model", default=None, help="Expected model name")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(args.model, revision=args.revision)
+        model = AutoModelForSequenceClassification.from_pretrained(args.model, revision=args.revision)
+        manifest = bundle(
+            model, tokenizer, args.output,
+            model_id=args.model,
+            quantize=args.quantize,
+            onnx=args.onnx,
+            revision=args.revision
+        )
+        verify(args.output)
+        print(json.dumps({k: manifest[k] for k in ("model_id", "revision", "requested_revision", "quantization", "onnx")},
+                         ensure_ascii=False))
+    else:
+        manifest = verify(args.path, expected_model_id=args.model)
+        print(f"OK: {manifest['model_id']} ({len(manifest['files'])} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Aho-Corasick 다중 문자열 매칭 오토마톤
+
+여러 키워드를 하나의 오토마톤으로 컴파일해 두면, 텍스트를 한 번만 훑어서(O(텍스트 길이 + 매칭 수))
+모든 키워드 출현 위치를 찾을 수 있습니다. 키워드 수가 늘어나도 검색 비용은 거의 늘지 않습니다.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 오토마톤
+
+    Args:
+        keywords: (키워드, payload) 목록. 같은 키워드가 여러 번 나오면 payload가 모두 보고됩니다.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+        for keyword, payload in keywords:
+            if keyword:
+                self._add(keyword, payload)
+        self._build()
+
+    def __len__(self) -> int:
+        """상태(노드) 수"""
+        return len(self._goto)
+
+    def _add(self, keyword: str, payload: Any):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(keyword), payload))
+
+    def _build(self):
+        """BFS로 실패 링크를 만들고 출력 집합을 실패 링크 방향으로 합침 (루트 자식의 실패 링크는 루트)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """텍스트의 모든 키워드 매칭을 (start, end, payload)로 반환 (end는 exclusive)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = index + 1
+                for length, payload in output[state]:
+                    yield end - length, end, payload
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """iter_matches의 리스트 버전"""
+        return list(self.iter_matches(text))
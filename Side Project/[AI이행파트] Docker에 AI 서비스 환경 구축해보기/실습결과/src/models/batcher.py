@@ -0,0 +1,444 @@
+"""
+마이크로 배칭 (Micro-batching)
+
+동시에 들어온 요청을 짧은 대기 시간(max_wait) 동안 모아 predict_batch 한 번으로 추론합니다.
+고정된 대기 시간은 저부하에서는 지연만 늘리고 피크에서는 배치가 너무 작으므로,
+AdaptiveBatchController가 관측된 도착률과 배치 크기별 추론 시간을 바탕으로
+목표 p99 지연을 넘지 않도록 max_wait / max_batch를 계속 조정합니다.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveBatchController:
+    """
+    부하 기반 배치 윈도우 컨트롤러
+
+    - 도착률: 도착 간격과 도착 건수의 EWMA로 추정 (rate = count / gap)
+    - 추론 시간: 배치 크기 b에 대해 latency(b) = intercept + per_item * b 를
+      지수 감쇠 가중 최소제곱으로 온라인 추정
+    - 꼬리 지연: 최근 (실측 / 예측) 비율의 99 분위수를 곱해 p99 추론 시간을 추정
+
+    결정 규칙:
+    - max_batch: p99 추론 시간이 목표 p99 안에 들어가는 가장 큰 배치
+    - max_wait: 도착률을 여유있게 처리할 수 있는 최소 배치가 차는 데 걸리는 시간
+      (저부하에서는 min_wait, 즉 바로 처리)
+
+    clock을 주입하거나 각 메서드에 now를 넘기면 결정적으로 동작하므로 시뮬레이션/테스트에 사용할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        target_p99: float = 0.2,
+        min_wait: float = 0.0,
+        max_wait_limit: float = 0.05,
+        max_batch_limit: int = 64,
+        initial_wait: float = 0.005,
+        initial_batch: int = 32,
+        alpha: float = 0.2,
+        headroom: float = 1.2,
+        tail_window: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.target_p99 = target_p99
+        self.min_wait = min_wait
+        self.max_wait_limit = max_wait_limit
+        self.max_batch_limit = max_batch_limit
+        self.alpha = alpha
+        self.headroom = headroom
+        self.clock = clock
+
+        self.max_wait = min(max(initial_wait, min_wait), max_wait_limit)
+        self.max_batch = min(initial_batch, max_batch_limit)
+        self.decisions = 0
+        self.last_rate = 0.0
+
+        # 도착률 추정 상태
+        self._gap = None
+        self._count = None
+        self._last_arrival = None
+
+        # 가중 최소제곱 누적값: sum(w), sum(w*b), sum(w*l), sum(w*b*b), sum(w*b*l)
+        self._sums = [0.0] * 5
+        self._ratios = deque(maxlen=tail_window)
+
+    def record_arrival(self, count: int = 1, now: Optional[float] = None):
+        """요청 도착 기록"""
+        now = self.clock() if now is None else now
+        if self._last_arrival is not None:
+            gap = max(now - self._last_arrival, 0.0)
+            if self._gap is None:
+                self._gap, self._count = gap, float(count)
+            else:
+                self._gap += self.alpha * (gap - self._gap)
+                self._count += self.alpha * (count - self._count)
+        self._last_arrival = now
+
+    def arrival_rate(self, now: Optional[float] = None) -> float:
+        """추정 도착률 (요청/초). 마지막 도착 이후 공백이 길어지면 그만큼 낮춰 잡습니다."""
+        if self._gap is None:
+            return 0.0
+        now = self.clock() if now is None else now
+        gap = max(self._gap, now - self._last_arrival, 1e-6)
+        return self._count / gap
+
+    def reconfigure(self, target_p99: float, min_wait: float, max_wait_limit: float, max_batch_limit: int):
+        """목표 p99와 탐색 범위 변경 (지연 모델 학습 상태는 유지)"""
+        self.target_p99 = target_p99
+        self.min_wait = min_wait
+        self.max_wait_limit = max_wait_limit
+        self.max_batch_limit = max_batch_limit
+        self.max_wait = min(max(self.max_wait, min_wait), max_wait_limit)
+        self.max_batch = min(self.max_batch, max_batch_limit)
+
+    def record_batch(self, batch_size: int, latency: float):
+        """배치 추론 시간 기록"""
+        if self._sums[0] > 0:
+            predicted = self.predict_latency(batch_size)
+            if predicted > 0:
+                self._ratios.append(latency / predicted)
+
+        decay = 1.0 - self.alpha
+        b, l = float(batch_size), float(latency)
+        for i, value in enumerate((1.0, b, l, b * b, b * l)):
+            self._sums[i] = self._sums[i] * decay + value
+
+    def _latency_model(self):
+        """(intercept, per_item) 추정값"""
+        w, sb, sl, sbb, sbl = self._sums
+        mean_b, mean_l = sb / w, sl / w
+        variance = sbb / w - mean_b * mean_b
+        if variance <= 1e-9:
+            # 한 가지 배치 크기만 관측된 경우: 배치 크기에 비례한다고 보수적으로 가정
+            return 0.0, mean_l / max(mean_b, 1.0)
+        per_item = max((sbl / w - mean_b * mean_l) / variance, 0.0)
+        intercept = max(mean_l - per_item * mean_b, 0.0)
+        return intercept, per_item
+
+    def predict_latency(self, batch_size: int) -> float:
+        """배치 크기별 평균 추론 시간 예측 (초)"""
+        if self._sums[0] <= 0:
+            return 0.0
+        intercept, per_item = self._latency_model()
+        return intercept + per_item * batch_size
+
+    def tail_factor(self) -> float:
+        """p99 / 평균 추론 시간 비율 추정"""
+        if len(self._ratios) < 10:
+            return 1.0
+        ratios = sorted(self._ratios)
+        return max(1.0, ratios[min(len(ratios) - 1, int(math.ceil(0.99 * len(ratios))) - 1)])
+
+    def decide(self, now: Optional[float] = None):
+        """현재 관측값으로 max_wait / max_batch 재계산"""
+        if self._sums[0] <= 0:
+            return self.max_wait, self.max_batch
+
+        tail = self.tail_factor()
+        budget = self.target_p99 - self.min_wait
+
+        # 목표 p99 안에 들어가는 가장 큰 배치 (추론 시간은 배치 크기에 대해 단조 증가)
+        batch_cap = 1
+        for size in range(2, self.max_batch_limit + 1):
+            if self.predict_latency(size) * tail > budget:
+                break
+            batch_cap = size
+
+        # 도착률을 headroom만큼 여유있게 처리할 수 있는 최소 배치
+        rate = self.arrival_rate(now)
+        self.last_rate = rate
+        needed = batch_cap
+        for size in range(1, batch_cap + 1):
+            if size / max(self.predict_latency(size), 1e-9) >= rate * self.headroom:
+                needed = size
+                break
+
+        wait = (needed - 1) / rate if rate > 0 else 0.0
+        upper = min(self.max_wait_limit, max(self.min_wait, self.target_p99 - self.predict_latency(needed) * tail))
+        self.max_wait = min(max(wait, self.min_wait), upper)
+        self.max_batch = batch_cap
+        self.decisions += 1
+        return self.max_wait, self.max_batch
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """컨트롤러 결정/추정값"""
+        intercept, per_item = self._latency_model() if self._sums[0] > 0 else (0.0, 0.0)
+        return {
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "max_batch": self.max_batch,
+            "arrival_rate": round(self.last_rate, 3),
+            "latency_intercept_ms": round(intercept * 1000, 3),
+            "latency_per_item_ms": round(per_item * 1000, 3),
+            "tail_factor": round(self.tail_factor(), 3),
+            "target_p99_ms": round(self.target_p99 * 1000, 3),
+            "decisions": self.decisions
+        }
+
+
+class MicroBatcher:
+    """
+    asyncio 기반 마이크로 배처
+
+    submit()으로 들어온 텍스트를 큐에 넣고, 단일 소비자 루프가 첫 요청 이후 max_wait 동안
+    (또는 max_batch개가 찰 때까지) 모아서 predict_batch를 스레드풀에서 실행합니다.
+    추론은 한 번에 한 배치만 실행되므로 추론 중 도착한 요청은 다음 배치로 자연스럽게 모입니다.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[Any]],
+        controller: Optional[AdaptiveBatchController] = None,
+        max_wait: float = 0.005,
+        max_batch: int = 32
+    ):
+        self.predict_batch = predict_batch
+        self.controller = controller
+        # 컨트롤러가 있으면 컨트롤러의 초기값으로 시작
+        self.max_wait = controller.max_wait if controller is not None else max_wait
+        self.max_batch = controller.max_batch if controller is not None else max_batch
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.items = 0
+        self.last_batch_size = 0
+        self.last_batch_latency = 0.0
+
+    def reconfigure(self, max_wait: float, max_batch: int):
+        """
+        대기 시간/배치 크기 변경 (설정 핫 리로드)
+
+        컨트롤러가 있으면 이 값은 다음 결정 전까지의 시작값이고, 이후에는 컨트롤러가 결정합니다.
+        """
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+
+    @property
+    def queue_depth(self) -> int:
+        """처리 대기 중인 요청 수"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """소비자 루프 시작"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Micro-batcher started")
+
+    async def stop(self):
+        """소비자 루프 종료 (대기 중인 요청은 취소)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        logger.info("Micro-batcher stopped")
+
+    async def submit(self, text: str) -> Any:
+        """텍스트 한 건 추론"""
+        return (await self.submit_many([text]))[0]
+
+    async def submit_many(self, texts: Sequence[str]) -> List[Any]:
+        """여러 텍스트 추론 (다른 요청과 같은 배치로 묶일 수 있음)"""
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+
+        if self.controller is not None:
+            self.controller.record_arrival(len(futures))
+
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(items) < self.max_batch:
+                if not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(items)
+
+    async def _dispatch(self, items):
+        # 대기 중 취소된 요청(클라이언트 연결 종료)은 제외
+        items = [(text, future) for text, future in items if not future.done()]
+        if not items:
+            return
+
+        texts = [text for text, _ in items]
+        start_time = time.monotonic()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.predict_batch, texts)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            latency = time.monotonic() - start_time
+            self.batches += 1
+            self.items += len(items)
+            self.last_batch_size = len(items)
+            self.last_batch_latency = latency
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+        if self.controller is not None:
+            self.controller.record_batch(len(items), latency)
+            self.max_wait, self.max_batch = self.controller.decide()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """배처 상태 및 컨트롤러 결정값"""
+        metrics = {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_latency_ms": round(self.last_batch_latency * 1000, 3),
+            "adaptive": self.controller is not None
+        }
+        if self.controller is not None:
+            metrics["controller"] = self.controller.get_metrics()
+        return metrics
+
+
+def simulate(
+    controller: AdaptiveBatchController,
+    arrivals: Sequence[float],
+    service_time: Callable[[int], float]
+) -> Dict[str, Any]:
+    """
+    MicroBatcher 정책의 결정적 이산 사건 시뮬레이션
+
+    Args:
+        controller: 시뮬레이션할 컨트롤러 (가상 시간으로 구동)
+        arrivals: 정렬된 요청 도착 시각 목록 (초)
+        service_time: 배치 크기 -> 추론 시간 (초)
+
+    Returns:
+        {"latencies": [...], "p50": ..., "p99": ..., "mean_batch_size": ..., "trace": [...]}
+    """
+    queue = deque()
+    latencies = []
+    trace = []
+    now = 0.0
+    i = 0
+
+    def admit(limit: float) -> int:
+        nonlocal i
+        start = i
+        while i < len(arrivals) and arrivals[i] <= limit:
+            queue.append(arrivals[i])
+            controller.record_arrival(1, now=arrivals[i])
+            i += 1
+        return i - start
+
+    while i < len(arrivals) or queue:
+        if not queue:
+            now = max(now, arrivals[i])
+            admit(now)
+
+        # 첫 요청을 꺼낸 시점부터 max_wait 동안 또는 max_batch가 찰 때까지 수집
+        max_wait, max_batch = controller.max_wait, controller.max_batch
+        deadline = now + max_wait
+        dispatch_at = deadline
+        while len(queue) < max_batch and i < len(arrivals) and arrivals[i] <= deadline:
+            queue.append(arrivals[i])
+            controller.record_arrival(1, now=arrivals[i])
+            i += 1
+        if len(queue) >= max_batch:
+            dispatch_at = max(now, queue[max_batch - 1])
+
+        batch = [queue.popleft() for _ in range(min(max_batch, len(queue)))]
+        latency = service_time(len(batch))
+        done = dispatch_at + latency
+        latencies.extend(done - arrived for arrived in batch)
+
+        controller.record_batch(len(batch), latency)
+        controller.decide(now=done)
+        trace.append({
+            "time": done,
+            "batch_size": len(batch),
+            "max_wait": max_wait,
+            "max_batch": max_batch
+        })
+
+        admit(done)
+        now = done
+
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+    return {
+        "latencies": latencies,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "mean_batch_size": len(latencies) / len(trace) if trace else 0.0,
+        "trace": trace
+    }
+
+
+def create_batcher(predict_batch: Callable[[List[str]], List[Any]], settings) -> MicroBatcher:
+    """Settings 기반 MicroBatcher 생성 (adaptive_batching이면 컨트롤러 포함)"""
+    controller = None
+    if settings.adaptive_batching:
+        controller = AdaptiveBatchController(
+            target_p99=settings.batch_target_p99_ms / 1000,
+            min_wait=settings.batch_min_wait_ms / 1000,
+            max_wait_limit=settings.batch_max_wait_limit_ms / 1000,
+            max_batch_limit=settings.batch_max_size_limit,
+            initial_wait=settings.batch_max_wait_ms / 1000,
+            initial_batch=settings.batch_max_size
+        )
+
+    return MicroBatcher(
+        predict_batch,
+        controller=controller,
+        max_wait=settings.batch_max_wait_ms / 1000,
+        max_batch=settings.batch_max_size
+    )
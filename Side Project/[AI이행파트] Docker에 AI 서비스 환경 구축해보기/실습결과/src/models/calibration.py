@@ -0,0 +1,237 @@
+"""
+확률 보정 (Temperature Scaling)
+
+softmax 확률은 보통 과신(overconfident)되어 있어서 confidence 0.9가 실제 정답률 90%를 뜻하지 않습니다.
+라벨 데이터로 온도 T 하나를 학습해 보정된 확률 softmax(log p / T)를 반환합니다.
+
+- 학습: 라벨 파일(.jsonl: {"text": ..., "label": "negative|neutral|positive" 또는 원본 레이블})로
+  감정 그룹(negative/neutral/positive) 확률의 NLL을 최소화하는 T를 탐색 (원본 레이블 순위는 그대로 유지)
+- 저장: 모델 옆 calibration.json (모델 이름, 온도, 보정 전/후 ECE·NLL 리포트)
+- 적용: 배치 확률 행렬 전체에 NumPy 벡터 연산 한 번 (argmax/원본 레이블 순위 불변)
+
+사용 예:
+    cd src
+    python -m models.calibration \\
+        --data ../data/labelled_reviews.jsonl \\
+        --output /opt/model/calibration.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FILE = "calibration.json"
+
+# 온도 탐색 범위 (log T)
+_LOG_T_RANGE = (np.log(0.05), np.log(20.0))
+
+
+def _log_probs(probs: np.ndarray) -> np.ndarray:
+    return np.log(np.clip(probs, 1e-12, None))
+
+
+def scale_temperature(probs: np.ndarray, temperature: float) -> np.ndarray:
+    """(N, L) 확률 행렬에 온도 적용: softmax(log p / T)"""
+    logits = _log_probs(probs) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits.astype(np.float32, copy=False)
+
+
+def negative_log_likelihood(probs: np.ndarray, labels: np.ndarray) -> float:
+    """정답 클래스 확률의 평균 음의 로그우도"""
+    return float(-_log_probs(probs[np.arange(len(labels)), labels]).mean())
+
+
+def expected_calibration_error(probs: np.ndarray, labels: np.ndarray, bins: int = 15) -> float:
+    """ECE: top-1 confidence 구간별 |정답률 - 평균 confidence|의 표본 수 가중 평균"""
+    confidence = probs.max(axis=1)
+    correct = (probs.argmax(axis=1) == labels).astype(np.float64)
+    bucket = np.minimum((confidence * bins).astype(np.int64), bins - 1)
+
+    conf_sum = np.bincount(bucket, weights=confidence, minlength=bins)
+    correct_sum = np.bincount(bucket, weights=correct, minlength=bins)
+    return float(np.abs(correct_sum - conf_sum).sum() / max(len(labels), 1))
+
+
+def calibration_metrics(probs: np.ndarray, labels: np.ndarray, bins: int = 15) -> Dict[str, float]:
+    return {
+        "ece": round(expected_calibration_error(probs, labels, bins), 4),
+        "nll": round(negative_log_likelihood(probs, labels), 4),
+        "accuracy": round(float((probs.argmax(axis=1) == labels).mean()), 4)
+    }
+
+
+class TemperatureCalibrator:
+    """
+    온도 보정기
+
+    Args:
+        temperature: T > 1이면 확률을 평평하게 (과신 완화), T < 1이면 뾰족하게
+    """
+
+    method = "temperature"
+
+    def __init__(self, temperature: float = 1.0, metadata: Optional[Dict[str, Any]] = None):
+        if temperature <= 0:
+            raise ValueError("temperature는 0보다 커야 합니다")
+        self.temperature = float(temperature)
+        self.metadata = metadata or {}
+
+    def apply(self, probs: np.ndarray) -> np.ndarray:
+        """(N, L) 원본 레이블 확률 행렬 보정 (T=1이면 그대로 반환)"""
+        if self.temperature == 1.0 or len(probs) == 0:
+            return probs
+        return scale_temperature(probs, self.temperature)
+
+    @classmethod
+    def fit(
+        cls,
+        probs: np.ndarray,
+        labels: np.ndarray,
+        projection: Optional[np.ndarray] = None,
+        steps: int = 60
+    ) -> "TemperatureCalibrator":
+        """
+        NLL을 최소화하는 온도 탐색 (log T 격자 탐색 후 황금분할 탐색으로 세분화)
+
+        Args:
+            probs: (N, L) 보정 전 원본 레이블 확률
+            labels: (N,) 정답 인덱스 (projection이 있으면 그룹 인덱스)
+            projection: (L, G) 원본 레이블 → 그룹 사영 행렬 (그룹 확률 기준으로 학습할 때)
+        """
+        def loss(log_t: float) -> float:
+            scaled = scale_temperature(probs, float(np.exp(log_t)))
+            if projection is not None:
+                scaled = scaled @ projection
+            return negative_log_likelihood(scaled, labels)
+
+        grid = np.linspace(*_LOG_T_RANGE, steps)
+        losses = [loss(x) for x in grid]
+        best = int(np.argmin(losses))
+        low, high = grid[max(best - 1, 0)], grid[min(best + 1, steps - 1)]
+
+        ratio = (np.sqrt(5) - 1) / 2
+        for _ in range(40):
+            a, b = high - ratio * (high - low), low + ratio * (high - low)
+            if loss(a) < loss(b):
+                high = b
+            else:
+                low = a
+        return cls(float(np.exp((low + high) / 2)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"method": self.method, "temperature": round(self.temperature, 6), **self.metadata}
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "TemperatureCalibrator":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("method") != cls.method:
+            raise ValueError(f"지원하지 않는 보정 방식입니다: {data.get('method')}")
+        metadata = {k: v for k, v in data.items() if k not in ("method", "temperature")}
+        return cls(data["temperature"], metadata)
+
+
+def find_calibration(settings) -> Optional[str]:
+    """사용할 calibration.json 경로 (CALIBRATION_PATH, 없으면 번들 아티팩트 옆 파일)"""
+    if settings.calibration_path:
+        return settings.calibration_path
+    if settings.model_artifact_path:
+        path = os.path.join(settings.model_artifact_path, CALIBRATION_FILE)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_calibrator(settings, model_name: str) -> Optional[TemperatureCalibrator]:
+    """설정된 보정 파일 로드 (다른 모델용이면 무시하고 경고)"""
+    if not settings.calibration_enabled:
+        return None
+    path = find_calibration(settings)
+    if path is None:
+        return None
+
+    calibrator = TemperatureCalibrator.load(path)
+    fitted_for = calibrator.metadata.get("model_id")
+    if fitted_for and fitted_for != model_name:
+        logger.warning(f"Ignoring calibration {path}: fitted for {fitted_for}, not {model_name}")
+        return None
+    logger.info(f"Calibration loaded: T={calibrator.temperature:.3f} ({path})")
+    return calibrator
+
+
+def fit_model_calibration(model, rows: List[Dict[str, str]], holdout: float = 0.2, seed: int = 42) -> TemperatureCalibrator:
+    """
+    SentimentModelImproved의 온도를 라벨 데이터로 학습하고 보정 전/후 지표를 metadata에 기록
+
+    holdout 비율만큼은 학습에서 빼고 보정 전/후 ECE를 그 데이터로 측정합니다.
+    """
+    from models.sentiment_model_improved import SENTIMENT_GROUPS
+
+    groups = list(SENTIMENT_GROUPS)
+    rows = list(rows)
+    random.Random(seed).shuffle(rows)
+
+    labels = []
+    for row in rows:
+        label = model.label_mapping.get(row["label"], row["label"])
+        if label not in groups:
+            raise ValueError(f"알 수 없는 레이블입니다: {row['label']}")
+        labels.append(groups.index(label))
+    labels = np.asarray(labels)
+
+    probs = model.predict_scores_batch([row["text"] for row in rows], calibrated=False)[0]
+    split = len(rows) - int(len(rows) * holdout) if len(rows) >= 10 else len(rows)
+    fit_probs, fit_labels = probs[:split], labels[:split]
+    eval_probs, eval_labels = (probs[split:], labels[split:]) if split < len(rows) else (fit_probs, fit_labels)
+
+    calibrator = TemperatureCalibrator.fit(fit_probs, fit_labels, model.group_projection)
+    calibrator.metadata = {
+        "model_id": model.model_name,
+        "target": "sentiment_groups",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "samples": {"fit": int(split), "eval": int(len(eval_labels))},
+        "before": calibration_metrics(eval_probs @ model.group_projection, eval_labels),
+        "after": calibration_metrics(calibrator.apply(eval_probs) @ model.group_projection, eval_labels)
+    }
+    return calibrator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit temperature scaling for the sentiment model")
+    parser.add_argument("--data", required=True, help="Labelled .jsonl ({\"text\", \"label\"})")
+    parser.add_argument("--output", required=True, help="calibration.json path (next to the model)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out to report ECE")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from models.distillation import load_labelled
+    from models.sentiment_model_improved import SentimentModelImproved
+
+    model = SentimentModelImproved()
+    calibrator = fit_model_calibration(model, load_labelled(args.data), holdout=args.holdout)
+    calibrator.save(args.output)
+
+    before, after = calibrator.metadata["before"], calibrator.metadata["after"]
+    print(f"temperature: {calibrator.temperature:.3f}")
+    print(f"ECE: {before['ece']:.4f} -> {after['ece']:.4f}   NLL: {before['nll']:.4f} -> {after['nll']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+요청 중복 제거 (Request deduplication)
+
+1. 배치 내 중복: 정규화된 텍스트 기준으로 고유 텍스트만 추론하고 결과를 원래 순서로 분배
+2. 요청 간 중복: 동일 텍스트에 대한 동시 요청은 하나의 추론을 공유 (single-flight)
+"""
+
+import asyncio
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """중복 판단용 텍스트 정규화 (유니코드 NFC + 공백 정리)
+
+    토크나이저는 공백 단위로 분리하므로 연속 공백을 하나로 합쳐도 예측 결과는 같습니다.
+    """
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def dedupe_texts(texts: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    배치 내 중복 텍스트 제거
+
+    Returns:
+        (unique_texts, index) - index[i]는 texts[i]에 해당하는 unique_texts의 위치
+    """
+    positions: Dict[str, int] = {}
+    unique_texts: List[str] = []
+    index: List[int] = []
+
+    for text in texts:
+        key = normalize_text(text)
+        pos = positions.get(key)
+        if pos is None:
+            pos = len(unique_texts)
+            positions[key] = pos
+            unique_texts.append(key)
+        index.append(pos)
+
+    return unique_texts, index
+
+
+def scatter_results(results: List[Dict[str, Any]], index: List[int]) -> List[Dict[str, Any]]:
+    """고유 텍스트의 결과를 원래 요청 순서로 분배 (중복 항목은 복사본)"""
+    return [dict(results[pos]) for pos in index]
+
+
+class SingleFlight:
+    """
+    동일 키에 대한 동시 실행을 하나로 합치는 asyncio 기반 single-flight
+
+    먼저 도착한 호출이 작업을 시작하고, 작업이 끝나기 전에 들어온 같은 키의 호출은
+    새로 실행하지 않고 같은 결과를 기다립니다. 작업은 Task로 실행되므로 먼저 온
+    호출이 취소(클라이언트 연결 종료)되어도 나머지 호출은 결과를 받습니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def _register(self, key: str, future: asyncio.Future):
+        self._inflight[key] = future
+
+        def _cleanup(fut, key=key):
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+            # 모든 대기자가 취소된 경우에도 "exception was never retrieved" 경고 방지
+            if not fut.cancelled():
+                fut.exception()
+
+        future.add_done_callback(_cleanup)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key에 대해 fn을 한 번만 실행하고 결과를 공유"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._register(key, future)
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def do_many(
+        self,
+        keys: List[str],
+        fn_batch: Callable[[List[str]], Awaitable[List[Any]]]
+    ) -> List[Any]:
+        """
+        여러 키를 한 번에 처리 (keys는 중복이 없어야 함)
+
+        이미 진행 중인 키는 기존 작업을 기다리고, 나머지 키만 모아 fn_batch를 한 번 호출합니다.
+        """
+        owned = [key for key in keys if key not in self._inflight]
+        self.coalesced += len(keys) - len(owned)
+
+        if owned:
+            batch = asyncio.ensure_future(fn_batch(owned))
+            self.executed += len(owned)
+
+            async def _pick(position: int) -> Any:
+                return (await batch)[position]
+
+            for position, key in enumerate(owned):
+                self._register(key, asyncio.ensure_future(_pick(position)))
+
+        futures = [self._inflight[key] for key in keys]
+        return list(await asyncio.gather(*(asyncio.shield(f) for f in futures)))
+
+    def get_stats(self) -> Dict[str, int]:
+        """실행/병합 횟수 통계"""
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced
+        }
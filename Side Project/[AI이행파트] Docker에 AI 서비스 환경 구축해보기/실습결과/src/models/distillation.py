@@ -0,0 +1,391 @@
+"""
+다국어 감정분석 모델 지식 증류 (Knowledge Distillation)
+
+nlptown/bert-base-multilingual-uncased-sentiment (teacher, 12층/768차원)를
+층 수와 hidden 크기를 줄인 student 모델로 증류합니다.
+
+- 학습 데이터: 로컬에 준비한 라벨 없는 말뭉치 (teacher의 soft label로 학습)
+- 출력: save_pretrained 형식의 student 모델 + 토크나이저 + 증류 메타데이터
+- 평가: teacher 대비 일치율(정확도)과 지연시간/처리량 비교 리포트 (JSON + Markdown)
+
+사용 예:
+    cd src
+    python -m models.distillation \\
+        --corpus ../data/unlabeled_reviews.txt \\
+        --output ../models/student \\
+        --layers 4 --hidden 384 --epochs 3 \\
+        --eval-file ../data/labelled_reviews.jsonl
+
+학습된 student는 MODEL_VARIANT=student, STUDENT_MODEL_PATH=<output> 설정으로
+SentimentModelImproved에서 선택해 사용할 수 있습니다 (label_mapping은 teacher와 동일).
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+TEACHER_MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+# SentimentModelImproved의 다국어 label_mapping과 동일
+STAR_LABEL_MAPPING = {
+    '1 star': 'negative',
+    '2 stars': 'negative',
+    '3 stars': 'neutral',
+    '4 stars': 'positive',
+    '5 stars': 'positive'
+}
+
+
+def load_corpus(path: str) -> List[str]:
+    """라벨 없는 말뭉치 로드 (.txt: 한 줄에 한 문장, .jsonl: {"text": ...})"""
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                line = json.loads(line).get("text", "").strip()
+            if line:
+                texts.append(line)
+    return texts
+
+
+def load_labelled(path: str) -> List[Dict[str, str]]:
+    """라벨 데이터 로드 (.jsonl: {"text": ..., "label": "negative|neutral|positive"})"""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                rows.append({"text": row["text"], "label": row["label"]})
+    return rows
+
+
+def build_student(teacher, num_layers: int = 4, hidden_size: int = 384):
+    """
+    teacher 구성을 줄인 student 모델 생성
+
+    - hidden 크기가 같으면 임베딩과 teacher 층을 균등 간격으로 복사
+    - hidden 크기가 작으면 teacher 임베딩을 PCA로 투영해 초기화 (어휘 지식 보존)
+    """
+    teacher_config = teacher.config
+    config = copy.deepcopy(teacher_config)
+    config.num_hidden_layers = num_layers
+    if hidden_size != teacher_config.hidden_size:
+        config.hidden_size = hidden_size
+        config.num_attention_heads = max(1, hidden_size // 64)
+        config.intermediate_size = hidden_size * 4
+
+    student = AutoModelForSequenceClassification.from_config(config)
+    teacher_base, student_base = teacher.base_model, student.base_model
+
+    with torch.no_grad():
+        if hidden_size == teacher_config.hidden_size:
+            student_base.embeddings.load_state_dict(teacher_base.embeddings.state_dict())
+            teacher_layers = teacher_config.num_hidden_layers
+            for i, layer in enumerate(student_base.encoder.layer):
+                source = round(i * (teacher_layers - 1) / max(num_layers - 1, 1))
+                layer.load_state_dict(teacher_base.encoder.layer[source].state_dict())
+        else:
+            word = teacher_base.embeddings.word_embeddings.weight
+            _, _, components = torch.pca_lowrank(word, q=hidden_size, center=False)
+            student_base.embeddings.word_embeddings.weight.copy_(word @ components)
+            student_base.embeddings.position_embeddings.weight.copy_(
+                teacher_base.embeddings.position_embeddings.weight @ components
+            )
+
+    logger.info(
+        f"Student: {num_layers} layers / hidden {hidden_size} "
+        f"({count_parameters(student) / 1e6:.1f}M params, teacher {count_parameters(teacher) / 1e6:.1f}M)"
+    )
+    return student
+
+
+def count_parameters(model) -> int:
+    """파라미터 수"""
+    return sum(p.numel() for p in model.parameters())
+
+
+def _batches(items: List[Any], batch_size: int):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def predict_logits(model, tokenizer, texts: List[str], batch_size: int = 32, max_length: int = 128) -> torch.Tensor:
+    """텍스트 목록의 logits (N, num_labels)"""
+    model.eval()
+    outputs = []
+    with torch.no_grad():
+        for batch in _batches(texts, batch_size):
+            inputs = tokenizer(batch, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+            outputs.append(model(**inputs).logits)
+    return torch.cat(outputs) if outputs else torch.empty(0)
+
+
+def distill(
+    teacher,
+    student,
+    tokenizer,
+    texts: List[str],
+    epochs: int = 3,
+    batch_size: int = 32,
+    learning_rate: float = 5e-5,
+    temperature: float = 2.0,
+    max_length: int = 128,
+    seed: int = 42
+) -> List[Dict[str, float]]:
+    """
+    teacher soft label로 student 학습
+
+    손실: KL(softmax(teacher / T) || softmax(student / T)) * T^2
+    teacher logits는 학습 전에 한 번만 계산해 epoch마다 재사용합니다.
+
+    Returns:
+        epoch별 평균 손실 기록
+    """
+    random.seed(seed)
+    torch.manual_seed(seed)
+
+    logger.info(f"Computing teacher logits for {len(texts)} texts...")
+    teacher_logits = predict_logits(teacher, tokenizer, texts, batch_size, max_length)
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate)
+    history = []
+    order = list(range(len(texts)))
+
+    for epoch in range(epochs):
+        student.train()
+        random.shuffle(order)
+        losses = []
+
+        for indices in _batches(order, batch_size):
+            inputs = tokenizer(
+                [texts[i] for i in indices],
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors="pt"
+            )
+            student_logits = student(**inputs).logits
+            target = torch.nn.functional.softmax(teacher_logits[indices] / temperature, dim=-1)
+            loss = torch.nn.functional.kl_div(
+                torch.nn.functional.log_softmax(student_logits / temperature, dim=-1),
+                target,
+                reduction="batchmean"
+            ) * temperature ** 2
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+
+        mean_loss = sum(losses) / max(len(losses), 1)
+        history.append({"epoch": epoch + 1, "loss": round(mean_loss, 6)})
+        logger.info(f"Epoch {epoch + 1}/{epochs}: distillation loss {mean_loss:.4f}")
+
+    student.eval()
+    return history
+
+
+def export_student(student, tokenizer, output_dir: str, metadata: Dict[str, Any]):
+    """student 모델/토크나이저와 증류 메타데이터 저장"""
+    os.makedirs(output_dir, exist_ok=True)
+    student.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, "distillation.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    logger.info(f"Student exported to {output_dir}")
+
+
+def _latency_stats(model, tokenizer, texts: List[str], batch_size: int, max_length: int) -> Dict[str, float]:
+    """단건 지연시간(p50/p95)과 배치 처리량 측정"""
+    model.eval()
+    timings = []
+    with torch.no_grad():
+        for text in texts:
+            inputs = tokenizer(text, truncation=True, max_length=max_length, return_tensors="pt")
+            start = time.perf_counter()
+            model(**inputs)
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    predict_logits(model, tokenizer, texts, batch_size, max_length)
+    batch_time = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "latency_p50_ms": round(statistics.median(timings) * 1000, 3),
+        "latency_p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))] * 1000, 3),
+        "throughput_texts_per_sec": round(len(texts) / batch_time, 2) if batch_time > 0 else 0.0
+    }
+
+
+def evaluate(
+    teacher,
+    student,
+    tokenizer,
+    texts: List[str],
+    labels: Optional[List[str]] = None,
+    batch_size: int = 32,
+    max_length: int = 128,
+    latency_samples: int = 100
+) -> Dict[str, Any]:
+    """
+    teacher 대비 student 평가
+
+    - agreement: teacher 예측을 정답으로 본 일치율 (별점 5단계 / 감정 3단계)
+    - accuracy: labels(negative/neutral/positive)가 있으면 각 모델의 정확도
+    - latency: 단건 지연시간과 배치 처리량
+    """
+    id2label = teacher.config.id2label
+
+    def to_sentiment(index: int) -> str:
+        return STAR_LABEL_MAPPING.get(id2label.get(index, ''), 'neutral')
+
+    teacher_pred = predict_logits(teacher, tokenizer, texts, batch_size, max_length).argmax(dim=-1).tolist()
+    student_pred = predict_logits(student, tokenizer, texts, batch_size, max_length).argmax(dim=-1).tolist()
+    teacher_sentiment = [to_sentiment(i) for i in teacher_pred]
+    student_sentiment = [to_sentiment(i) for i in student_pred]
+
+    report = {
+        "num_texts": len(texts),
+        "agreement": {
+            "star": round(sum(t == s for t, s in zip(teacher_pred, student_pred)) / len(texts), 4),
+            "sentiment": round(sum(t == s for t, s in zip(teacher_sentiment, student_sentiment)) / len(texts), 4)
+        },
+        "teacher": {
+            "layers": teacher.config.num_hidden_layers,
+            "hidden_size": teacher.config.hidden_size,
+            "parameters": count_parameters(teacher)
+        },
+        "student": {
+            "layers": student.config.num_hidden_layers,
+            "hidden_size": student.config.hidden_size,
+            "parameters": count_parameters(student)
+        }
+    }
+
+    if labels is not None:
+        report["teacher"]["accuracy"] = round(sum(p == l for p, l in zip(teacher_sentiment, labels)) / len(labels), 4)
+        report["student"]["accuracy"] = round(sum(p == l for p, l in zip(student_sentiment, labels)) / len(labels), 4)
+
+    sample = texts[:latency_samples]
+    report["teacher"].update(_latency_stats(teacher, tokenizer, sample, batch_size, max_length))
+    report["student"].update(_latency_stats(student, tokenizer, sample, batch_size, max_length))
+    report["speedup_p50"] = round(
+        report["teacher"]["latency_p50_ms"] / max(report["student"]["latency_p50_ms"], 1e-6), 2
+    )
+    return report
+
+
+def write_report(report: Dict[str, Any], output_dir: str):
+    """평가 리포트 저장 (evaluation_report.json + EVALUATION.md)"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "evaluation_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    teacher, student = report["teacher"], report["student"]
+    rows = [
+        ("층 수", "layers"),
+        ("hidden 크기", "hidden_size"),
+        ("파라미터 수", "parameters"),
+        ("정확도 (라벨 데이터)", "accuracy"),
+        ("단건 지연 p50 (ms)", "latency_p50_ms"),
+        ("단건 지연 p95 (ms)", "latency_p95_ms"),
+        ("배치 처리량 (texts/s)", "throughput_texts_per_sec")
+    ]
+    lines = [
+        "# Student 모델 평가 리포트",
+        "",
+        f"- 평가 텍스트 수: {report['num_texts']}",
+        f"- teacher 일치율 (별점): {report['agreement']['star']:.2%}",
+        f"- teacher 일치율 (감정 3단계): {report['agreement']['sentiment']:.2%}",
+        f"- 단건 지연 개선 (p50): {report['speedup_p50']}x",
+        "",
+        "| 항목 | Teacher | Student |",
+        "|------|---------|---------|"
+    ]
+    for title, key in rows:
+        lines.append(f"| {title} | {teacher.get(key, '-')} | {student.get(key, '-')} |")
+
+    with open(os.path.join(output_dir, "EVALUATION.md"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the multilingual sentiment model into a compact student")
+    parser.add_argument("--corpus", required=True, help="Unlabeled corpus (.txt one text per line, or .jsonl)")
+    parser.add_argument("--output", required=True, help="Output directory for the student model")
+    parser.add_argument("--teacher", default=TEACHER_MODEL_NAME, help="Teacher model name or path")
+    parser.add_argument("--cache-dir", default=None, help="Hugging Face cache directory")
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--hidden", type=int, default=384)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--eval-file", default=None, help="Labelled .jsonl for accuracy ({\"text\", \"label\"})")
+    parser.add_argument("--eval-fraction", type=float, default=0.1, help="Held-out corpus fraction when no eval file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.teacher, cache_dir=args.cache_dir)
+    teacher = AutoModelForSequenceClassification.from_pretrained(args.teacher, cache_dir=args.cache_dir).eval()
+
+    texts = load_corpus(args.corpus)
+    random.Random(42).shuffle(texts)
+
+    eval_labels = None
+    if args.eval_file:
+        labelled = load_labelled(args.eval_file)
+        eval_texts = [row["text"] for row in labelled]
+        eval_labels = [row["label"] for row in labelled]
+        train_texts = texts
+    else:
+        held_out = max(1, int(len(texts) * args.eval_fraction))
+        eval_texts, train_texts = texts[:held_out], texts[held_out:]
+
+    student = build_student(teacher, num_layers=args.layers, hidden_size=args.hidden)
+    history = distill(
+        teacher, student, tokenizer, train_texts,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        temperature=args.temperature,
+        max_length=args.max_length
+    )
+
+    export_student(student, tokenizer, args.output, {
+        "teacher": args.teacher,
+        "layers": args.layers,
+        "hidden_size": args.hidden,
+        "train_texts": len(train_texts),
+        "temperature": args.temperature,
+        "history": history
+    })
+
+    report = evaluate(
+        teacher, student, tokenizer, eval_texts, eval_labels,
+        batch_size=args.batch_size,
+        max_length=args.max_length
+    )
+    write_report(report, args.output)
+    logger.info(f"Evaluation report written to {args.output}/EVALUATION.md")
+
+
+if __name__ == "__main__":
+    main()
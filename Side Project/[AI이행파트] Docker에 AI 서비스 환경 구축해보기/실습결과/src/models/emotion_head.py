@@ -0,0 +1,245 @@
+"""
+감정 범주(emotion) 분류 헤드
+
+감정 극성(긍정/부정/중립) 모델의 인코더 출력을 재사용하는 다중 레이블 분류기입니다.
+텍스트마다 BERT를 한 번 더 실행하지 않고, 같은 배치 forward에서 나온 문장 벡터
+(pooler 출력, 없으면 마지막 hidden state의 첫 토큰)에 선형층 하나를 더 적용하므로
+추가 비용은 (N, hidden) x (hidden, 감정 수) 행렬곱 하나입니다.
+
+- 학습: 라벨 파일(.jsonl: {"text": ..., "emotions": ["joy", "surprise"]})의 문장 벡터를 한 번 계산하고
+  인코더는 고정한 채 레이블별 sigmoid + BCE로 선형층만 학습 (한 문장에 여러 감정 가능)
+- 저장: emotion_head.pt (가중치 + 레이블, hidden 크기, 모델 이름, 평가 지표)
+- 적용: SentimentModelImproved가 EMOTION_HEAD_PATH(없으면 번들 아티팩트 옆 파일)를 로드하면
+  predict/predict_batch 결과에 "emotions"가 함께 계산됨
+
+사용 예:
+    cd src
+    python -m models.emotion_head \\
+        --data ../data/emotions.jsonl \\
+        --output /opt/model/emotion_head.pt
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+EMOTION_HEAD_FILE = "emotion_head.pt"
+
+
+class EmotionHead(torch.nn.Module):
+    """
+    문장 벡터 → 감정 레이블별 독립 확률 (sigmoid)
+
+    Args:
+        hidden_size: 인코더 문장 벡터 크기
+        labels: 감정 레이블 (출력 열 순서)
+        metadata: 학습 정보 (model_id, 평가 지표 등)
+    """
+
+    def __init__(self, hidden_size: int, labels: Sequence[str], metadata: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        if not labels:
+            raise ValueError("감정 레이블이 비어있습니다")
+        self.hidden_size = hidden_size
+        self.labels = list(labels)
+        self.metadata = metadata or {}
+        self.linear = torch.nn.Linear(hidden_size, len(self.labels))
+
+    def forward(self, features: torch.Tensor) -> torch.Tensor:
+        return self.linear(features)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """(N, hidden) 문장 벡터 → (N, 감정 수) float32 확률"""
+        with torch.no_grad():
+            logits = self(torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32)))
+        return torch.sigmoid(logits).numpy()
+
+    @classmethod
+    def fit(
+        cls,
+        features: np.ndarray,
+        targets: np.ndarray,
+        labels: Sequence[str],
+        epochs: int = 300,
+        lr: float = 0.01,
+        weight_decay: float = 1e-4,
+        seed: int = 42
+    ) -> "EmotionHead":
+        """
+        고정된 문장 벡터로 선형층 학습 (전체 배치 Adam, 레이블별 BCE)
+
+        Args:
+            features: (N, hidden) 문장 벡터
+            targets: (N, 감정 수) 0/1 행렬
+        """
+        torch.manual_seed(seed)
+        head = cls(features.shape[1], labels)
+        x = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+        y = torch.from_numpy(np.ascontiguousarray(targets, dtype=np.float32))
+        # 드문 감정이 항상 0으로 학습되지 않도록 양성 가중치 (음성 수 / 양성 수)
+        positives = y.sum(dim=0).clamp(min=1.0)
+        loss_fn = torch.nn.BCEWithLogitsLoss(pos_weight=(len(y) - positives) / positives)
+        optimizer = torch.optim.Adam(head.parameters(), lr=lr, weight_decay=weight_decay)
+
+        head.train()
+        for _ in range(epochs):
+            optimizer.zero_grad()
+            loss = loss_fn(head(x), y)
+            loss.backward()
+            optimizer.step()
+        return head.eval()
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        torch.save({
+            "state_dict": self.state_dict(),
+            "hidden_size": self.hidden_size,
+            "labels": self.labels,
+            "metadata": self.metadata
+        }, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EmotionHead":
+        data = torch.load(path, map_location="cpu", weights_only=True)
+        head = cls(data["hidden_size"], data["labels"], data.get("metadata"))
+        head.load_state_dict(data["state_dict"])
+        return head.eval()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"labels": self.labels, "hidden_size": self.hidden_size, **self.metadata}
+
+
+def emotion_metrics(probs: np.ndarray, targets: np.ndarray, threshold: float = 0.5) -> Dict[str, float]:
+    """다중 레이블 지표: micro/macro F1, 전체 레이블 일치율"""
+    predicted = probs >= threshold
+    actual = targets.astype(bool)
+    tp = (predicted & actual).sum(axis=0)
+    fp = (predicted & ~actual).sum(axis=0)
+    fn = (~predicted & actual).sum(axis=0)
+
+    def f1(tp, fp, fn):
+        return np.where(2 * tp + fp + fn > 0, 2 * tp / np.maximum(2 * tp + fp + fn, 1), 1.0)
+
+    return {
+        "micro_f1": round(float(f1(tp.sum(), fp.sum(), fn.sum())), 4),
+        "macro_f1": round(float(f1(tp, fp, fn).mean()), 4),
+        "exact_match": round(float((predicted == actual).all(axis=1).mean()), 4)
+    }
+
+
+def find_emotion_head(settings) -> Optional[str]:
+    """사용할 emotion_head.pt 경로 (EMOTION_HEAD_PATH, 없으면 번들 아티팩트 옆 파일)"""
+    if settings.emotion_head_path:
+        return settings.emotion_head_path
+    if settings.model_artifact_path:
+        path = os.path.join(settings.model_artifact_path, EMOTION_HEAD_FILE)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_emotion_head(settings, model_name: str, hidden_size: int) -> Optional[EmotionHead]:
+    """설정된 감정 헤드 로드 (다른 모델의 인코더로 학습된 헤드면 무시하고 경고)"""
+    path = find_emotion_head(settings)
+    if path is None:
+        return None
+
+    head = EmotionHead.load(path)
+    trained_for = head.metadata.get("model_id")
+    if trained_for and trained_for != model_name:
+        logger.warning(f"Ignoring emotion head {path}: trained for {trained_for}, not {model_name}")
+        return None
+    if head.hidden_size != hidden_size:
+        logger.warning(f"Ignoring emotion head {path}: hidden size {head.hidden_size}, model has {hidden_size}")
+        return None
+    logger.info(f"Emotion head loaded: {', '.join(head.labels)} ({path})")
+    return head
+
+
+def load_emotion_rows(path: str) -> List[Dict[str, Any]]:
+    """감정 라벨 데이터 로드 (.jsonl: {"text": ..., "emotions": ["joy", ...]}, 빈 목록 허용)"""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                rows.append({"text": row["text"], "emotions": list(row.get("emotions", []))})
+    return rows
+
+
+def fit_model_emotion_head(
+    model,
+    rows: List[Dict[str, Any]],
+    labels: Optional[Sequence[str]] = None,
+    holdout: float = 0.2,
+    threshold: float = 0.5,
+    seed: int = 42,
+    **fit_options
+) -> EmotionHead:
+    """
+    SentimentModelImproved의 인코더 출력으로 감정 헤드를 학습하고 평가 지표를 metadata에 기록
+
+    Args:
+        labels: 감정 레이블 순서 (None이면 데이터에 나온 레이블을 정렬해서 사용)
+        holdout: 학습에서 빼고 지표 측정에 쓰는 비율
+    """
+    rows = list(rows)
+    random.Random(seed).shuffle(rows)
+    labels = list(labels) if labels else sorted({emotion for row in rows for emotion in row["emotions"]})
+    unknown = {emotion for row in rows for emotion in row["emotions"]} - set(labels)
+    if unknown:
+        raise ValueError(f"레이블 목록에 없는 감정입니다: {', '.join(sorted(unknown))}")
+
+    targets = np.zeros((len(rows), len(labels)), dtype=np.float32)
+    for i, row in enumerate(rows):
+        for emotion in row["emotions"]:
+            targets[i, labels.index(emotion)] = 1.0
+    features = model.encode_features([row["text"] for row in rows])
+
+    split = max(1, int(len(rows) * (1 - holdout)))
+    head = EmotionHead.fit(features[:split], targets[:split], labels, seed=seed, **fit_options)
+    eval_features, eval_targets = (features[split:], targets[split:]) if split < len(rows) else (features, targets)
+    head.metadata = {
+        "model_id": model.model_name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "samples": {"fit": int(split), "eval": int(len(eval_targets))},
+        "threshold": threshold,
+        "eval": emotion_metrics(head.predict_proba(eval_features), eval_targets, threshold)
+    }
+    return head
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train an emotion head on the sentiment model's encoder")
+    parser.add_argument("--data", required=True, help="Labelled .jsonl ({\"text\", \"emotions\": [...]})")
+    parser.add_argument("--output", required=True, help="emotion_head.pt path (next to the model)")
+    parser.add_argument("--labels", nargs="+", help="Emotion labels in output order (default: from the data)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out to report F1")
+    parser.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from models.sentiment_model_improved import SentimentModelImproved
+
+    model = SentimentModelImproved()
+    head = fit_model_emotion_head(
+        model, load_emotion_rows(args.data), labels=args.labels, holdout=args.holdout, epochs=args.epochs
+    )
+    head.save(args.output)
+
+    print(f"labels: {', '.join(head.labels)}")
+    print(json.dumps(head.metadata["eval"]))
+
+
+if __name__ == "__main__":
+    main()
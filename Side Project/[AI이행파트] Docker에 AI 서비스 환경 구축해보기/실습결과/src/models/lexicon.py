@@ -0,0 +1,286 @@
+"""
+감정 사전(Lexicon) 엔진
+
+긍정/부정 단어(가중치 포함)와 부정어를 하나의 Aho-Corasick 오토마톤으로 컴파일해서
+텍스트를 한 번만 훑어 점수를 계산합니다. 사전 크기가 수만 개로 늘어나도 검색 비용은
+텍스트 길이에만 비례합니다.
+
+- 한국어 용언은 기본형("좋다")만 등록하면 어간/활용형("좋아", "좋은", "기뻐", "무서운")으로 확장
+- 부정어 처리: 앞에 오는 부정어("not", "안", "못")와 뒤에 오는 부정어("좋지 않다", "재미 없다")
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from models.automaton import AhoCorasick
+
+# 기본 감정 사전 (용언은 기본형으로 등록하면 활용형까지 매칭)
+DEFAULT_POSITIVE = {
+    "좋다": 1.0, "훌륭": 1.0, "멋지다": 1.0, "최고": 1.5, "완벽": 1.5, "사랑": 1.0,
+    "행복": 1.0, "기쁘다": 1.0, "만족": 1.0,
+    "amazing": 1.5, "great": 1.0, "awesome": 1.5, "perfect": 1.5, "love": 1.0,
+    "happy": 1.0, "excellent": 1.5, "good": 1.0
+}
+
+DEFAULT_NEGATIVE = {
+    "나쁘다": 1.0, "별로": 1.0, "싫다": 1.0, "최악": 1.5, "실망": 1.0, "화가": 1.0,
+    "짜증": 1.0, "슬프다": 1.0, "무섭다": 1.0,
+    "terrible": 1.5, "bad": 1.0, "awful": 1.5, "worst": 1.5, "hate": 1.0,
+    "angry": 1.0, "sad": 1.0, "disappointed": 1.0
+}
+
+# 뒤에 오는 단어를 부정 (독립된 토큰일 때만)
+DEFAULT_PRE_NEGATIONS = [
+    "not", "never", "no", "don't", "doesn't", "didn't", "isn't", "wasn't", "안", "못"
+]
+
+# 앞에 나온 단어를 부정 (토큰 시작 또는 "~지" 뒤에서만: "좋지 않다", "좋지않다", "없어", "아니다")
+DEFAULT_POST_NEGATIONS = ["않", "없", "아니", "못하", "못해", "못했"]
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+# 중성/종성 인덱스
+_JUNG_A, _JUNG_EO, _JUNG_YEO = 0, 4, 6
+_JUNG_O, _JUNG_WA, _JUNG_U, _JUNG_WEO, _JUNG_EU, _JUNG_I = 8, 9, 13, 14, 18, 20
+_JONG_NONE, _JONG_N, _JONG_L, _JONG_B = 0, 4, 8, 17
+
+# 어간 끝 모음 + 아/어 축약 ("보+아" → "봐", "기쁘+어" → "기뻐")
+_CONTRACTIONS = {_JUNG_O: _JUNG_WA, _JUNG_U: _JUNG_WEO, _JUNG_I: _JUNG_YEO}
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+_PUNCTUATION = ".,!?~…'\"()[]"
+
+LexiconInput = Union[Mapping[str, float], Iterable[str]]
+
+
+def _is_latin_word_char(char: str) -> bool:
+    """라틴 문자(악센트 포함) 또는 숫자 (영어 단어 경계 판정용, 한글 조사는 경계로 취급)"""
+    return char.isalnum() and ord(char) < 0x0250
+
+
+def _is_hangul(char: str) -> bool:
+    return _HANGUL_BASE <= ord(char) <= _HANGUL_LAST
+
+
+def _decompose(char: str) -> Tuple[int, int, int]:
+    code = ord(char) - _HANGUL_BASE
+    return code // 588, (code % 588) // 28, code % 28
+
+
+def _compose(cho: int, jung: int, jong: int) -> str:
+    return chr(_HANGUL_BASE + (cho * 21 + jung) * 28 + jong)
+
+
+def expand_korean_forms(word: str) -> Set[str]:
+    """
+    용언 기본형("~다")을 매칭용 어간/활용형으로 확장
+
+    받침 있는 어간은 어간 자체가 활용형의 접두사이므로 어간만 추가하고("좋다" → "좋"),
+    받침 없는 어간은 관형형/합쇼체 받침과 아/어 축약형을 추가합니다("기쁘다" → "기쁜", "기뻐").
+    ㅂ 불규칙("무섭다" → "무서워", "무서운")도 처리합니다.
+    """
+    if len(word) < 2 or not word.endswith("다") or not _is_hangul(word[-2]):
+        return {word}
+
+    stem = word[:-1]
+    head, last = stem[:-1], stem[-1]
+    cho, jung, jong = _decompose(last)
+    forms = {word, stem}
+
+    if jong == _JONG_B:
+        base = head + _compose(cho, jung, _JONG_NONE)
+        forms.update({base + "워", base + "운", base + "우"})
+    elif jong == _JONG_NONE:
+        # 관형형(ㄴ/ㄹ)과 합쇼체(ㅂ) 받침이 어간에 붙는 형태
+        forms.update(head + _compose(cho, jung, tail) for tail in (_JONG_N, _JONG_L, _JONG_B))
+
+        if last == "하":
+            forms.add(head + "해")
+        elif jung == _JUNG_EU:
+            # ㅡ 탈락: 앞 음절 모음이 ㅏ/ㅗ면 "아", 아니면 "어"
+            bright = bool(head) and _is_hangul(head[-1]) and _decompose(head[-1])[1] in (_JUNG_A, _JUNG_O)
+            forms.add(head + _compose(cho, _JUNG_A if bright else _JUNG_EO, _JONG_NONE))
+        elif jung in _CONTRACTIONS:
+            forms.add(head + _compose(cho, _CONTRACTIONS[jung], _JONG_NONE))
+
+    return forms
+
+
+def _as_weights(entries: Optional[LexiconInput], default: Mapping[str, float]) -> Dict[str, float]:
+    if entries is None:
+        return dict(default)
+    if isinstance(entries, Mapping):
+        return {word: float(weight) for word, weight in entries.items()}
+    return {word: 1.0 for word in entries}
+
+
+def verdict(scores: Dict[str, Any]) -> Dict[str, Any]:
+    """사전 점수(긍정/부정 가중치 합)를 감정과 신뢰도로 변환"""
+    difference = scores["score"]
+
+    if difference > 0:
+        sentiment = "positive"
+        confidence = min(0.9, 0.6 + difference * 0.1)
+    elif difference < 0:
+        sentiment = "negative"
+        confidence = min(0.9, 0.6 - difference * 0.1)
+    else:
+        sentiment = "neutral"
+        confidence = 0.7
+
+    return {
+        "sentiment": sentiment,
+        "confidence": round(confidence, 3)
+    }
+
+
+class LexiconEngine:
+    """
+    가중치 감정 사전을 오토마톤 하나로 컴파일한 점수 계산기
+
+    Args:
+        positive: 긍정 단어 {단어: 가중치} 또는 단어 목록 (가중치 1.0)
+        negative: 부정 단어 {단어: 가중치} 또는 단어 목록 (가중치 1.0)
+        pre_negations: 뒤의 감정 단어를 뒤집는 부정어 (독립 토큰으로만 매칭)
+        post_negations: 앞의 감정 단어를 뒤집는 부정어 (토큰 시작 또는 "~지" 뒤에서만 매칭)
+        negation_window: 부정어가 영향을 주는 토큰 거리
+    """
+
+    def __init__(
+        self,
+        positive: Optional[LexiconInput] = None,
+        negative: Optional[LexiconInput] = None,
+        pre_negations: Optional[Iterable[str]] = None,
+        post_negations: Optional[Iterable[str]] = None,
+        negation_window: int = 2
+    ):
+        self.negation_window = negation_window
+        self.terms: List[Tuple[str, float]] = []
+
+        keywords = []
+        for polarity, weights in (
+            (1.0, _as_weights(positive, DEFAULT_POSITIVE)),
+            (-1.0, _as_weights(negative, DEFAULT_NEGATIVE))
+        ):
+            for word, weight in weights.items():
+                term_id = len(self.terms)
+                self.terms.append((word, polarity * weight))
+                for form in expand_korean_forms(word.lower()):
+                    keywords.append((form, ("term", term_id)))
+
+        pre = DEFAULT_PRE_NEGATIONS if pre_negations is None else pre_negations
+        post = DEFAULT_POST_NEGATIONS if post_negations is None else post_negations
+        keywords += [(word.lower(), ("pre", None)) for word in pre]
+        keywords += [(word.lower(), ("post", None)) for word in post]
+
+        self.automaton = AhoCorasick(keywords)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "LexiconEngine":
+        """
+        TSV 사전 파일에서 생성 ("단어<TAB>가중치", 가중치 부호가 극성, '#'은 주석)
+        """
+        positive: Dict[str, float] = {}
+        negative: Dict[str, float] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                word, weight = line.split("\t")
+                weight = float(weight)
+                if weight >= 0:
+                    positive[word] = weight
+                else:
+                    negative[word] = -weight
+        return cls(positive=positive, negative=negative, **kwargs)
+
+    def __len__(self) -> int:
+        """등록된 감정 단어 수"""
+        return len(self.terms)
+
+    def _select_matches(self, text: str) -> List[Tuple[int, int, str, Optional[int]]]:
+        """
+        겹치는 매칭 중 왼쪽에서부터 가장 긴 것만 선택하고 경계 조건을 확인
+
+        - 라틴 문자로 시작/끝나는 감정 단어는 단어 경계에서만 ("badge"의 "bad", "gloves"의 "love" 제외)
+        - 부정어는 토큰 경계 조건
+        """
+        matches = sorted(
+            self.automaton.iter_matches(text),
+            key=lambda match: (match[0], match[0] - match[1])
+        )
+        selected = []
+        covered = 0
+        for start, end, (kind, term_id) in matches:
+            if start < covered:
+                continue
+            at_token_start = start == 0 or text[start - 1].isspace()
+            at_token_end = end == len(text) or text[end].isspace() or text[end] in _PUNCTUATION
+            if kind == "pre" and not (at_token_start and at_token_end):
+                continue
+            if kind == "post" and not (at_token_start or text[start - 1] == "지"):
+                continue
+            if kind == "term" and (
+                (_is_latin_word_char(text[start]) and start > 0 and _is_latin_word_char(text[start - 1]))
+                or (_is_latin_word_char(text[end - 1]) and end < len(text) and _is_latin_word_char(text[end]))
+            ):
+                continue
+            selected.append((start, end, kind, term_id))
+            covered = end
+        return selected
+
+    def score(self, text: str) -> Dict[str, Any]:
+        """
+        텍스트 점수 계산 (한 번의 선형 탐색)
+
+        Returns:
+            positive/negative: 긍정/부정 가중치 합 (부정어로 뒤집힌 단어는 반대쪽에 합산)
+            score: positive - negative
+            matched: 매칭된 감정 단어 수, negated: 그중 부정어로 뒤집힌 수
+        """
+        text = text.lower()
+        token_starts = [m.start() for m in _TOKEN_PATTERN.finditer(text)]
+
+        values: List[float] = []
+        value_tokens: List[int] = []
+        negated: List[bool] = []
+        pending_negation = None  # 앞 부정어의 토큰 위치
+
+        for start, _, kind, term_id in self._select_matches(text):
+            token = bisect_right(token_starts, start) - 1
+            if kind == "pre":
+                pending_negation = token
+            elif kind == "post":
+                # 같은 토큰("좋지않다") 또는 앞쪽 window 내의 가장 가까운 감정 단어를 뒤집음
+                if values and token - value_tokens[-1] <= self.negation_window - 1 and not negated[-1]:
+                    values[-1] = -values[-1]
+                    negated[-1] = True
+            else:
+                value = self.terms[term_id][1]
+                is_negated = (
+                    pending_negation is not None
+                    and 0 < token - pending_negation <= self.negation_window
+                )
+                if is_negated:
+                    value = -value
+                    pending_negation = None
+                values.append(value)
+                value_tokens.append(token)
+                negated.append(is_negated)
+
+        positive = sum(value for value in values if value > 0)
+        negative = -sum(value for value in values if value < 0)
+        return {
+            "positive": positive,
+            "negative": negative,
+            "score": positive - negative,
+            "matched": len(values),
+            "negated": sum(negated)
+        }
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """여러 텍스트 점수 계산"""
+        return [self.score(text) for text in texts]
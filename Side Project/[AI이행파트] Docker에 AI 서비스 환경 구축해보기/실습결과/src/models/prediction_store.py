@@ -0,0 +1,301 @@
+"""
+예측 결과 저장소 (SQLite)
+
+응답 후 사라지던 예측 결과를 로컬 SQLite 파일에 남겨서
+재분석 작업이 같은 텍스트를 다시 추론하지 않도록 합니다.
+
+- 쓰기: 요청 스레드는 메모리 큐에 넣기만 하고, 백그라운드 스레드가 모아서
+  트랜잭션 하나로 일괄 INSERT (큐가 가득 차면 버리고 dropped 증가 - 요청을 막지 않음)
+- 인덱스: (text_hash, model_id), created_at, (sentiment, created_at)
+- 조회: /predictions/query (텍스트, 레이블, 기간 조건은 모두 인덱스를 사용)
+- 웜 캐시: 시작할 때 같은 모델(model_id)의 최근 결과를 메모리 LRU로 읽어 와서
+  재시작 직후에도 이미 분석한 텍스트는 모델을 거치지 않고 응답
+
+model_id에는 모델 이름과 보정 온도가 들어가므로 모델/보정이 바뀌면 이전 결과는 캐시로 쓰지 않습니다.
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    degraded INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_predictions_text_hash ON predictions (text_hash, model_id);
+CREATE INDEX IF NOT EXISTS ix_predictions_created_at ON predictions (created_at);
+CREATE INDEX IF NOT EXISTS ix_predictions_sentiment ON predictions (sentiment, created_at);
+"""
+
+_COLUMNS = "text, model_id, sentiment, confidence, degraded, created_at"
+
+_STOP = object()
+
+
+def text_hash(text: str) -> str:
+    """정규화된 텍스트의 해시 (인덱스 키)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def model_fingerprint(model_info: Dict[str, Any]) -> str:
+    """저장 결과를 구분하는 모델 식별자 (모델 이름 + 보정 온도)"""
+    model_id = str(model_info.get("model_name", "unknown"))
+    calibration = model_info.get("calibration")
+    if calibration:
+        model_id += f"@T={calibration.get('temperature')}"
+    return model_id
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    # WAL: 조회가 백그라운드 쓰기를 기다리지 않음
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class PredictionStore:
+    """
+    SQLite 예측 저장소 + 메모리 웜 캐시
+
+    Args:
+        path: SQLite 파일 경로
+        model_id: 현재 모델 식별자 (model_fingerprint)
+        flush_interval: 쓰기 배치를 모으는 최대 시간 (초)
+        batch_size: 트랜잭션 하나에 쓰는 최대 행 수
+        queue_size: 쓰기 대기 행 수 한도 (초과분은 버림)
+        cache_entries: 메모리 캐시 크기 (시작 시 최근 결과로 채움, 0이면 캐시 비활성화)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model_id: str,
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        queue_size: int = 10000,
+        cache_entries: int = 100000
+    ):
+        self.path = path
+        self.model_id = model_id
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.cache_entries = cache_entries
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(_connect(path)) as conn:
+            conn.executescript(_SCHEMA)
+
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.hits = 0
+        self.misses = 0
+        self.warmed = self._warm()
+
+        self._writer = threading.Thread(target=self._write_loop, name="prediction-store-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------ 캐시
+
+    def _warm(self) -> int:
+        """같은 model_id의 최근 결과로 메모리 캐시 채우기"""
+        if self.cache_entries <= 0:
+            return 0
+        with closing(_connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT text, sentiment, confidence FROM predictions "
+                "WHERE model_id = ? AND degraded = 0 ORDER BY id DESC LIMIT ?",
+                (self.model_id, self.cache_entries)
+            ).fetchall()
+        # 오래된 것부터 넣어야 최근 결과가 LRU 끝에 남음 (같은 텍스트는 최신 결과가 덮어씀)
+        for text, sentiment, confidence in reversed(rows):
+            self._cache_put(text, {"sentiment": sentiment, "confidence": confidence})
+        logger.info(f"Prediction store warmed: {len(self._cache)} cached texts ({self.path})")
+        return len(self._cache)
+
+    def _cache_put(self, text: str, result: Dict[str, Any]):
+        self._cache[text] = result
+        self._cache.move_to_end(text)
+        if len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """정규화된 텍스트의 저장된 결과 (없으면 None)"""
+        if self.cache_entries <= 0:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(text)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(text)
+            self.hits += 1
+        return {**cached, "processing_time": 0.0}
+
+    # ------------------------------------------------------------------ 쓰기
+
+    def record(self, texts: List[str], results: List[Dict[str, Any]]):
+        """예측 결과를 쓰기 큐에 추가 (블로킹 없음; 실패 결과 'unknown'은 저장하지 않음)"""
+        now = time.time()
+        for text, result in zip(texts, results):
+            sentiment = result.get("sentiment")
+            if sentiment == "unknown":
+                continue
+            degraded = bool(result.get("degraded", False))
+            row = (text, self.model_id, sentiment, float(result.get("confidence", 0.0)), int(degraded), now)
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+                continue
+            self.enqueued += 1
+            if not degraded and self.cache_entries > 0:
+                with self._cache_lock:
+                    self._cache_put(text, {"sentiment": sentiment, "confidence": row[3]})
+
+    def _write_loop(self):
+        with closing(_connect(self.path)) as conn:
+            stop = False
+            while not stop:
+                rows = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    rows.append(item)
+                    if len(rows) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if rows:
+                    self._write(conn, rows)
+
+    def _write(self, conn: sqlite3.Connection, rows: List[tuple]):
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO predictions (text_hash, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(text_hash(row[0]), *row) for row in rows]
+                )
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            self.failed += len(rows)
+            logger.error(f"Failed to write {len(rows)} predictions: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """지금까지 큐에 넣은 결과가 기록될 때까지 대기 (모두 기록되면 True)"""
+        target = self.enqueued
+        deadline = time.monotonic() + timeout
+        while self.written + self.failed < target:
+            if time.monotonic() >= deadline or not self._writer.is_alive():
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self):
+        """남은 결과를 기록하고 쓰기 스레드 종료"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    # ------------------------------------------------------------------ 조회
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        model_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """조건에 맞는 저장 결과 (최신순). 쓰기 큐에 남은 결과는 포함되지 않습니다."""
+        conditions, params = [], []
+        if text is not None:
+            conditions.append("text_hash = ?")
+            params.append(text_hash(text))
+        if model_id is not None:
+            conditions.append("model_id = ?")
+            params.append(model_id)
+        if sentiment is not None:
+            conditions.append("sentiment = ?")
+            params.append(sentiment)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with closing(_connect(self.path)) as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM predictions {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [
+            {
+                "text": row[0],
+                "model_id": row[1],
+                "sentiment": row[2],
+                "confidence": row[3],
+                "degraded": bool(row[4]),
+                "created_at": row[5]
+            }
+            for row in rows
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "model_id": self.model_id,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "cached": len(self._cache),
+            "warmed": self.warmed,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses
+        }
+
+
+def create_prediction_store(settings, model_info: Dict[str, Any]) -> Optional[PredictionStore]:
+    """설정에 경로가 있으면 저장소 생성 (없으면 None - 저장 비활성화)"""
+    if not settings.prediction_store_path:
+        return None
+    return PredictionStore(
+        settings.prediction_store_path,
+        model_fingerprint(model_info),
+        flush_interval=settings.prediction_store_flush_interval,
+        batch_size=settings.prediction_store_batch_size,
+        queue_size=settings.prediction_store_queue_size,
+        cache_entries=settings.prediction_store_cache_entries
+    )
@@ -0,0 +1,415 @@
+"""
+멀티 프로세스 추론 풀 (CPU 확장용, 선택 사항)
+
+한 프로세스에서는 토큰화와 Python 후처리가 GIL에 묶여 코어가 많아도 다 쓰지 못합니다.
+INFERENCE_BACKEND=process로 설정하면 워커 프로세스 N개가 각자 모델 레플리카를 들고 추론하고,
+FastAPI 프로세스는 배치를 나눠 주기만 합니다 (FastAPI 프로세스는 torch를 import하지 않음).
+
+- 입력: 워커별 공유 메모리 [offsets int64 (max_batch+1)] + [UTF-8 텍스트 바이트]
+- 출력: 워커가 만든 공유 메모리 (max_batch, num_labels) float32 확률 행렬
+- 파이프로는 ("batch", 개수) 같은 작은 제어 메시지만 보냄 (텍스트 목록/결과를 pickle하지 않음)
+- 워커마다 torch 스레드 수를 INFERENCE_PROCESS_THREADS로 제한 (기본 1, 워커 수 × 스레드 ≈ 코어 수)
+- 워커 프로세스가 죽으면 해당 워커는 풀에서 빠지고 health_check가 False를 반환 (컨테이너 재시작으로 복구)
+
+벤치마크 (src/에서 실행):
+    python -m models.process_pool --workers 1 2 4 --texts 2000 --clients 8
+"""
+
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# UTF-8 문자당 최대 바이트 수 (입력 버퍼 크기 계산용)
+MAX_BYTES_PER_CHAR = 4
+
+
+def _input_size(max_batch: int, max_chars: int) -> int:
+    return (max_batch + 1) * 8 + max_batch * max_chars * MAX_BYTES_PER_CHAR
+
+
+def _input_views(buf, max_batch: int) -> Tuple[np.ndarray, memoryview]:
+    """입력 버퍼를 (offsets 배열, 텍스트 바이트 영역)으로 해석"""
+    offsets = np.ndarray((max_batch + 1,), dtype=np.int64, buffer=buf)
+    return offsets, buf[offsets.nbytes:]
+
+
+def _raise_remote(kind: str, message: str):
+    """워커에서 난 예외를 호출 쪽에서 다시 발생 (입력 오류는 ValueError 유지)"""
+    if kind == "ValueError":
+        raise ValueError(message)
+    raise RuntimeError(f"Inference worker failed: {kind}: {message}")
+
+
+def _worker_main(conn, model_name: str, input_name: str, max_batch: int, threads: int):
+    """워커 프로세스: 모델을 로드하고 파이프로 오는 요청을 처리"""
+    import torch
+    torch.set_num_threads(threads)
+
+    from models.registry import create_model
+    from models.sentiment_model_improved import SENTIMENT_GROUPS
+
+    try:
+        model = create_model(model_name)
+    except Exception as e:
+        conn.send(("error", type(e).__name__, str(e)))
+        return
+
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    num_labels = len(model.raw_labels)
+    output_shm = shared_memory.SharedMemory(create=True, size=max_batch * num_labels * 4)
+    offsets, data = _input_views(input_shm.buf, max_batch)
+    scores = np.ndarray((max_batch, num_labels), dtype=np.float32, buffer=output_shm.buf)
+
+    conn.send(("ready", {
+        "output": output_shm.name,
+        "raw_labels": model.raw_labels,
+        "label_mapping": model.label_mapping,
+        "groups": list(SENTIMENT_GROUPS),
+        "projection": model.group_projection.tolist(),
+        "model_info": model.get_model_info(),
+        "pid": os.getpid()
+    }))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message[0] == "stop":
+                break
+            try:
+                if message[0] == "batch":
+                    _, count, calibrated = message
+                    texts = [bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8") for i in range(count)]
+                    scores[:count] = model.predict_scores_batch(texts, calibrated=calibrated)[0]
+                    conn.send(("ok", count))
+                else:
+                    _, method, args, kwargs = message
+                    conn.send(("ok", getattr(model, method)(*args, **kwargs)))
+            except Exception as e:
+                conn.send(("error", type(e).__name__, str(e)))
+    finally:
+        # 공유 메모리를 닫기 전에 버퍼를 참조하는 뷰를 먼저 해제
+        del offsets, data, scores
+        input_shm.close()
+        output_shm.close()
+
+
+class _Worker:
+    """FastAPI 프로세스 쪽 워커 핸들 (파이프 + 공유 메모리 뷰)"""
+
+    def __init__(self, index: int, process, conn, input_shm, max_batch: int):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.input_shm = input_shm
+        self.output_shm = None
+        self.max_batch = max_batch
+        self.offsets, self.data = _input_views(input_shm.buf, max_batch)
+        self.scores = None
+        self.info: Dict[str, Any] = {}
+        self.alive = True
+
+    def attach(self, info: Dict[str, Any]):
+        self.info = info
+        self.output_shm = shared_memory.SharedMemory(name=info["output"])
+        self.scores = np.ndarray(
+            (self.max_batch, len(info["raw_labels"])), dtype=np.float32, buffer=self.output_shm.buf
+        )
+
+    def _request(self, message) -> Any:
+        try:
+            self.conn.send(message)
+            reply = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.alive = False
+            raise RuntimeError(f"Inference worker {self.index} (pid {self.process.pid}) is gone") from e
+        if reply[0] == "error":
+            _raise_remote(reply[1], reply[2])
+        return reply[1]
+
+    def run_batch(self, texts: List[str], calibrated: bool = True) -> np.ndarray:
+        """텍스트를 공유 메모리에 쓰고 워커의 확률 행렬을 복사해서 반환"""
+        position = 0
+        self.offsets[0] = 0
+        for i, text in enumerate(texts):
+            encoded = text.encode("utf-8")
+            self.data[position:position + len(encoded)] = encoded
+            position += len(encoded)
+            self.offsets[i + 1] = position
+        count = self._request(("batch", len(texts), calibrated))
+        return self.scores[:count].copy()
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        return self._request(("call", method, args, kwargs))
+
+    def close(self, timeout: float = 5.0):
+        if self.alive and self.process.is_alive():
+            try:
+                self.conn.send(("stop",))
+            except OSError:
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+        del self.offsets, self.data, self.scores
+        self.input_shm.close()
+        self.input_shm.unlink()
+        if self.output_shm is not None:
+            self.output_shm.close()
+            self.output_shm.unlink()
+
+
+class ProcessPoolSentimentModel:
+    """
+    워커 프로세스 풀 기반 감정분석 모델 (SentimentPredictor 인터페이스)
+
+    Args:
+        model_name: 워커가 만들 모델 (models.registry 이름, predict_scores_batch를 지원해야 함)
+        workers: 워커 프로세스 수 (None이면 settings.inference_processes, 0이면 CPU 코어 수)
+        threads_per_worker: 워커별 torch 스레드 수 (None이면 settings.inference_process_threads)
+        max_batch: 워커 한 번 호출의 최대 텍스트 수 (None이면 settings.inference_batch_size)
+        start_timeout: 워커 모델 로딩 최대 대기 시간(초)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "improved",
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        start_timeout: float = 600.0
+    ):
+        self.settings = get_settings()
+        self.model_name = model_name
+        self.size = workers if workers is not None else self.settings.inference_processes
+        self.size = self.size or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or self.settings.inference_process_threads
+        self.max_batch = max_batch or self.settings.inference_batch_size
+        self.max_chars = self.settings.max_text_length
+
+        self.workers: List[_Worker] = []
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="inference-dispatch")
+        self._closed = False
+
+        try:
+            self._start_workers(start_timeout)
+        except Exception:
+            self.close()
+            raise
+
+        info = self.workers[0].info
+        self.raw_labels: List[str] = info["raw_labels"]
+        self.label_mapping: Dict[str, str] = info["label_mapping"]
+        self.groups: List[str] = info["groups"]
+        self.group_projection = np.asarray(info["projection"], dtype=np.float32)
+        self.model_type = info["model_info"].get("model_type", "multilingual")
+
+    def _start_workers(self, timeout: float):
+        """워커를 모두 띄운 뒤 (모델 로딩은 병렬로 진행) 준비 완료 메시지를 기다림"""
+        context = mp.get_context("spawn")
+        for index in range(self.size):
+            input_shm = shared_memory.SharedMemory(create=True, size=_input_size(self.max_batch, self.max_chars))
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.model_name, input_shm.name, self.max_batch, self.threads_per_worker),
+                name=f"inference-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self.workers.append(_Worker(index, process, parent_conn, input_shm, self.max_batch))
+
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if not worker.conn.poll(max(deadline - time.monotonic(), 0.0)):
+                raise TimeoutError(f"Inference worker {worker.index} did not load the model within {timeout}s")
+            try:
+                reply = worker.conn.recv()
+            except EOFError:
+                raise RuntimeError(f"Inference worker {worker.index} exited during startup") from None
+            if reply[0] == "error":
+                _raise_remote(reply[1], reply[2])
+            worker.attach(reply[1])
+            self._idle.put(worker)
+
+        logger.info(
+            "Started %d inference worker processes (%d torch threads each)",
+            self.size, self.threads_per_worker
+        )
+
+    @contextmanager
+    def _acquire(self) -> Iterator[_Worker]:
+        """유휴 워커 하나를 독점 사용 (죽은 워커는 반납하지 않음)"""
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        try:
+            worker = self._idle.get(timeout=self.settings.request_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No inference worker became available within {self.settings.request_timeout}s") from None
+        try:
+            yield worker
+        finally:
+            if worker.alive:
+                self._idle.put(worker)
+            else:
+                logger.error("Inference worker %d died and was removed from the pool", worker.index)
+
+    def _run_chunk(self, texts: List[str], calibrated: bool = True) -> np.ndarray:
+        with self._acquire() as worker:
+            return worker.run_batch(texts, calibrated)
+
+    def _call(self, method: str, *args, **kwargs) -> Any:
+        with self._acquire() as worker:
+            return worker.call(method, *args, **kwargs)
+
+    def _clip(self, texts: List[str]) -> List[str]:
+        inputs = []
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("입력 텍스트가 비어있습니다")
+            inputs.append(text[:self.max_chars])
+        return inputs
+
+    def predict_scores_batch(self, texts: List[str], calibrated: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        여러 텍스트의 점수 행렬 (SentimentModelImproved.predict_scores_batch와 같은 형식)
+
+        max_batch보다 큰 입력은 나눠서 여러 워커에 동시에 보냅니다.
+        """
+        inputs = self._clip(texts)
+        if not inputs:
+            empty = np.zeros((0, len(self.raw_labels)), dtype=np.float32)
+            return empty, empty @ self.group_projection
+
+        chunks = [inputs[i:i + self.max_batch] for i in range(0, len(inputs), self.max_batch)]
+        if len(chunks) == 1:
+            raw_scores = self._run_chunk(chunks[0], calibrated)
+        else:
+            raw_scores = np.concatenate(list(self._executor.map(self._run_chunk, chunks, [calibrated] * len(chunks))))
+        return raw_scores, raw_scores @ self.group_projection
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """여러 텍스트 감정 예측 (SentimentModelImproved.predict_batch와 같은 형식)"""
+        if not texts:
+            return []
+
+        start_time = time.time()
+        scores = self.predict_scores_batch(texts)[0]
+        best = scores.argmax(axis=1)
+        processing_time = (time.time() - start_time) / len(texts)
+
+        return [
+            {
+                "sentiment": self.label_mapping.get(self.raw_labels[idx], 'neutral'),
+                "confidence": round(float(row[idx]), 4),
+                "processing_time": round(processing_time, 3),
+                "raw_label": self.raw_labels[idx],
+                "model": self.model_type
+            }
+            for row, idx in zip(scores, best)
+        ]
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """텍스트 감정 예측"""
+        return self.predict_batch([text])[0]
+
+    def predict_with_scores(self, text: str) -> Dict[str, Any]:
+        return self._call("predict_with_scores", text)
+
+    def predict_document(self, text: str, pooling: str = "mean", include_windows: bool = False) -> Dict[str, Any]:
+        # 문서는 요청당 한 번이므로 파이프로 그대로 전달
+        return self._call("predict_document", text, pooling=pooling, include_windows=include_windows)
+
+    def health_check(self) -> bool:
+        """모든 워커가 살아 있고 워커 모델이 정상 응답하는지 확인"""
+        if self._closed or not all(w.alive and w.process.is_alive() for w in self.workers):
+            return False
+        try:
+            return bool(self._call("health_check"))
+        except Exception as e:
+            logger.error("Health check failed: %s", e)
+            return False
+
+    def get_model_info(self) -> Dict[str, Any]:
+        info = dict(self.workers[0].info["model_info"])
+        info.update({
+            "backend": "process",
+            "workers": self.size,
+            "threads_per_worker": self.threads_per_worker,
+            "max_batch": self.max_batch,
+            "alive_workers": sum(w.alive and w.process.is_alive() for w in self.workers),
+            "worker_pids": [w.info.get("pid") for w in self.workers]
+        })
+        return info
+
+    def close(self):
+        """워커 종료 및 공유 메모리 해제"""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        for worker in self.workers:
+            worker.close()
+        logger.info("Inference worker processes stopped")
+
+
+def _benchmark(worker_counts: List[int], num_texts: int, clients: int, batch_size: int, threads: int):
+    """워커 수별 처리량 측정 (clients개 스레드가 batch_size 단위로 동시에 요청)"""
+    words = ["좋은", "영화", "최악", "서비스", "정말", "별로", "great", "movie", "terrible", "service", "really", "ok"]
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(words, size=rng.integers(4, 24))) + f" #{i}" for i in range(num_texts)]
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    baseline = None
+    print(f"{'workers':>7} {'texts/s':>10} {'speedup':>8}  (cpu_count={os.cpu_count()}, clients={clients})")
+    for count in worker_counts:
+        pool = ProcessPoolSentimentModel(workers=count, threads_per_worker=threads, max_batch=batch_size)
+        try:
+            pool.predict_batch(texts[:batch_size])  # 워밍업
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                start = time.perf_counter()
+                for _ in executor.map(pool.predict_batch, batches):
+                    pass
+                elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+        throughput = num_texts / elapsed
+        baseline = baseline or throughput
+        print(f"{count:>7} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process inference pool")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to measure")
+    parser.add_argument("--texts", type=int, default=2000, help="Number of texts per run")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    _benchmark(args.workers, args.texts, args.clients, args.batch_size, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+모델 레지스트리
+
+torch/transformers는 import에만 수 초가 걸리므로, 모델 클래스는 이름 → "모듈:클래스" 경로로만 등록해 두고
+실제로 모델을 만들 때 import합니다. 덕분에 main/api 모듈을 import해도 무거운 라이브러리가 로드되지 않아
+/, /health, /docs가 바로 응답할 수 있습니다.
+
+타입 힌트에는 모델 클래스 대신 SentimentPredictor 프로토콜을 사용하세요.
+"""
+
+import importlib
+from typing import Any, Dict, List, Protocol
+
+# 모델 이름 → "모듈:클래스"
+MODEL_CLASSES = {
+    "improved": "models.sentiment_model_improved:SentimentModelImproved",  # 다국어 모델 (기본)
+    "english": "models.sentiment_model:SentimentModel",                   # 기존 영어 전용 모델
+    "process": "models.process_pool:ProcessPoolSentimentModel",           # 다국어 모델 × 워커 프로세스 N개
+    "stub": "models.stub_model:StubSentimentModel",                       # 가중치 없는 결정적 스텁 (부하 테스트용)
+}
+
+
+class SentimentPredictor(Protocol):
+    """감정분석 모델이 제공하는 인터페이스"""
+
+    def predict(self, text: str) -> Dict[str, Any]: ...
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]: ...
+
+    def health_check(self) -> bool: ...
+
+    def get_model_info(self) -> Dict[str, Any]: ...
+
+
+def get_model_class(name: str = "improved") -> type:
+    """등록된 모델 클래스 반환 (이때 처음으로 모델 모듈을 import)"""
+    if name not in MODEL_CLASSES:
+        raise ValueError(f"등록되지 않은 모델입니다: {name} (가능: {', '.join(MODEL_CLASSES)})")
+    module_name, class_name = MODEL_CLASSES[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_model(name: str = "improved", **kwargs) -> SentimentPredictor:
+    """모델 생성 (모델 로딩 포함, 수 초 이상 걸릴 수 있으므로 이벤트 루프 밖에서 호출)"""
+    return get_model_class(name)(**kwargs)
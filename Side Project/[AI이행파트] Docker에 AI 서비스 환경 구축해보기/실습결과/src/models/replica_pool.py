@@ -0,0 +1,109 @@
+"""
+추론 레플리카 풀 (동시성 모델)
+
+요청은 스레드풀(run_in_executor, asyncio.to_thread)에서 동시에 실행됩니다.
+HF fast 토크나이저는 호출마다 truncation/padding 설정을 내부(Rust) 객체에 기록하므로
+여러 스레드가 한 토크나이저를 공유하면 설정이 섞이거나 "Already borrowed" 오류가 납니다.
+
+- 레플리카 = 독립된 토크나이저 복사본 + 공유 모델 가중치
+  (eval 모드 + no_grad forward는 가중치를 읽기만 하므로 스레드 간 공유해도 안전)
+- 한 레플리카는 한 번에 한 스레드만 사용 (checkout/반납)
+- 레플리카 수 1 = 단일 워커 직렬 실행 (기존 동작), N = 최대 N개 요청 병렬 추론
+- 재진입: 이미 레플리카를 가진 스레드가 다시 acquire하면 같은 레플리카를 반환 (교착 없음)
+"""
+
+import copy
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Replica:
+    """한 스레드가 독점해서 사용하는 추론 단위"""
+
+    def __init__(self, index: int, tokenizer, model):
+        self.index = index
+        self.tokenizer = tokenizer
+        self.model = model
+
+
+class ReplicaPool:
+    """
+    레플리카 checkout 풀 (스레드 안전)
+
+    Args:
+        tokenizer: 원본 토크나이저 (레플리카 0이 사용, 나머지는 deepcopy)
+        model: 모든 레플리카가 공유하는 모델
+        size: 레플리카 수 (1 이상)
+        timeout: 레플리카를 기다리는 최대 시간(초), None이면 무한 대기
+    """
+
+    def __init__(self, tokenizer, model, size: int = 1, timeout: Optional[float] = None):
+        if size < 1:
+            raise ValueError("레플리카 수는 1 이상이어야 합니다")
+        self.size = size
+        self.timeout = timeout
+        self.replicas: List[Replica] = [
+            Replica(i, tokenizer if i == 0 else copy.deepcopy(tokenizer), model)
+            for i in range(size)
+        ]
+        self._available: "queue.LifoQueue[Replica]" = queue.LifoQueue()
+        for replica in reversed(self.replicas):
+            self._available.put(replica)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquisitions = 0
+        self.waits = 0
+
+    @contextmanager
+    def acquire(self) -> Iterator[Replica]:
+        """
+        레플리카 하나를 독점 사용 (with 블록이 끝나면 반납)
+
+        Raises:
+            TimeoutError: timeout 안에 사용 가능한 레플리카가 없을 때
+        """
+        held = getattr(self._local, "replica", None)
+        if held is not None:
+            # 같은 스레드의 중첩 호출은 이미 가진 레플리카를 그대로 사용
+            yield held
+            return
+
+        try:
+            replica = self._available.get_nowait()
+            waited = False
+        except queue.Empty:
+            waited = True
+            try:
+                replica = self._available.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f"{self.timeout}초 안에 사용 가능한 모델 레플리카가 없습니다") from None
+
+        with self._stats_lock:
+            self.acquisitions += 1
+            self.waits += waited
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        self._local.replica = replica
+        try:
+            yield replica
+        finally:
+            self._local.replica = None
+            with self._stats_lock:
+                self.in_use -= 1
+            self._available.put(replica)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """레플리카 사용 통계"""
+        with self._stats_lock:
+            return {
+                "replicas": self.size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "acquisitions": self.acquisitions,
+                "waits": self.waits
+            }
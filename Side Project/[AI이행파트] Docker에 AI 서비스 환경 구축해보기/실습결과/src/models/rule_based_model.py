@@ -0,0 +1,79 @@
+"""
+규칙 기반 감정분석 모델 (Fallback)
+
+가중치 감정 사전(LexiconEngine, Aho-Corasick 오토마톤)으로 점수를 계산하는 경량 모델입니다.
+AI 모델이 아직 로딩 중이거나 추론 대기열이 임계치를 넘으면 서비스가 이 모델로 응답하며,
+응답에는 degraded=True가 표시됩니다. (타임아웃 대신 정확도를 낮춘 응답으로 버팀)
+"""
+
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from models.lexicon import LexiconEngine, verdict
+from utils.config import get_settings
+
+
+class RuleBasedSentimentModel:
+    """감정 사전 기반 감정분석 모델 (SentimentModelImproved와 같은 인터페이스)"""
+
+    def __init__(self, lexicon: Optional[LexiconEngine] = None):
+        self.lexicon = lexicon if lexicon is not None else LexiconEngine()
+
+    def score(self, text: str) -> Dict[str, Any]:
+        """텍스트를 한 번 훑어서 감정 판정"""
+        return verdict(self.lexicon.score(text))
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """텍스트 감정 예측 (degraded 응답)"""
+        if not text or not text.strip():
+            raise ValueError("입력 텍스트가 비어있습니다")
+
+        start_time = time.time()
+        result = self.score(text)
+        result.update({
+            "processing_time": round(time.time() - start_time, 3),
+            "model": "rule-based",
+            "degraded": True
+        })
+        return result
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """여러 텍스트 감정 예측"""
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("입력 텍스트가 비어있습니다")
+
+        start_time = time.time()
+        results = [verdict(scores) for scores in self.lexicon.score_batch(texts)]
+        processing_time = round((time.time() - start_time) / max(len(texts), 1), 3)
+        for result in results:
+            result.update({
+                "processing_time": processing_time,
+                "model": "rule-based",
+                "degraded": True
+            })
+        return results
+
+    def health_check(self) -> bool:
+        """규칙 모델은 항상 사용 가능"""
+        return len(self.lexicon) > 0
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """모델 정보 반환"""
+        return {
+            "model_name": "rule-based-fallback",
+            "model_type": "rule-based",
+            "num_terms": len(self.lexicon),
+            "automaton_states": len(self.lexicon.automaton),
+            "device": "cpu",
+            "loaded": True
+        }
+
+
+@lru_cache()
+def get_fallback_model() -> RuleBasedSentimentModel:
+    """공유 fallback 모델 (최초 호출 시 한 번만 컴파일)"""
+    settings = get_settings()
+    if settings.fallback_lexicon_path:
+        return RuleBasedSentimentModel(LexiconEngine.from_file(settings.fallback_lexicon_path))
+    return RuleBasedSentimentModel()
@@ -3,7 +3,7 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from transformers import pipeline
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 import os
 
 from utils.config import get_settings
@@ -106,6 +106,58 @@ class SentimentModel:
             logger.error(f"Prediction failed: {e}")
             raise
 
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Predict sentiment for multiple texts with a single pipeline call
+
+        Args:
+            texts: Input texts to analyze
+
+        Returns:
+            List of prediction dictionaries in the same order as texts
+        """
+        if not texts:
+            return []
+
+        inputs = []
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("Input text cannot be empty")
+            inputs.append(text[:self.settings.max_text_length])
+
+        start_time = time.time()
+
+        try:
+            outputs = self.pipeline(
+                inputs,
+                batch_size=self.settings.inference_batch_size,
+                truncation=True
+            )
+            processing_time = (time.time() - start_time) / len(inputs)
+
+            results = []
+            for output in outputs:
+                sentiment = self.label_mapping.get(output['label'], output['label'])
+                if sentiment not in ['positive', 'negative', 'neutral']:
+                    if output['label'].upper() in ['POSITIVE', 'POS']:
+                        sentiment = 'positive'
+                    elif output['label'].upper() in ['NEGATIVE', 'NEG']:
+                        sentiment = 'negative'
+                    else:
+                        sentiment = 'neutral'
+
+                results.append({
+                    "sentiment": sentiment,
+                    "confidence": float(output['score']),
+                    "processing_time": round(processing_time, 3)
+                })
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            raise
+
     def health_check(self) -> bool:
         """Check if model is loaded and working"""
         try:
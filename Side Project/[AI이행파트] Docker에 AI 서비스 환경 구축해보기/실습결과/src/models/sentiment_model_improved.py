@@ -9,36 +9,76 @@
 2. cardiffnlp/twitter-xlm-roberta-base-sentiment (다국어, 3단계)
 """
 
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from transformers import pipeline
 import logging
+import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import os
 
+from models.artifacts import apply_quantization, load_manifest, verify
+from models.calibration import load_calibrator
+from models.emotion_head import load_emotion_head
+from models.replica_pool import ReplicaPool
+from models.token_cache import get_token_cache
 from utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# 긴 문서의 윈도우 점수 집계 방식
+POOLING_METHODS = ("mean", "max", "length_weighted")
+
+# 추론 시 최대 토큰 수
+MAX_TOKENS = 512
+
+# 집계 감정 그룹 (점수 행렬의 열 순서)
+SENTIMENT_GROUPS = ("negative", "neutral", "positive")
+
+# 한 번의 인코더 forward로 계산할 수 있는 작업 ("emotion"은 감정 헤드가 로드됐을 때만)
+TASKS = ("sentiment", "emotion")
+
+# 문장 임베딩 풀링 방식 (cls: 첫 토큰 hidden state, mean: 패딩을 제외한 토큰 평균)
+EMBEDDING_POOLINGS = ("cls", "mean")
+
 class SentimentModelImproved:
     """개선된 감정분석 모델 (한글 지원)"""
 
-    def __init__(self, use_multilingual=True):
+    def __init__(self, use_multilingual=True, model_variant=None):
         """
         Args:
             use_multilingual: True면 다국어 모델 사용, False면 영어 전용 모델 사용
+            model_variant: 다국어 모델 종류 ("teacher": BERT-base 원본, "student": 증류된 경량 모델)
+                           None이면 설정값(model_variant) 사용
         """
         self.settings = get_settings()
         self.model = None
         self.tokenizer = None
         self.pipeline = None
+        self.raw_labels: List[str] = []
+        self.group_projection = None
+        self.calibrator = None
+        self.emotion_head = None
+        # 인코더 문장 벡터를 받아올 스레드별 슬롯 (가중치는 레플리카 간 공유, forward hook도 공유)
+        self._features = threading.local()
+        self.token_cache = get_token_cache()
         self.use_multilingual = use_multilingual
+        self.model_variant = model_variant or self.settings.model_variant
+        # 요청이 스레드풀에서 실행되므로 토크나이저/모델은 레플리카 풀을 통해서만 사용
+        # (models/replica_pool.py, 레플리카 수 = settings.model_replicas)
+        self.replicas = None
 
         # 다국어 모델 사용 시 모델명 변경
         if use_multilingual:
             # Option 1: 별점 5단계 모델 (한글 잘 지원)
             self.model_name = "nlptown/bert-base-multilingual-uncased-sentiment"
+            if self.model_variant == "student":
+                # 증류된 student (models/distillation.py 출력, teacher와 같은 별점 레이블)
+                self.model_name = self.settings.student_model_path
+            elif self.model_variant != "teacher":
+                raise ValueError(f"지원하지 않는 model_variant입니다: {self.model_variant}")
             self.label_mapping = {
                 '1 star': 'negative',   # 매우 부정
                 '2 stars': 'negative',  # 부정
@@ -70,20 +110,64 @@ class SentimentModelImproved:
         try:
             logger.info(f"Loading model: {self.model_name}")
             logger.info(f"Multilingual mode: {self.use_multilingual}")
+            if self.use_multilingual:
+                logger.info(f"Model variant: {self.model_variant}")
+
+            artifact_path = self.settings.model_artifact_path
+            if artifact_path:
+                # 이미지에 번들된 아티팩트에서만 로드 (네트워크 접근 없음)
+                if self.settings.model_artifact_verify:
+                    manifest = verify(artifact_path, expected_model_id=self.model_name)
+                else:
+                    manifest = load_manifest(artifact_path)
+                logger.info(f"Loading bundled model artifact: {artifact_path} (revision: {manifest['revision']})")
+
+                self.tokenizer = AutoTokenizer.from_pretrained(artifact_path, local_files_only=True)
+                self.model = AutoModelForSequenceClassification.from_pretrained(
+                    artifact_path,
+                    local_files_only=True
+                )
+                self.model = apply_quantization(self.model, manifest)
+            else:
+                # 캐시 디렉토리 생성
+                os.makedirs(self.settings.model_cache_dir, exist_ok=True)
+
+                # 토크나이저 및 모델 로드
+                self.tokenizer = AutoTokenizer.from_pretrained(
+                    self.model_name,
+                    cache_dir=self.settings.model_cache_dir
+                )
+
+                self.model = AutoModelForSequenceClassification.from_pretrained(
+                    self.model_name,
+                    cache_dir=self.settings.model_cache_dir
+                )
+
+            # 레플리카별 토크나이저 복사본 + 공유 가중치 (eval 모드에서만 공유 안전)
+            self.model.eval()
+            self.replicas = ReplicaPool(
+                self.tokenizer,
+                self.model,
+                size=self.settings.model_replicas,
+                timeout=self.settings.request_timeout
+            )
 
-            # 캐시 디렉토리 생성
-            os.makedirs(self.settings.model_cache_dir, exist_ok=True)
+            # 확률 보정 (calibration.json이 있을 때만, models/calibration.py)
+            self.calibrator = load_calibrator(self.settings, self.model_name)
 
-            # 토크나이저 및 모델 로드
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name,
-                cache_dir=self.settings.model_cache_dir
-            )
+            # 감정 범주 헤드 (emotion_head.pt가 있을 때만, models/emotion_head.py)
+            # 같은 forward의 인코더 출력을 hook으로 받아 쓰므로 인코더는 텍스트당 한 번만 실행
+            self.model.base_model.register_forward_hook(self._capture_features)
+            self.emotion_head = load_emotion_head(self.settings, self.model_name, self.model.config.hidden_size)
 
-            self.model = AutoModelForSequenceClassification.from_pretrained(
-                self.model_name,
-                cache_dir=self.settings.model_cache_dir
-            )
+            # 단일 문장에 추가되는 특수 토큰 수 (요청마다 토크나이저를 건드리지 않도록 미리 계산)
+            self._num_special_tokens = self.tokenizer.num_special_tokens_to_add()
+
+            # 토큰화 캐시 키 (같은 이름이라도 다시 로드한 토크나이저는 별도 항목)
+            self._tokenizer_key = (self.model_name, id(self.tokenizer), MAX_TOKENS)
+
+            # 원본 레이블 → 감정 그룹 사영 행렬 (num_labels, 3)
+            self.raw_labels, self.group_projection = self._build_group_projection()
 
             # Pipeline 생성
             self.pipeline = pipeline(
@@ -100,12 +184,14 @@ class SentimentModelImproved:
             logger.error(f"Failed to load model: {e}")
             raise
 
-    def predict(self, text: str) -> Dict[str, Any]:
+    def predict(self, text: str, embedding: Optional[str] = None) -> Dict[str, Any]:
         """
         텍스트 감정 예측
 
         Args:
             text: 분석할 텍스트 (한글/영어 모두 가능)
+            embedding: 풀링 방식 (EMBEDDING_POOLINGS)을 주면 같은 forward의 문장 임베딩을
+                       결과의 "embedding"에 (hidden,) float32 배열로 추가
 
         Returns:
             {
@@ -127,30 +213,295 @@ class SentimentModelImproved:
         start_time = time.time()
 
         try:
-            # 예측 실행
-            result = self.pipeline(text)[0]
+            # 예측 실행 (토큰화 결과는 캐시 재사용, 감정 헤드가 있으면 같은 forward에서 함께 계산)
+            probs, emotion_probs, vectors = self._predict_heads([text], pooling=self._poolings(embedding))
+            scores = probs[0]
 
             # 레이블 매핑
-            raw_label = result['label']
+            best = int(scores.argmax())
+            raw_label = self.raw_labels[best]
             sentiment = self.label_mapping.get(raw_label, 'neutral')
 
             # 별점 모델의 경우 신뢰도 조정
-            confidence = float(result['score'])
+            confidence = float(scores[best])
 
             processing_time = time.time() - start_time
 
-            return {
+            result = {
                 "sentiment": sentiment,
                 "confidence": round(confidence, 4),
                 "processing_time": round(processing_time, 3),
                 "raw_label": raw_label,
                 "model": "multilingual" if self.use_multilingual else "english-only"
             }
+            if emotion_probs is not None:
+                result["emotions"] = self._emotion_dict(emotion_probs[0])
+            if embedding is not None:
+                result["embedding"] = vectors[embedding][0]
+            return result
 
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise
 
+    def predict_batch(self, texts: List[str], embedding: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        여러 텍스트 감정 예측 (inference_batch_size 단위 배치 추론)
+
+        Args:
+            texts: 분석할 텍스트 목록
+            embedding: 풀링 방식을 주면 결과마다 같은 forward의 "embedding" 추가 (predict()와 같음)
+
+        Returns:
+            predict()와 같은 형식의 결과 목록 (processing_time은 배치 시간을 텍스트 수로 나눈 값)
+        """
+        if not texts:
+            return []
+
+        inputs = []
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("입력 텍스트가 비어있습니다")
+            inputs.append(text[:self.settings.max_text_length])
+
+        start_time = time.time()
+
+        try:
+            scores, emotion_probs, vectors = self._predict_heads(inputs, pooling=self._poolings(embedding))
+            best = scores.argmax(axis=1)
+
+            processing_time = (time.time() - start_time) / len(inputs)
+            model_type = "multilingual" if self.use_multilingual else "english-only"
+
+            results = [
+                {
+                    "sentiment": self.label_mapping.get(self.raw_labels[idx], 'neutral'),
+                    "confidence": round(float(row[idx]), 4),
+                    "processing_time": round(processing_time, 3),
+                    "raw_label": self.raw_labels[idx],
+                    "model": model_type
+                }
+                for row, idx in zip(scores, best)
+            ]
+            if emotion_probs is not None:
+                for result, emotion_row in zip(results, emotion_probs):
+                    result["emotions"] = self._emotion_dict(emotion_row)
+            if embedding is not None:
+                for result, vector in zip(results, vectors[embedding]):
+                    result["embedding"] = vector
+            return results
+
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            raise
+
+    def _build_group_projection(self) -> Tuple[List[str], np.ndarray]:
+        """원본 레이블 목록과 레이블 → 감정 그룹 사영 행렬 (num_labels, 3) 생성"""
+        num_labels = self.model.config.num_labels
+        raw_labels = [self.model.config.id2label.get(idx, f'LABEL_{idx}') for idx in range(num_labels)]
+
+        projection = np.zeros((num_labels, len(SENTIMENT_GROUPS)), dtype=np.float32)
+        for idx, label in enumerate(raw_labels):
+            group = self.label_mapping.get(label, 'neutral')
+            projection[idx, SENTIMENT_GROUPS.index(group)] = 1.0
+        return raw_labels, projection
+
+    def _tokenize(self, texts: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """패딩 없이 토큰화 ([(input_ids, attention_mask), ...], 캐시 저장용 compact 배열)"""
+        with self.replicas.acquire() as replica:
+            encoded = replica.tokenizer(texts, truncation=True, max_length=MAX_TOKENS)
+        return [
+            (np.asarray(ids, dtype=np.int32), np.asarray(mask, dtype=np.int8))
+            for ids, mask in zip(encoded["input_ids"], encoded["attention_mask"])
+        ]
+
+    def _pad(self, encodings: List[Tuple[np.ndarray, np.ndarray]], tokenizer) -> Dict[str, torch.Tensor]:
+        """캐시된 토큰화 결과를 배치 텐서로 패딩 (tokenizer: 현재 스레드가 가진 레플리카의 토크나이저)"""
+        length = max(len(ids) for ids, _ in encodings)
+        input_ids = np.full((len(encodings), length), tokenizer.pad_token_id or 0, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        left = tokenizer.padding_side == "left"
+        for row, (ids, mask) in enumerate(encodings):
+            span = slice(length - len(ids), length) if left else slice(0, len(ids))
+            input_ids[row, span] = ids
+            attention_mask[row, span] = mask
+        return {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(attention_mask)
+        }
+
+    def _capture_features(self, module, inputs, output):
+        """
+        인코더 forward hook: 요청한 스레드에만 요청한 문장 벡터 전달
+
+        - "head": 감정 헤드 입력 (pooler 출력, 없으면 첫 토큰 hidden state)
+        - "cls": 첫 토큰(패딩 제외)의 마지막 hidden state
+        - "mean": 패딩을 제외한 토큰 hidden state 평균
+        """
+        views = getattr(self._features, "views", None)
+        if views is None:
+            return
+        hidden = output[0]
+        mask = self._features.mask
+        for view, chunks in views.items():
+            if view == "head":
+                pooled = getattr(output, "pooler_output", None)
+                if pooled is None:
+                    pooled = hidden[:, 0]
+            elif view == "cls":
+                # 왼쪽 패딩 토크나이저도 실제 첫 토큰을 쓰도록 마스크의 첫 1 위치 사용
+                pooled = hidden[torch.arange(hidden.shape[0]), mask.argmax(dim=1)]
+            else:
+                weights = mask.unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * weights).sum(dim=1) / weights.sum(dim=1).clamp(min=1.0)
+            chunks.append(pooled.detach().float().numpy())
+
+    @staticmethod
+    def _poolings(embedding: Optional[str]) -> Tuple[str, ...]:
+        if embedding is None:
+            return ()
+        if embedding not in EMBEDDING_POOLINGS:
+            raise ValueError(f"지원하지 않는 임베딩 풀링 방식입니다: {embedding}")
+        return (embedding,)
+
+    def _predict_heads(
+        self,
+        texts: List[str],
+        calibrated: bool = True,
+        emotions: bool = True,
+        pooling: Sequence[str] = ()
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, np.ndarray]]:
+        """
+        인코더를 한 번 실행해 감정 극성 확률, 감정 확률, 문장 벡터를 함께 계산
+
+        Args:
+            calibrated: True면 보정기(있을 때)를 배치 전체에 한 번에 적용
+            emotions: False면 감정 헤드가 있어도 감정 확률을 계산하지 않음
+            pooling: 함께 받을 문장 벡터 ("head": 감정 헤드 입력, "cls"/"mean": 임베딩)
+
+        Returns:
+            (probs, emotion_probs, vectors)
+            - probs: (N, num_labels) float32 원본 레이블 확률
+            - emotion_probs: (N, 감정 수) 감정 확률 (감정 헤드가 없거나 emotions=False면 None)
+            - vectors: {pooling: (N, hidden) float32 문장 벡터}
+        """
+        encodings = self.token_cache.encode(self._tokenizer_key, texts, self._tokenize)
+        want_emotions = emotions and self.emotion_head is not None
+        views = {view: [] for view in pooling}
+        if want_emotions:
+            views.setdefault("head", [])
+
+        batch_size = self.settings.inference_batch_size
+        chunks = []
+        self._features.views = views or None
+        try:
+            with self.replicas.acquire() as replica:
+                for i in range(0, len(encodings), batch_size):
+                    inputs = self._pad(encodings[i:i + batch_size], replica.tokenizer)
+                    self._features.mask = inputs["attention_mask"]
+                    with torch.no_grad():
+                        logits = replica.model(**inputs).logits
+                    chunks.append(torch.nn.functional.softmax(logits, dim=-1).numpy())
+        finally:
+            self._features.views = None
+            self._features.mask = None
+
+        if not chunks:
+            return np.zeros((0, len(self.raw_labels)), dtype=np.float32), None, {
+                view: np.zeros((0, self.model.config.hidden_size), dtype=np.float32) for view in pooling
+            }
+        probs = np.concatenate(chunks).astype(np.float32, copy=False)
+        if calibrated and self.calibrator is not None:
+            probs = self.calibrator.apply(probs)
+        vectors = {view: np.concatenate(view_chunks) for view, view_chunks in views.items()}
+        emotion_probs = self.emotion_head.predict_proba(vectors["head"]) if want_emotions else None
+        return probs, emotion_probs, {view: vectors[view] for view in pooling}
+
+    def _predict_proba(self, texts: List[str], calibrated: bool = True) -> np.ndarray:
+        """
+        텍스트 목록의 원본 레이블 확률 행렬 계산 (토큰화 결과는 공유 캐시 사용)
+
+        Args:
+            calibrated: True면 보정기(있을 때)를 배치 전체에 한 번에 적용
+
+        Returns:
+            (N, num_labels) float32 행렬
+        """
+        return self._predict_heads(texts, calibrated=calibrated, emotions=False)[0]
+
+    def encode_features(self, texts: List[str]) -> np.ndarray:
+        """감정 헤드 입력과 같은 (N, hidden) 문장 벡터 (헤드 학습용)"""
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("입력 텍스트가 비어있습니다")
+        return self._predict_heads(texts, emotions=False, pooling=("head",))[2]["head"]
+
+    def embed(self, texts: List[str], pooling: str = "cls") -> np.ndarray:
+        """
+        문장 임베딩 (분류와 같은 인코더 forward, 토큰화 캐시 공유)
+
+        Args:
+            texts: 임베딩할 텍스트 목록 (max_text_length자에서 잘림, predict와 같음)
+            pooling: "cls" 또는 "mean"
+
+        Returns:
+            (N, hidden) float32 행렬
+        """
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("입력 텍스트가 비어있습니다")
+        self._poolings(pooling)
+        inputs = [text[:self.settings.max_text_length] for text in texts]
+        return self._predict_heads(inputs, emotions=False, pooling=(pooling,))[2][pooling]
+
+    @property
+    def embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+
+    def _emotion_dict(self, row: np.ndarray) -> Dict[str, Any]:
+        """감정 확률 한 행 → {"labels": 임계값 이상 감정 (높은 순), "scores": 레이블별 확률}"""
+        threshold = self.settings.emotion_threshold
+        ranked = sorted(zip(self.emotion_head.labels, row.tolist()), key=lambda item: -item[1])
+        return {
+            "labels": [label for label, score in ranked if score >= threshold],
+            "scores": {label: round(score, 4) for label, score in zip(self.emotion_head.labels, row.tolist())}
+        }
+
+    @property
+    def tasks(self) -> Tuple[str, ...]:
+        """지원하는 작업 (감정 헤드가 없으면 sentiment만)"""
+        return TASKS if self.emotion_head is not None else TASKS[:1]
+
+    def predict_scores_batch(self, texts: List[str], calibrated: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        여러 텍스트의 점수 행렬 반환 (분석 작업용, dict 변환 없음)
+
+        Args:
+            calibrated: False면 보정 전 softmax 확률 (보정기 학습용)
+
+        Returns:
+            (raw_scores, sentiment_scores)
+            - raw_scores: (N, num_labels) float32 원본 레이블 확률 (열 순서: self.raw_labels)
+            - sentiment_scores: (N, 3) float32 negative/neutral/positive 합산 확률 (열 순서: SENTIMENT_GROUPS)
+        """
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("입력 텍스트가 비어있습니다")
+
+        raw_scores = self._predict_proba(texts, calibrated=calibrated)
+        return raw_scores, raw_scores @ self.group_projection
+
+    def scores_to_dicts(self, raw_scores: np.ndarray, sentiment_scores: np.ndarray) -> List[Dict[str, Any]]:
+        """점수 행렬을 predict_with_scores 형식의 dict 목록으로 변환 (API 응답 직전에만 사용)"""
+        results = []
+        best = sentiment_scores.argmax(axis=1)
+        for raw_row, group_row, group_idx in zip(raw_scores.tolist(), sentiment_scores.tolist(), best):
+            results.append({
+                "sentiment": SENTIMENT_GROUPS[group_idx],
+                "scores": {k: round(v, 4) for k, v in zip(SENTIMENT_GROUPS, group_row)},
+                "confidence": round(group_row[group_idx], 4),
+                "raw_scores": {k: round(v, 4) for k, v in zip(self.raw_labels, raw_row)},
+                "model": "multilingual" if self.use_multilingual else "english-only"
+            })
+        return results
+
     def predict_with_scores(self, text: str) -> Dict[str, Any]:
         """
         모든 감정 점수 반환 (별점 모델용)
@@ -174,49 +525,154 @@ class SentimentModelImproved:
         start_time = time.time()
 
         try:
-            # 모든 레이블의 점수 가져오기
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                scores = torch.nn.functional.softmax(outputs.logits, dim=-1)[0]
-
-            # 점수를 감정별로 그룹화
-            sentiment_scores = {
-                'negative': 0.0,
-                'neutral': 0.0,
-                'positive': 0.0
+            result = self.scores_to_dicts(*self.predict_scores_batch([text]))[0]
+            result["processing_time"] = round(time.time() - start_time, 3)
+            return result
+
+        except Exception as e:
+            logger.error(f"Detailed prediction failed: {e}")
+            raise
+
+    def predict_document(
+        self,
+        text: str,
+        pooling: str = "mean",
+        include_windows: bool = False
+    ) -> Dict[str, Any]:
+        """
+        긴 문서 감정 예측 (슬라이딩 윈도우)
+
+        텍스트를 한 번 토큰화한 뒤 stride만큼 겹치는 토큰 윈도우로 나누고,
+        모든 윈도우를 배치로 한 번에 추론한 다음 pooling 방식으로 집계합니다.
+
+        Args:
+            text: 분석할 문서 (최대 max_document_length자)
+            pooling: "mean" (평균), "max" (레이블별 최댓값), "length_weighted" (토큰 수 가중 평균)
+            include_windows: True면 윈도우별 결과 포함
+
+        Returns:
+            {
+                "sentiment": "positive",
+                "confidence": 0.81,
+                "scores": {"negative": 0.07, "neutral": 0.12, "positive": 0.81},
+                "pooling": "mean",
+                "num_windows": 7,
+                "num_tokens": 2431,
+                "windows": [{"start": 0, "end": 1530, "num_tokens": 510, ...}, ...],  # include_windows=True일 때
+                "processing_time": 0.412
             }
+        """
+        if not text or not text.strip():
+            raise ValueError("입력 텍스트가 비어있습니다")
+        if pooling not in POOLING_METHODS:
+            raise ValueError(f"지원하지 않는 pooling 방식입니다: {pooling} (가능: {', '.join(POOLING_METHODS)})")
+        if len(text) > self.settings.max_document_length:
+            raise ValueError(f"문서가 너무 깁니다 (최대 {self.settings.max_document_length}자)")
 
-            raw_scores = {}
-            for idx, score in enumerate(scores):
-                # 모델의 id2label 매핑 사용
-                label = self.model.config.id2label.get(idx, f'LABEL_{idx}')
-                raw_scores[label] = float(score)
+        window_body = self.settings.document_window_tokens - self._num_special_tokens
+        stride = self.settings.document_window_stride
+        if not 0 <= stride < window_body:
+            raise ValueError("document_window_stride는 윈도우 길이보다 작아야 합니다")
 
-                # 감정 카테고리로 매핑
-                mapped_sentiment = self.label_mapping.get(label, 'neutral')
-                sentiment_scores[mapped_sentiment] += float(score)
+        start_time = time.time()
 
-            # 가장 높은 점수의 감정 선택
+        try:
+            with self.replicas.acquire() as replica:
+                tokenizer = replica.tokenizer
+                # 문서 전체를 한 번만 토큰화 (특수 토큰 없이, 문자 오프셋 포함)
+                encoding = tokenizer(
+                    text,
+                    add_special_tokens=False,
+                    return_offsets_mapping=True,
+                    verbose=False
+                )
+                token_ids = encoding["input_ids"]
+                offsets = encoding["offset_mapping"]
+
+                # 겹치는 윈도우 시작 위치 계산
+                starts = [0]
+                while starts[-1] + window_body < len(token_ids):
+                    starts.append(starts[-1] + window_body - stride)
+                if len(starts) > self.settings.document_max_windows:
+                    raise ValueError(f"윈도우 수가 너무 많습니다 (최대 {self.settings.document_max_windows}개)")
+
+                # 단일 문장 형식 ([CLS] x [SEP] / <s> x </s>)으로 윈도우 구성
+                windows = [token_ids[s:s + window_body] for s in starts]
+                cls_id, sep_id = tokenizer.cls_token_id, tokenizer.sep_token_id
+                batch = tokenizer.pad(
+                    {"input_ids": [[cls_id] + w + [sep_id] for w in windows]},
+                    return_tensors="pt"
+                )
+
+                # 모든 윈도우를 inference_batch_size 단위로 추론
+                batch_size = self.settings.inference_batch_size
+                with torch.no_grad():
+                    probs = torch.cat([
+                        torch.nn.functional.softmax(
+                            replica.model(
+                                input_ids=batch["input_ids"][i:i + batch_size],
+                                attention_mask=batch["attention_mask"][i:i + batch_size]
+                            ).logits,
+                            dim=-1
+                        )
+                        for i in range(0, len(windows), batch_size)
+                    ])
+
+            if self.calibrator is not None:
+                probs = torch.from_numpy(self.calibrator.apply(probs.numpy()))
+
+            # 윈도우 점수 집계
+            if pooling == "mean":
+                pooled = probs.mean(dim=0)
+            elif pooling == "max":
+                pooled = probs.max(dim=0).values
+                pooled = pooled / pooled.sum()
+            else:
+                lengths = torch.tensor([len(w) for w in windows], dtype=probs.dtype)
+                pooled = (probs * (lengths / lengths.sum()).unsqueeze(1)).sum(dim=0)
+
+            sentiment_scores = self._group_scores(pooled)
             sentiment = max(sentiment_scores, key=sentiment_scores.get)
-            confidence = sentiment_scores[sentiment]
-
-            processing_time = time.time() - start_time
 
-            return {
+            result = {
                 "sentiment": sentiment,
+                "confidence": round(sentiment_scores[sentiment], 4),
                 "scores": {k: round(v, 4) for k, v in sentiment_scores.items()},
-                "confidence": round(confidence, 4),
-                "raw_scores": {k: round(v, 4) for k, v in raw_scores.items()},
-                "processing_time": round(processing_time, 3),
+                "pooling": pooling,
+                "num_windows": len(windows),
+                "num_tokens": len(token_ids),
                 "model": "multilingual" if self.use_multilingual else "english-only"
             }
 
+            if include_windows:
+                result["windows"] = []
+                for start, window, window_probs in zip(starts, windows, probs):
+                    window_scores = self._group_scores(window_probs)
+                    window_sentiment = max(window_scores, key=window_scores.get)
+                    last = start + len(window) - 1
+                    result["windows"].append({
+                        "start": offsets[start][0] if window else 0,
+                        "end": offsets[last][1] if window else 0,
+                        "num_tokens": len(window),
+                        "sentiment": window_sentiment,
+                        "confidence": round(window_scores[window_sentiment], 4),
+                        "scores": {k: round(v, 4) for k, v in window_scores.items()}
+                    })
+
+            result["processing_time"] = round(time.time() - start_time, 3)
+            return result
+
+        except ValueError:
+            raise
         except Exception as e:
-            logger.error(f"Detailed prediction failed: {e}")
+            logger.error(f"Document prediction failed: {e}")
             raise
 
+    def _group_scores(self, scores) -> Dict[str, float]:
+        """원본 레이블 점수를 negative/neutral/positive로 합산"""
+        grouped = np.asarray(scores, dtype=np.float32) @ self.group_projection
+        return dict(zip(SENTIMENT_GROUPS, grouped.tolist()))
+
     def health_check(self) -> bool:
         """모델 정상 작동 확인"""
         try:
@@ -240,11 +696,18 @@ class SentimentModelImproved:
         return {
             "model_name": self.model_name,
             "model_type": "multilingual" if self.use_multilingual else "english-only",
+            "model_variant": self.model_variant if self.use_multilingual else None,
             "supported_languages": "한국어, 영어, 중국어, 일본어 등 100+ 언어" if self.use_multilingual else "영어만",
             "cache_dir": self.settings.model_cache_dir,
+            "artifact_path": self.settings.model_artifact_path,
             "max_text_length": self.settings.max_text_length,
             "device": "cpu",
             "loaded": self.pipeline is not None,
+            "replicas": self.replicas.get_stats() if self.replicas is not None else None,
+            "calibration": self.calibrator.to_dict() if self.calibrator is not None else None,
+            "tasks": list(self.tasks),
+            "emotion_head": self.emotion_head.to_dict() if self.emotion_head is not None else None,
+            "embedding": {"dimension": self.embedding_dimension, "poolings": list(EMBEDDING_POOLINGS)},
             "label_mapping": self.label_mapping
         }
 
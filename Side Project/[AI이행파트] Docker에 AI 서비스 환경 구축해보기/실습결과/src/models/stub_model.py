@@ -0,0 +1,127 @@
+"""
+결정적 스텁 모델 (가중치 없이 성능 테스트)
+
+모델 다운로드 없이 배칭/캐시/스케줄링을 부하 테스트할 수 있도록
+실제 모델과 같은 인터페이스(SentimentPredictor)를 제공합니다.
+
+- 결과: 텍스트 해시로 만든 점수 → 같은 텍스트는 항상 같은 결과 (배치 구성과 무관)
+- 지연: 배치당 고정 비용 + 토큰당 비용 × 배치 크기 × 가장 긴 텍스트의 토큰 수
+  (실제 모델처럼 배치를 가장 긴 텍스트 길이로 패딩한다고 가정)
+
+서버에서 사용:
+    INFERENCE_BACKEND=stub STUB_LATENCY_PER_BATCH_MS=20 STUB_LATENCY_PER_TOKEN_MS=0.05 python main.py
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.config import get_settings
+
+SENTIMENTS = ("negative", "neutral", "positive")
+
+
+def _count_tokens(text: str) -> int:
+    """공백 단위 토큰 수 + 특수 토큰 2개 ([CLS], [SEP])"""
+    return len(text.split()) + 2
+
+
+class StubSentimentModel:
+    """
+    텍스트 해시 기반 결정적 감정 모델
+
+    Args:
+        latency_per_token_ms: 토큰당 합성 지연 (None이면 설정값)
+        latency_per_batch_ms: 배치당 합성 지연 (None이면 설정값)
+        seed: 같은 텍스트에 다른 결과가 필요할 때 바꾸는 값
+    """
+
+    def __init__(
+        self,
+        latency_per_token_ms: Optional[float] = None,
+        latency_per_batch_ms: Optional[float] = None,
+        seed: int = 0
+    ):
+        self.settings = get_settings()
+        self.latency_per_token_ms = (
+            self.settings.stub_latency_per_token_ms if latency_per_token_ms is None else float(latency_per_token_ms)
+        )
+        self.latency_per_batch_ms = (
+            self.settings.stub_latency_per_batch_ms if latency_per_batch_ms is None else float(latency_per_batch_ms)
+        )
+        self.seed = int(seed)
+        self.model_name = "stub"
+        self.calls = 0
+        self.texts_processed = 0
+
+    def batch_latency(self, texts: List[str]) -> float:
+        """배치 하나의 합성 지연 (초)"""
+        if not texts:
+            return 0.0
+        padded_tokens = len(texts) * max(_count_tokens(text) for text in texts)
+        return (self.latency_per_batch_ms + self.latency_per_token_ms * padded_tokens) / 1000
+
+    def scores(self, text: str) -> np.ndarray:
+        """텍스트의 감정별 확률 (negative, neutral, positive)"""
+        digest = hashlib.blake2b(f"{self.seed}:{text}".encode("utf-8"), digest_size=6).digest()
+        logits = np.frombuffer(digest, dtype=np.uint16).astype(np.float64) / 65535 * 4
+        probs = np.exp(logits - logits.max())
+        return probs / probs.sum()
+
+    def _validate(self, texts: List[str]) -> List[str]:
+        inputs = []
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("입력 텍스트가 비어있습니다")
+            inputs.append(text[:self.settings.max_text_length])
+        return inputs
+
+    def _results(self, inputs: List[str]) -> List[Dict[str, Any]]:
+        start_time = time.time()
+        delay = self.batch_latency(inputs)
+        if delay > 0:
+            time.sleep(delay)
+        self.calls += 1
+        self.texts_processed += len(inputs)
+        processing_time = round((time.time() - start_time) / len(inputs), 3)
+
+        results = []
+        for text in inputs:
+            probs = self.scores(text)
+            best = int(probs.argmax())
+            results.append({
+                "sentiment": SENTIMENTS[best],
+                "confidence": round(float(probs[best]), 4),
+                "processing_time": processing_time,
+                "model": "stub"
+            })
+        return results
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """텍스트 감정 예측"""
+        return self._results(self._validate([text]))[0]
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """여러 텍스트 감정 예측 (합성 지연은 배치 단위로 한 번)"""
+        if not texts:
+            return []
+        return self._results(self._validate(texts))
+
+    def health_check(self) -> bool:
+        return True
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """모델 정보 반환"""
+        return {
+            "model_name": self.model_name,
+            "model_type": "stub",
+            "latency_per_token_ms": self.latency_per_token_ms,
+            "latency_per_batch_ms": self.latency_per_batch_ms,
+            "seed": self.seed,
+            "calls": self.calls,
+            "texts_processed": self.texts_processed,
+            "device": "cpu",
+            "loaded": True
+        }
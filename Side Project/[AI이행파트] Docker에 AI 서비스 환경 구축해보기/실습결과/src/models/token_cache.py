@@ -0,0 +1,139 @@
+"""
+토크나이저 출력 캐시
+
+같은 텍스트가 반복되면 토큰화 결과(input_ids, attention_mask)를 재사용합니다.
+키에 토크나이저 식별자가 포함되므로 모델을 교체해도 이전 토크나이저의 결과가 섞이지 않습니다.
+메모리 사용량(바이트) 기준 LRU로 제거합니다.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.config import get_settings
+
+# 배열 외 항목별 부가 비용 추정치 (키 문자열, dict/tuple 오버헤드)
+_ENTRY_OVERHEAD = 200
+
+Encoding = Tuple[np.ndarray, np.ndarray]
+
+
+def _entry_size(text: str, encoding: Encoding) -> int:
+    input_ids, attention_mask = encoding
+    return len(text.encode("utf-8")) + input_ids.nbytes + attention_mask.nbytes + _ENTRY_OVERHEAD
+
+
+class TokenizerCache:
+    """
+    메모리 제한 LRU 토큰화 결과 캐시 (스레드 안전)
+
+    Args:
+        max_bytes: 캐시가 사용할 최대 메모리 (0이면 캐시 비활성화)
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Encoding, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tokenizer_key: Hashable, text: str) -> Optional[Encoding]:
+        """캐시된 토큰화 결과 (없으면 None)"""
+        key = (tokenizer_key, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, tokenizer_key: Hashable, text: str, encoding: Encoding):
+        """토큰화 결과 저장 (한도를 넘으면 가장 오래 쓰지 않은 항목부터 제거)"""
+        size = _entry_size(text, encoding)
+        if size > self.max_bytes:
+            return
+
+        key = (tokenizer_key, text)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (encoding, size)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def encode(
+        self,
+        tokenizer_key: Hashable,
+        texts: List[str],
+        tokenize: Callable[[List[str]], List[Encoding]]
+    ) -> List[Encoding]:
+        """
+        텍스트 목록의 토큰화 결과 (캐시에 없는 텍스트만 모아서 tokenize 한 번 호출)
+
+        Args:
+            tokenizer_key: 토크나이저 식별자 (이름, 객체 id, 최대 길이 등)
+            tokenize: 텍스트 목록 → [(input_ids, attention_mask), ...]
+        """
+        encodings: List[Optional[Encoding]] = [self.get(tokenizer_key, text) for text in texts]
+        missing = [i for i, encoding in enumerate(encodings) if encoding is None]
+
+        if missing:
+            # 같은 요청 안의 중복 텍스트는 한 번만 토큰화
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            fresh = dict(zip(unique, tokenize(unique)))
+            for text, encoding in fresh.items():
+                self.put(tokenizer_key, text, encoding)
+            for i in missing:
+                encodings[i] = fresh[texts[i]]
+
+        return encodings
+
+    def resize(self, max_bytes: int):
+        """메모리 한도 변경 (줄어들면 가장 오래 쓰지 않은 항목부터 즉시 제거)"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self.bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+@lru_cache()
+def get_token_cache() -> TokenizerCache:
+    """모든 모델이 공유하는 토큰화 결과 캐시"""
+    return TokenizerCache(get_settings().token_cache_max_bytes)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Literal, Optional
 import os
 from functools import lru_cache
 
@@ -13,10 +13,27 @@ class Settings(BaseSettings):
     model_name: str = "cardiffnlp/twitter-roberta-base-sentiment-latest"
     model_cache_dir: str = "/tmp/models"
     max_text_length: int = 512
+    # Multilingual model variant: "teacher" (BERT-base) or "student" (distilled, see models/distillation.py)
+    model_variant: str = "teacher"
+    student_model_path: str = "/app/models/student"
+    # Bundled model directory (models/artifacts.py); when set, the model is loaded from it offline only
+    model_artifact_path: Optional[str] = None
+    model_artifact_verify: bool = True  # check manifest checksums before loading
+    # Probability calibration (models/calibration.py); defaults to calibration.json in the artifact directory
+    calibration_enabled: bool = True
+    calibration_path: Optional[str] = None
+    # Emotion head over the sentiment encoder (models/emotion_head.py); defaults to emotion_head.pt in the artifact directory
+    emotion_head_path: Optional[str] = None
+    emotion_threshold: float = 0.5  # emotions at or above this probability are listed in "labels"
 
     # Logging configuration
     log_level: str = "INFO"
-    log_format: str = "json"
+    log_format: str = "json"  # "json" or "text"
+    log_dir: str = "/app/logs"  # rotating app.log is written here when the directory exists
+    log_file_max_bytes: int = 10 * 1024 * 1024
+    log_file_backup_count: int = 5
+    log_queue_size: int = 10000  # records beyond this are dropped instead of blocking requests
+    log_sample_rates: Dict[str, float] = {"/predict": 0.1}  # fraction of success logs kept per route
 
     # API configuration
     api_title: str = "AI Sentiment Analysis Service"
@@ -26,6 +43,95 @@ class Settings(BaseSettings):
     # Performance configuration
     max_workers: int = 4
     request_timeout: int = 30
+    inference_batch_size: int = 32
+    # Inference replicas (models/replica_pool.py): each has its own tokenizer copy and shares the weights;
+    # 1 serializes inference, N lets N requests run the model in parallel
+    model_replicas: int = 1
+    # "thread": model in the API process; "process": worker processes each holding a replica (models/process_pool.py);
+    # "stub": deterministic stand-in with synthetic latency, for load tests without weights (models/stub_model.py)
+    inference_backend: Literal["thread", "process", "stub"] = "thread"
+    inference_processes: int = 0  # worker processes for the "process" backend; 0 = CPU count
+    inference_process_threads: int = 1  # torch threads per worker process
+    stub_latency_per_batch_ms: float = 0.0
+    stub_latency_per_token_ms: float = 0.0  # times batch size x longest text's tokens (padding)
+    token_cache_max_bytes: int = 64 * 1024 * 1024  # tokenizer output LRU cache; 0 disables
+    inference_threads: int = 0  # torch intra-op threads in the API process; 0 keeps the torch default
+
+    # Micro-batching configuration
+    batching_enabled: bool = True
+    batch_max_wait_ms: float = 5.0
+    batch_max_size: int = 32
+    adaptive_batching: bool = True
+    batch_target_p99_ms: float = 200.0
+    batch_min_wait_ms: float = 0.0
+    batch_max_wait_limit_ms: float = 50.0
+    batch_max_size_limit: int = 64
+
+    # Admission control: shed load early (503 + Retry-After) when the SLO cannot be met
+    admission_enabled: bool = True
+    admission_slo_ms: float = 1000.0
+    admission_max_in_flight: int = 256
+    admission_route_limits: Dict[str, int] = {
+        "/predict": 128,
+        "/predict/batch": 16,
+        "/predict/document": 4,
+        "/embed": 16,
+        "/ws/predict": 16  # per streamed frame
+    }
+    admission_client_rate: float = 0.0  # requests/sec per client (429 when exceeded); 0 disables
+    admission_client_burst: int = 20
+
+    # WebSocket streaming (/ws/predict)
+    ws_max_in_flight: int = 1024  # unanswered messages per connection before the server stops reading
+    ws_max_frame_items: int = 500  # messages per client frame
+
+    # Prediction store (models/prediction_store.py): SQLite file of served predictions, also a warm
+    # result cache across restarts; disabled when the path is unset
+    prediction_store_path: Optional[str] = None
+    prediction_store_flush_interval: float = 0.5  # seconds a write batch may wait for more rows
+    prediction_store_batch_size: int = 500  # rows per transaction
+    prediction_store_queue_size: int = 10000  # pending rows; further results are not persisted
+    prediction_store_cache_entries: int = 100000  # in-memory cache warmed from the store at startup
+
+    # Shadow evaluation (api/shadow.py): a candidate model also scores a sample of live traffic
+    # in the background; results at /shadow/stats. The candidate is a second model in memory.
+    shadow_model: Optional[str] = None  # registry name, e.g. "english" or "improved"
+    shadow_model_options: Dict[str, str] = {}  # constructor options, e.g. '{"model_variant": "student"}'
+    shadow_fraction: float = 0.1
+    shadow_queue_size: int = 1000  # sampled texts waiting for the candidate; further samples are dropped
+    shadow_batch_size: int = 32
+
+    # Rolling aggregates per request key (/aggregates/{key}, api/aggregates.py)
+    aggregates_enabled: bool = True
+    aggregates_bucket_seconds: float = 10.0  # sliding-window resolution
+    aggregates_window_seconds: float = 3600.0
+    aggregates_tumbling_seconds: float = 300.0
+    aggregates_max_keys: int = 10000  # least recently updated keys are dropped beyond this
+
+    # Runtime configuration (utils/runtime_config.py): a safe subset of these settings can be
+    # changed without a restart through PATCH /admin/config or the watched file
+    runtime_config_path: Optional[str] = None  # JSON object of reloadable settings, applied when it changes
+    runtime_config_poll_seconds: float = 2.0
+    admin_token: Optional[str] = None  # required in X-Admin-Token for /admin/*; admin API is off when unset
+    profile_max_seconds: float = 30.0  # longest capture allowed by POST /admin/profile
+    profile_torch_max_seconds: float = 3.0  # longest capture with torch=true (its event buffer grows with traffic)
+
+    # Memory accounting (/metrics/memory, utils/memory.py)
+    memory_sample_seconds: float = 60.0  # RSS sampling interval for the growth slope (0 disables sampling)
+    memory_history_size: int = 1440  # samples kept (24 hours at 60s)
+    memory_tracemalloc_frames: int = 1  # frames per allocation once POST /admin/memory/snapshot starts tracing
+
+    # Degraded mode: serve the rule-based fallback while the model warms up or the queue is saturated
+    fallback_enabled: bool = True
+    fallback_queue_threshold: int = 256
+    fallback_lexicon_path: Optional[str] = None  # TSV "word<TAB>weight"; built-in lexicon when unset
+    model_background_loading: bool = True
+
+    # Long document configuration (sliding-window inference)
+    max_document_length: int = 20000
+    document_window_tokens: int = 512
+    document_window_stride: int = 128
+    document_max_windows: int = 128
 
     class Config:
         env_file = ".env"
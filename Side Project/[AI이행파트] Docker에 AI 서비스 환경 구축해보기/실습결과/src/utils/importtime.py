@@ -0,0 +1,109 @@
+"""
+Import-time report for cold start
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter, prints the
+slowest imports by cumulative time, and exits non-zero if the total exceeds a budget
+or if a forbidden module (torch, transformers) was imported.
+
+Usage (from src/):
+    python -m utils.importtime main --budget-ms 1500
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_FORBIDDEN = ("torch", "transformers")
+
+
+def measure(module: str, runs: int = 3) -> Tuple[List[Tuple[str, int, int]], str]:
+    """
+    Import `module` in fresh interpreters and keep the fastest run
+
+    The first run also warms the bytecode cache, so the best of several runs is
+    reproducible across machines with the same dependencies.
+
+    Returns:
+        ([(imported_module, self_us, cumulative_us), ...], raw_stderr)
+    """
+    best: List[Tuple[str, int, int]] = []
+    best_raw = ""
+    best_total = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr}")
+        rows = parse(completed.stderr)
+        total = total_us(rows, module)
+        if best_total is None or total < best_total:
+            best, best_raw, best_total = rows, completed.stderr, total
+    return best, best_raw
+
+
+def parse(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` lines: "import time: self | cumulative | name" """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def total_us(rows: List[Tuple[str, int, int]], module: str) -> int:
+    """Cumulative import time of the top-level module (0 if it was already imported)"""
+    for name, _, cumulative in rows:
+        if name.strip() == module:
+            return cumulative
+    return 0
+
+
+def report(rows: List[Tuple[str, int, int]], module: str, top: int = 15) -> Dict[str, int]:
+    """Print the slowest top-level dependencies and return {name: cumulative_us}"""
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative in slowest:
+        print(f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+    print(f"\nimport {module}: {total_us(rows, module) / 1000:.1f} ms")
+    return {name.strip(): cumulative for name, _, cumulative in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report for cold start")
+    parser.add_argument("module", nargs="?", default="main", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the import takes longer")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreter runs (fastest is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    parser.add_argument("--output", default=None, help="Write the raw -X importtime log here")
+    parser.add_argument(
+        "--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN),
+        help="Modules that must not be imported at startup"
+    )
+    args = parser.parse_args()
+
+    rows, raw = measure(args.module, runs=args.runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(raw)
+    imported = report(rows, args.module, top=args.top)
+
+    failed = False
+    leaked = [name for name in args.forbid if name in imported]
+    if leaked:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(leaked)}")
+        failed = True
+    total_ms = total_us(rows, args.module) / 1000
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"FAIL: import {args.module} took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Non-blocking structured logging
+
+Request handlers only put LogRecords on a bounded in-memory queue; a background
+QueueListener thread formats them (JSON or text) and writes them to stdout and a
+rotating file. Formatting is deferred to the writer thread, success logs can be
+sampled per route, and records are dropped (and counted) rather than blocking when
+the queue is full.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including fields passed via `extra=`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RouteSampler(logging.Filter):
+    """
+    Keeps only a fraction of success logs for busy routes
+
+    Applies to records below WARNING that carry a `route` attribute listed in `rates`;
+    warnings, errors and records without a route are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "route", None))
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and never formats in the calling thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so the record is handed over as is and
+        # message interpolation happens in the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _file_handler(settings) -> Optional[logging.Handler]:
+    """Rotating file handler under settings.log_dir, or None if the directory is missing or not writable"""
+    if not os.path.isdir(settings.log_dir):
+        return None
+    try:
+        return logging.handlers.RotatingFileHandler(
+            os.path.join(settings.log_dir, "app.log"),
+            maxBytes=settings.log_file_max_bytes,
+            backupCount=settings.log_file_backup_count,
+            encoding="utf-8"
+        )
+    except OSError as e:
+        print(f"File logging disabled ({settings.log_dir}): {e}", file=sys.stderr)
+        return None
+
+
+def setup_logging(settings) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a background writer thread
+
+    Safe to call more than once: the previous listener is stopped and replaced.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    formatter = JsonFormatter() if settings.log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if settings.log_dir:
+        file_handler = _file_handler(settings)
+        if file_handler is not None:
+            handlers.append(file_handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    if settings.log_sample_rates:
+        _queue_handler.addFilter(RouteSampler(settings.log_sample_rates))
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.log_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def set_sample_rates(rates: Dict[str, float]):
+    """Replace the per-route success-log sampling rates at runtime"""
+    if _queue_handler is None:
+        return
+    for log_filter in _queue_handler.filters:
+        if isinstance(log_filter, RouteSampler):
+            log_filter.rates = dict(rates)
+            return
+    if rates:
+        _queue_handler.addFilter(RouteSampler(rates))
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Queue depth and number of records dropped because the queue was full"""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,257 @@
+"""
+Memory accounting and leak detection
+
+The container restarts on failure only, so a slow leak shows up as RSS creeping over days.
+MemoryMonitor samples the process periodically and keeps a bounded RSS history, from which
+GET /metrics/memory reports the growth rate (least-squares slope, MB/hour) next to the
+things that can legitimately hold memory: torch/malloc allocator state, caches, queues,
+threads and file descriptors.
+
+When the slope stays positive, AllocationTracker finds where: the first
+POST /admin/memory/snapshot starts tracemalloc and takes a baseline, each following call
+returns the allocation sites that grew since the previous call. tracemalloc slows every
+allocation down, so it only runs between the first snapshot and DELETE.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_size_t) for name in (
+        "arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks", "fsmblks", "uordblks", "fordblks", "keepcost"
+    )]
+
+
+@lru_cache()
+def _mallinfo2():
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    try:
+        function = ctypes.CDLL(libc_name).mallinfo2
+    except (OSError, AttributeError):
+        return None  # not glibc, or glibc < 2.33
+    function.restype = _MallInfo2
+    return function
+
+
+def malloc_stats() -> Optional[Dict[str, int]]:
+    """
+    glibc heap usage: in use vs. held free by the allocator
+
+    RSS growing with free_bytes is fragmentation (memory not returned to the OS),
+    RSS growing with in_use_bytes is live objects, i.e. a leak or an unbounded cache.
+    """
+    function = _mallinfo2()
+    if function is None:
+        return None
+    info = function()
+    return {
+        "in_use_bytes": info.uordblks + info.hblkhd,
+        "free_bytes": info.fordblks,
+        "mmapped_bytes": info.hblkhd
+    }
+
+
+def torch_memory() -> Optional[Dict[str, Any]]:
+    """torch allocator stats (None until the model has imported torch)"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return None
+    stats: Dict[str, Any] = {"num_threads": torch.get_num_threads(), "cuda": None}
+    if torch.cuda.is_available():
+        stats["cuda"] = {
+            "allocated_bytes": torch.cuda.memory_allocated(),
+            "reserved_bytes": torch.cuda.memory_reserved(),
+            "peak_allocated_bytes": torch.cuda.max_memory_allocated()
+        }
+    # CPU tensors use malloc, so they are part of malloc_stats and RSS
+    return stats
+
+
+def fit_slope(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares slope of (x, y) points (None with fewer than 2 distinct x)"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+class MemoryMonitor:
+    """
+    Periodic RSS samples plus on-demand component sizes
+
+    Args:
+        history_size: RSS samples kept for the slope (with a 60s interval, 1440 = 24 hours)
+        clock: Time source (injectable for tests)
+    """
+
+    def __init__(self, history_size: int = 1440, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.history: deque = deque(maxlen=history_size)
+        self.peak_rss: Optional[int] = None
+        self._sources: Dict[str, Callable[[], Any]] = {}
+
+    def register(self, name: str, source: Callable[[], Any]):
+        """Report source() under components[name] (e.g. a cache's get_stats)"""
+        self._sources[name] = source
+
+    def sample(self) -> Optional[int]:
+        """Record the current RSS"""
+        rss = process_rss()
+        if rss is not None:
+            self.history.append((self.clock(), rss))
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        return rss
+
+    async def watch(self, interval: float):
+        """Sample every `interval` seconds (runs until cancelled)"""
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+    def slope_mb_per_hour(self) -> Optional[float]:
+        slope = fit_slope(list(self.history))
+        return None if slope is None else round(slope * 3600 / 2 ** 20, 3)
+
+    def _components(self) -> Dict[str, Any]:
+        components = {}
+        for name, source in self._sources.items():
+            try:
+                components[name] = source()
+            except Exception as e:
+                # Accounting must never fail the metrics endpoint
+                components[name] = {"error": str(e)}
+        return components
+
+    def get_stats(self) -> Dict[str, Any]:
+        # Read, not sampled: only watch() adds to the history, so scrapes do not skew the slope
+        rss = process_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        span = self.history[-1][0] - self.history[0][0] if self.history else 0.0
+        return {
+            "rss_bytes": rss,
+            "peak_rss_bytes": self.peak_rss,
+            "rss_slope_mb_per_hour": self.slope_mb_per_hour(),
+            "history_samples": len(self.history),
+            "history_seconds": round(span, 1),
+            "threads": threading.active_count(),
+            "open_fds": open_fds(),
+            "gc_counts": gc.get_count(),
+            "malloc": malloc_stats(),
+            "torch": torch_memory(),
+            "tracemalloc": tracemalloc.is_tracing(),
+            "components": self._components()
+        }
+
+
+class AllocationTracker:
+    """
+    tracemalloc snapshot diffs between successive calls
+
+    Args:
+        frames: Stack frames stored per allocation (more frames cost more memory and time)
+    """
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ])
+
+    def diff(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Start tracing (first call) or report growth since the previous call
+
+        Returns:
+            {"started": True} on the first call; afterwards the allocation sites with the
+            largest growth, and the current snapshot becomes the next baseline.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._baseline is None:
+                tracemalloc.start(self.frames)
+                self._baseline = self._snapshot()
+                logger.info("tracemalloc started (%d frames)", self.frames)
+                return {"started": True, "frames": self.frames}
+
+            snapshot = self._snapshot()
+            stats = snapshot.compare_to(self._baseline, "traceback" if self.frames > 1 else "lineno")
+            self._baseline = snapshot
+            traced, peak = tracemalloc.get_traced_memory()
+            growth: List[Dict[str, Any]] = [
+                {
+                    "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size
+                }
+                for stat in stats[:limit]
+            ]
+            return {
+                "started": False,
+                "traced_bytes": traced,
+                "traced_peak_bytes": peak,
+                "total_diff_bytes": sum(stat.size_diff for stat in stats),
+                "top": growth
+            }
+
+    def stop(self) -> bool:
+        """Stop tracing and drop the baseline (False if it was not running)"""
+        with self._lock:
+            was_tracing = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self._baseline = None
+            return was_tracing
+
+
+@lru_cache()
+def get_allocation_tracker() -> AllocationTracker:
+    """Shared tracker (tracemalloc is process-wide)"""
+    return AllocationTracker(get_settings().memory_tracemalloc_frames)
@@ -0,0 +1,203 @@
+"""
+Time-boxed profiling of the serving process
+
+Two views of the same window:
+
+- Python stacks: a sampler thread reads every thread's stack (sys._current_frames) each
+  `interval` and counts collapsed stacks. The result is in the "folded" format read by
+  flamegraph.pl, inferno and speedscope. Threads that are only waiting (leaf frame in
+  threading/queue/selectors...) are skipped unless include_idle is set.
+- Operators (opt-in): when torch is already loaded, torch.profiler records CPU time per
+  aten operator on all threads (inference runs in threadpool threads, not the profiler's).
+  Every operator call becomes an event kept until the capture ends, so under load its
+  buffer grows with traffic; callers should keep torch captures short.
+
+Overhead is bounded: one capture at a time, a capped duration, and a sampler cost of one
+stack walk per thread per interval. overhead_ratio counts the sampler plus the torch
+profiler's start, stop and event aggregation; the per-operator recording cost inside the
+inference threads is not measurable from here, so torch_events is reported alongside.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Leaf frames in these files mean the thread is blocked, not using CPU
+_IDLE_FILES = {"threading.py", "queue.py", "selectors.py", "thread.py", "connection.py"}
+
+_capture_lock = threading.Lock()
+
+
+class ProfileBusyError(RuntimeError):
+    """Another profile is being captured"""
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Counts collapsed Python stacks of all threads except its own
+
+    Args:
+        interval: Seconds between samples
+        include_idle: Keep stacks of threads blocked in waits/queues/selectors
+        max_depth: Frames kept per stack (deepest frames are kept)
+    """
+
+    def __init__(self, interval: float = 0.01, include_idle: bool = False, max_depth: int = 128):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.sampling_time = 0.0
+
+    def sample(self, skip: Optional[int] = None):
+        """Record the current stack of every thread (except `skip`)"""
+        started = time.perf_counter()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            if not self.include_idle and os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                self.idle += 1
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[tuple(reversed(labels))] += 1
+        self.samples += 1
+        self.sampling_time += time.perf_counter() - started
+
+    def run(self, duration: float):
+        """Sample in the calling thread for `duration` seconds"""
+        own = threading.get_ident()
+        deadline = time.perf_counter() + duration
+        next_sample = time.perf_counter()
+        while True:
+            self.sample(skip=own)
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            next_sample += self.interval
+            time.sleep(max(0.0, min(next_sample, deadline) - now))
+
+    def folded(self) -> str:
+        """Collapsed stacks, one "root;...;leaf count" line each (flamegraph.pl / speedscope input)"""
+        return "\n".join(
+            f"{';'.join(label.replace(';', ':') for label in stack)} {count}"
+            for stack, count in sorted(self.stacks.items())
+        )
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions by samples at the top of the stack (self) and anywhere on it (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                total[label] += count
+        sampled = sum(self.stacks.values()) or 1
+        return [
+            {
+                "function": label,
+                "self_samples": count,
+                "self_pct": round(count / sampled * 100, 2),
+                "total_pct": round(total[label] / sampled * 100, 2)
+            }
+            for label, count in own.most_common(limit)
+        ]
+
+
+def _torch_profiler():
+    """CPU profiler over all threads, or None when torch has not been loaded"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return None
+    from torch.profiler import ProfilerActivity, profile
+
+    try:
+        config = torch._C._profiler._ExperimentalConfig(profile_all_threads=True)
+        return profile(activities=[ProfilerActivity.CPU], experimental_config=config)
+    except (AttributeError, TypeError):
+        # Older torch: only ops on the profiling thread are recorded
+        return profile(activities=[ProfilerActivity.CPU])
+
+
+def _torch_ops(averages, limit: int) -> List[Dict[str, Any]]:
+    events = sorted(averages, key=lambda e: e.self_cpu_time_total, reverse=True)
+    return [
+        {
+            "name": event.key,
+            "calls": event.count,
+            "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+            "cpu_total_ms": round(event.cpu_time_total / 1000, 3)
+        }
+        for event in events[:limit]
+    ]
+
+
+def capture_profile(
+    duration: float,
+    interval: float = 0.01,
+    include_torch: bool = False,
+    include_idle: bool = False,
+    limit: int = 30
+) -> Dict[str, Any]:
+    """
+    Profile the process for `duration` seconds (blocks the calling thread)
+
+    Raises:
+        ProfileBusyError: when a capture is already running
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfileBusyError("A profile is already being captured")
+    try:
+        sampler = StackSampler(interval=interval, include_idle=include_idle)
+        profiler = _torch_profiler() if include_torch else None
+        torch_time = 0.0
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.start()
+            torch_time += time.perf_counter() - started
+            try:
+                sampler.run(duration)
+            finally:
+                stopping = time.perf_counter()
+                profiler.stop()
+                torch_time += time.perf_counter() - stopping
+        else:
+            sampler.run(duration)
+        elapsed = time.perf_counter() - started
+
+        torch_ops = torch_events = None
+        if profiler is not None:
+            aggregating = time.perf_counter()
+            averages = profiler.key_averages()
+            torch_ops = _torch_ops(averages, limit)
+            torch_events = sum(event.count for event in averages)
+            torch_time += time.perf_counter() - aggregating
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "samples": sampler.samples,
+            "idle_thread_samples": sampler.idle,
+            "overhead_ratio": round((sampler.sampling_time + torch_time) / elapsed, 5) if elapsed else 0.0,
+            "sampler_overhead_s": round(sampler.sampling_time, 4),
+            "torch_overhead_s": round(torch_time, 4) if profiler is not None else None,
+            "torch_events": torch_events,
+            "top_functions": sampler.top_functions(limit),
+            "torch_ops": torch_ops,
+            "folded": sampler.folded()
+        }
+    finally:
+        _capture_lock.release()
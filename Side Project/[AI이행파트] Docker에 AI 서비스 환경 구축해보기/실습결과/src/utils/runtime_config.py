@@ -0,0 +1,235 @@
+"""
+Hot-reloadable runtime configuration
+
+`get_settings()` returns one cached Settings object. A safe subset of its performance knobs
+(RELOADABLE_FIELDS) can be changed while the service runs, via the admin API
+(PATCH /admin/config) or a watched JSON file (RUNTIME_CONFIG_PATH):
+
+1. Every change set is validated as a whole (field types from Settings, plus range rules);
+   an invalid change set is rejected and nothing is applied.
+2. Values are assigned on the shared Settings object, so code that reads get_settings()
+   per request sees them immediately.
+3. Listeners push the new values into components that copied them at construction
+   (micro-batcher, admission controller, tokenizer cache, log level, torch threads...).
+   If a listener fails, the previous values are restored.
+4. Each applied change bumps the config version and is written to the audit log.
+
+Fields outside the subset (model, ports, paths, worker counts...) still need a restart.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from pydantic import TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+# Audit records are kept even when LOG_LEVEL is raised above INFO
+audit_logger = logging.getLogger("audit.config")
+audit_logger.setLevel(logging.INFO)
+
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Field -> (check, message); checked after type validation
+_RULES: Dict[str, tuple] = {
+    "log_level": (lambda v: v.upper() in _LOG_LEVELS, f"must be one of {', '.join(_LOG_LEVELS)}"),
+    "log_sample_rates": (lambda v: all(0.0 <= r <= 1.0 for r in v.values()), "rates must be between 0 and 1"),
+    "inference_threads": (lambda v: v >= 0, "must be >= 0 (0 keeps the torch default)"),
+    "token_cache_max_bytes": (lambda v: v >= 0, "must be >= 0"),
+    "batch_max_wait_ms": (lambda v: v >= 0, "must be >= 0"),
+    "batch_max_size": (lambda v: v >= 1, "must be >= 1"),
+    "batch_target_p99_ms": (lambda v: v > 0, "must be > 0"),
+    "batch_min_wait_ms": (lambda v: v >= 0, "must be >= 0"),
+    "batch_max_wait_limit_ms": (lambda v: v >= 0, "must be >= 0"),
+    "batch_max_size_limit": (lambda v: v >= 1, "must be >= 1"),
+    "admission_slo_ms": (lambda v: v > 0, "must be > 0"),
+    "admission_max_in_flight": (lambda v: v >= 1, "must be >= 1"),
+    "admission_route_limits": (lambda v: all(limit >= 1 for limit in v.values()), "limits must be >= 1"),
+    "admission_client_rate": (lambda v: v >= 0, "must be >= 0 (0 disables)"),
+    "admission_client_burst": (lambda v: v >= 1, "must be >= 1"),
+    "fallback_enabled": (lambda v: True, ""),
+    "fallback_queue_threshold": (lambda v: v >= 1, "must be >= 1"),
+    "ws_max_in_flight": (lambda v: v >= 1, "must be >= 1"),
+    "ws_max_frame_items": (lambda v: v >= 1, "must be >= 1"),
+    "shadow_fraction": (lambda v: 0.0 <= v <= 1.0, "must be between 0 and 1"),
+    "prediction_store_flush_interval": (lambda v: v >= 0, "must be >= 0"),
+    "prediction_store_batch_size": (lambda v: v >= 1, "must be >= 1"),
+}
+
+RELOADABLE_FIELDS = frozenset(_RULES)
+
+Listener = Callable[[Any, Set[str]], None]
+
+
+class ConfigError(ValueError):
+    """A change set was rejected; `errors` maps field -> reason"""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(f"{field}: {reason}" for field, reason in errors.items()))
+        self.errors = errors
+
+
+class RuntimeConfig:
+    """
+    Validates, applies and audits runtime changes to the shared Settings object
+
+    Args:
+        settings: The cached Settings instance (get_settings())
+        history_size: Audit entries kept in memory for GET /admin/config/history
+    """
+
+    def __init__(self, settings, history_size: int = 100):
+        self.settings = settings
+        self.version = 0
+        self.rejected = 0
+        self.last_applied_at: Optional[float] = None
+        self.last_source: Optional[str] = None
+        self.history: deque = deque(maxlen=history_size)
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+        self._file_mtime: Optional[float] = None
+
+    def subscribe(self, listener: Listener):
+        """Register listener(settings, changed_fields), called after each applied change set"""
+        self._listeners.append(listener)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values of the reloadable fields"""
+        return {field: getattr(self.settings, field) for field in sorted(RELOADABLE_FIELDS)}
+
+    def validate(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Typed values for a change set, or ConfigError listing every invalid field"""
+        if not isinstance(changes, dict):
+            raise ConfigError({"*": "changes must be a JSON object"})
+        errors: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+        fields = type(self.settings).model_fields
+        for field, raw in changes.items():
+            if field not in fields:
+                errors[field] = "unknown setting"
+                continue
+            if field not in RELOADABLE_FIELDS:
+                errors[field] = "not reloadable at runtime (restart required)"
+                continue
+            try:
+                value = TypeAdapter(fields[field].annotation).validate_python(raw)
+            except ValidationError as e:
+                errors[field] = e.errors()[0]["msg"]
+                continue
+            check, message = _RULES[field]
+            if not check(value):
+                errors[field] = message
+                continue
+            values[field] = value.upper() if field == "log_level" else value
+
+        merged = {**self.snapshot(), **values}
+        if not errors and merged["batch_min_wait_ms"] > merged["batch_max_wait_limit_ms"]:
+            errors["batch_min_wait_ms"] = "must be <= batch_max_wait_limit_ms"
+        if errors:
+            raise ConfigError(errors)
+        return values
+
+    def apply(self, changes: Dict[str, Any], source: str, actor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validate and apply a change set atomically
+
+        Returns:
+            The audit entry (version and {field: [old, new]}); values equal to the current
+            ones are ignored, and an empty change set does not bump the version.
+        """
+        with self._lock:
+            try:
+                values = self.validate(changes)
+            except ConfigError as e:
+                self.rejected += 1
+                audit_logger.warning("Runtime config change rejected", extra={
+                    "config_source": source, "actor": actor, "errors": e.errors
+                })
+                raise
+
+            old = {field: getattr(self.settings, field) for field in values}
+            diff = {field: [old[field], value] for field, value in values.items() if old[field] != value}
+            if not diff:
+                return {"version": self.version, "changes": {}}
+
+            self._assign({field: new for field, (_, new) in diff.items()})
+            try:
+                self._notify(set(diff))
+            except Exception as e:
+                self._assign({field: previous for field, (previous, _) in diff.items()})
+                self._notify(set(diff))
+                self.rejected += 1
+                logger.error("Runtime config change rolled back: %s", e)
+                raise ConfigError({field: f"could not be applied: {e}" for field in diff}) from e
+
+            self.version += 1
+            self.last_applied_at = time.time()
+            self.last_source = source
+            entry = {
+                "version": self.version,
+                "timestamp": self.last_applied_at,
+                "source": source,
+                "actor": actor,
+                "changes": diff
+            }
+            self.history.append(entry)
+        audit_logger.info("Runtime config changed", extra={
+            "config_version": entry["version"], "config_source": source, "actor": actor, "changes": diff
+        })
+        return entry
+
+    def _assign(self, values: Dict[str, Any]):
+        for field, value in values.items():
+            setattr(self.settings, field, value)
+
+    def _notify(self, changed: Set[str]):
+        for listener in self._listeners:
+            listener(self.settings, changed)
+
+    # ------------------------------------------------------------------ file watch
+
+    def load_file(self, path: str) -> Optional[Dict[str, Any]]:
+        """Apply the JSON file if it changed since the last load (None when unchanged or missing)"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._file_mtime:
+            return None
+        self._file_mtime = mtime
+        try:
+            with open(path, encoding="utf-8") as f:
+                changes = json.load(f)
+        except ValueError as e:
+            self.rejected += 1
+            logger.error("Ignoring runtime config file %s: invalid JSON (%s)", path, e)
+            return None
+        try:
+            return self.apply(changes, source=f"file:{path}")
+        except ConfigError as e:
+            logger.error("Ignoring runtime config file %s: %s", path, e)
+            return None
+
+    async def watch(self, path: str, interval: float):
+        """Poll the file's modification time and apply it when it changes (runs until cancelled)"""
+        while True:
+            self.load_file(path)
+            await asyncio.sleep(interval)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "rejected": self.rejected,
+            "last_applied_at": self.last_applied_at,
+            "last_source": self.last_source
+        }
+
+
+def changed_any(changed: Iterable[str], *fields: str) -> bool:
+    """Whether any of the fields is in the changed set"""
+    return not set(fields).isdisjoint(changed)
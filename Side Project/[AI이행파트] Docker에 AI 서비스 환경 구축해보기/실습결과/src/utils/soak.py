@@ -0,0 +1,224 @@
+"""
+Soak test: run the API under steady load and check that memory stops growing
+
+Starts the server with the stub model (no weights, so only the service's own memory is
+measured), drives /predict and /predict/batch with a mix of repeated and unique texts and
+keys (so every cache fills up to its bound and starts evicting), and samples RSS from
+GET /metrics/memory. After a warm-up share of the run is discarded, the least-squares RSS
+slope must stay under --max-slope-mb-per-hour; otherwise the exit code is 1.
+
+Usage (from src/):
+    python -m utils.soak --duration 14400 --concurrency 8 --max-slope-mb-per-hour 2
+    python -m utils.soak --url http://localhost:8000 --duration 600   # existing server
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.memory import fit_slope
+
+WORDS = ("good", "bad", "great", "terrible", "okay", "love", "hate", "fine", "service", "product",
+         "정말", "좋다", "최악", "배송", "보통", "만족", "별로", "추천")
+
+
+def _request(url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> Dict[str, Any]:
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """uvicorn with the stub model and quiet logs (extra settings via env)"""
+    server_env = {
+        **os.environ,
+        "INFERENCE_BACKEND": "stub",
+        "MODEL_BACKGROUND_LOADING": "false",
+        "LOG_LEVEL": "WARNING",
+        "LOG_DIR": "",
+        **(env or {})
+    }
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=src, env=server_env
+    )
+
+
+def wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if _request(f"{url}/health", timeout=2.0).get("model_loaded"):
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server at {url} not ready after {timeout}s")
+
+
+class LoadGenerator:
+    """
+    Client threads sending a steady mix of requests
+
+    About `unique_fraction` of the texts are new (cache misses and evictions), the rest
+    come from a small hot set (cache hits); keys are drawn from `key_space` values.
+    """
+
+    def __init__(self, url: str, concurrency: int, unique_fraction: float = 0.3, key_space: int = 50000,
+                 seed: int = 0):
+        self.url = url
+        self.concurrency = concurrency
+        self.unique_fraction = unique_fraction
+        self.key_space = key_space
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _text(self, rng: random.Random, counter: int) -> str:
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))
+        if rng.random() < self.unique_fraction:
+            return f"{words} #{self.seed}-{counter}"
+        return words[:40]
+
+    def _client(self, index: int):
+        rng = random.Random(self.seed * 1000 + index)
+        counter = 0
+        while not self._stop.is_set():
+            counter += 1
+            key = f"key-{rng.randrange(self.key_space)}"
+            try:
+                if rng.random() < 0.2:
+                    texts = [self._text(rng, f"{index}-{counter}-{i}") for i in range(rng.randint(2, 16))]
+                    _request(f"{self.url}/predict/batch", {"texts": texts, "key": key})
+                else:
+                    _request(f"{self.url}/predict", {"text": self._text(rng, f"{index}-{counter}"), "key": key})
+                failed = 0
+            except (OSError, ValueError):
+                failed = 1
+            with self._lock:
+                self.requests += 1
+                self.errors += failed
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._client, args=(i,), name=f"soak-client-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=15)
+
+
+def evaluate(samples: List[Tuple[float, int]], warmup: float, max_slope_mb_per_hour: float) -> Dict[str, Any]:
+    """
+    RSS slope after the warm-up share of the run
+
+    Args:
+        samples: (elapsed seconds, rss bytes)
+        warmup: Share of the run ignored while caches fill up (0-1)
+    """
+    if not samples:
+        return {"passed": False, "reason": "no memory samples"}
+    cutoff = samples[0][0] + (samples[-1][0] - samples[0][0]) * warmup
+    steady = [(t, rss) for t, rss in samples if t >= cutoff]
+    slope = fit_slope(steady)
+    if slope is None:
+        return {"passed": False, "reason": "not enough samples after warm-up"}
+    slope_mb_per_hour = slope * 3600 / 2 ** 20
+    return {
+        "passed": slope_mb_per_hour <= max_slope_mb_per_hour,
+        "slope_mb_per_hour": round(slope_mb_per_hour, 3),
+        "max_slope_mb_per_hour": max_slope_mb_per_hour,
+        "steady_samples": len(steady),
+        "rss_start_mb": round(steady[0][1] / 2 ** 20, 1),
+        "rss_end_mb": round(steady[-1][1] / 2 ** 20, 1),
+        "rss_peak_mb": round(max(rss for _, rss in samples) / 2 ** 20, 1)
+    }
+
+
+def run(url: str, duration: float, concurrency: int, sample_seconds: float, warmup: float,
+        max_slope_mb_per_hour: float, unique_fraction: float = 0.3) -> Dict[str, Any]:
+    """Drive load for `duration` seconds and evaluate the RSS samples"""
+    load = LoadGenerator(url, concurrency, unique_fraction=unique_fraction)
+    samples: List[Tuple[float, int]] = []
+    started = time.monotonic()
+    load.start()
+    try:
+        while True:
+            elapsed = time.monotonic() - started
+            try:
+                rss = _request(f"{url}/metrics/memory")["rss_bytes"]
+                if rss is not None:
+                    samples.append((elapsed, rss))
+                    print(f"[{elapsed:8.0f}s] rss={rss / 2 ** 20:8.1f} MB  requests={load.requests}  "
+                          f"errors={load.errors}", flush=True)
+            except (OSError, ValueError) as e:
+                print(f"[{elapsed:8.0f}s] memory sample failed: {e}", flush=True)
+            if elapsed >= duration:
+                break
+            time.sleep(min(sample_seconds, max(0.0, duration - elapsed)))
+    finally:
+        load.stop()
+
+    report = evaluate(samples, warmup, max_slope_mb_per_hour)
+    report.update(requests=load.requests, errors=load.errors, duration_s=round(time.monotonic() - started, 1))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the API and check for memory growth")
+    parser.add_argument("--url", help="Test a running server instead of starting one with the stub model")
+    parser.add_argument("--duration", type=float, default=3600, help="Seconds of load")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    parser.add_argument("--sample-seconds", type=float, default=10, help="RSS sampling interval")
+    parser.add_argument("--warmup", type=float, default=0.25, help="Share of the run ignored for the slope")
+    parser.add_argument("--max-slope-mb-per-hour", type=float, default=2.0)
+    parser.add_argument("--unique-fraction", type=float, default=0.3, help="Share of never-seen texts")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port)
+    try:
+        wait_ready(url)
+        report = run(url, args.duration, args.concurrency, args.sample_seconds, args.warmup,
+                     args.max_slope_mb_per_hour, args.unique_fraction)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
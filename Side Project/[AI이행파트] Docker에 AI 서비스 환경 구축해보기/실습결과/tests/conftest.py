@@ -0,0 +1,9 @@
+"""Shared fixtures (helpers to import live in tests/tiny_model.py)"""
+import pytest
+
+from tests.tiny_model import build_improved_model
+
+@pytest.fixture(scope="module")
+def tiny_improved_model():
+    """SentimentModelImproved backed by a tiny local BERT (default settings, one per test module)"""
+    return build_improved_model()
@@ -0,0 +1,187 @@
+import heapq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.admission import AdmissionController, AdmissionMiddleware, TokenBucket
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(controller, clock, arrivals, service_time):
+    """
+    Single FIFO server: returns sojourn times of admitted requests and the number rejected
+
+    Admission decisions and releases are applied in time order through the fake clock.
+    """
+    events = [(t, 1, None) for t in arrivals]  # (time, kind: 0=release / 1=arrival, ...)
+    heapq.heapify(events)
+    server_free = 0.0
+    sojourns, rejected = [], 0
+
+    while events:
+        t, kind, arrived = heapq.heappop(events)
+        clock.now = t
+        if kind == 0:
+            if controller is not None:
+                controller.release("/predict")
+            sojourns.append(t - arrived)
+            continue
+        if controller is not None and controller.try_admit("/predict") is not None:
+            rejected += 1
+            continue
+        server_free = max(server_free, t) + service_time
+        heapq.heappush(events, (server_free, 0, t))
+
+    return sorted(sojourns), rejected
+
+
+def p99(values):
+    return values[int(0.99 * (len(values) - 1))]
+
+
+class TestTokenBucket:
+    """Test the per-client token bucket"""
+
+    def test_burst_then_refill(self):
+        """Burst tokens are available immediately, then refill at rate"""
+        bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+
+        assert bucket.take(0.0) == 0
+        assert bucket.take(0.0) == 0
+        assert bucket.take(0.0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0
+
+
+class TestAdmissionController:
+    """Test admission decisions"""
+
+    def test_route_limit(self):
+        """Requests above the per-route limit are shed with 503"""
+        controller = AdmissionController({"/predict": 2}, clock=FakeClock())
+
+        assert controller.try_admit("/predict") is None
+        assert controller.try_admit("/predict") is None
+        status, reason, retry_after = controller.try_admit("/predict")
+        assert (status, reason) == (503, "route_limit")
+        assert retry_after >= 1
+
+        controller.release("/predict")
+        assert controller.try_admit("/predict") is None
+
+    def test_global_limit(self):
+        """The global in-flight limit spans routes"""
+        controller = AdmissionController({"/a": 10, "/b": 10}, max_in_flight=1, clock=FakeClock())
+
+        assert controller.try_admit("/a") is None
+        assert controller.try_admit("/b")[1] == "global_limit"
+
+    def test_client_rate_limit(self):
+        """Clients over their token bucket get 429"""
+        controller = AdmissionController({"/predict": 100}, client_rate=1.0, client_burst=1, clock=FakeClock())
+
+        assert controller.try_admit("/predict", "1.2.3.4") is None
+        assert controller.try_admit("/predict", "1.2.3.4")[:2] == (429, "client_rate")
+        assert controller.try_admit("/predict", "5.6.7.8") is None
+
+    def test_slo_shedding(self):
+        """Requests whose estimated wait exceeds the SLO are shed"""
+        clock = FakeClock()
+        controller = AdmissionController({"/predict": 1000}, slo=0.1, clock=clock)
+
+        # Learn a service rate of ~100 requests per busy second
+        for _ in range(20):
+            controller.try_admit("/predict")
+            clock.now += 0.01
+            controller.release("/predict")
+
+        admitted = 0
+        while (rejection := controller.try_admit("/predict")) is None:
+            admitted += 1
+
+        # (in_flight + 1) / 100 per second exceeds 0.1s once 10 requests are in flight
+        assert rejection[:2] == (503, "slo")
+        assert admitted == pytest.approx(10, abs=1)
+
+    def test_admitted_p99_stable_during_spike(self):
+        """A 5x overload spike leaves the p99 of admitted requests near the SLO"""
+        service_time, slo = 0.01, 0.1
+        steady = [i * 0.02 for i in range(100)]                  # 50 req/s for 2s
+        spike = [2.0 + i * 0.002 for i in range(1000)]           # 500 req/s for 2s
+        arrivals = steady + spike
+
+        uncontrolled, _ = simulate(None, FakeClock(), arrivals, service_time)
+
+        clock = FakeClock()
+        controller = AdmissionController({"/predict": 1000}, slo=slo, clock=clock)
+        admitted, rejected = simulate(controller, clock, arrivals, service_time)
+
+        assert p99(uncontrolled) > 1.0
+        assert p99(admitted) <= slo * 1.5
+        assert rejected > 0
+        assert len(admitted) + rejected == len(arrivals)
+
+
+class TestAdmissionMiddleware:
+    """Test the ASGI middleware"""
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+        controller = AdmissionController({"/predict": 0})
+        app.add_middleware(AdmissionMiddleware, controller=controller)
+
+        @app.post("/predict")
+        async def predict():
+            return {"ok": True}
+
+        @app.get("/health")
+        async def health():
+            return {"ok": True}
+
+        return app
+
+    def test_rejection_response(self, app):
+        """Shed requests get 503 with Retry-After"""
+        response = TestClient(app).post("/predict")
+
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) >= 1
+        assert response.json()["reason"] == "route_limit"
+
+    def test_uncontrolled_route_passes(self, app):
+        """Routes without a limit are not affected"""
+        assert TestClient(app).get("/health").status_code == 200
+
+    def test_rejections_carry_cors_headers(self):
+        """In the service app CORS wraps admission control, so browsers can read the rejection"""
+        import main
+
+        origin = {"Origin": "https://dashboard.example.com"}
+        client = TestClient(main.app)
+        with patch.object(main.app.state.admission, "try_admit", return_value=(503, "route_limit", 2.0)):
+            response = client.post("/predict", json={"text": "good"}, headers=origin)
+            preflight = client.options("/predict", headers={**origin, "Access-Control-Request-Method": "POST"})
+
+        assert response.status_code == 503
+        assert response.headers["access-control-allow-origin"] == origin["Origin"]
+        assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+        assert preflight.status_code == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,173 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.aggregates import SentimentAggregator
+from main import app
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def result(sentiment, confidence=0.8):
+    return {"sentiment": sentiment, "confidence": confidence, "processing_time": 0.0}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def aggregator(clock):
+    return SentimentAggregator(bucket_seconds=10, window_seconds=60, tumbling_seconds=30, max_keys=3, clock=clock)
+
+
+class TestSentimentAggregator:
+    """Test windowed aggregation with a fake clock"""
+
+    def test_counts_shares_and_mean_confidence(self, aggregator):
+        aggregator.record("k", [result("positive", 0.9), result("positive", 0.7), result("negative", 0.6)])
+        sliding = aggregator.get("k")["sliding"]
+
+        assert sliding["count"] == 3
+        assert sliding["labels"]["positive"] == {"count": 2, "share": 0.6667, "mean_confidence": 0.8}
+        assert sliding["labels"]["negative"]["mean_confidence"] == 0.6
+        assert sliding["labels"]["neutral"] == {"count": 0, "share": 0.0, "mean_confidence": None}
+
+    def test_unknown_key_and_failed_results(self, aggregator):
+        """Never-recorded keys return None; 'unknown' results are not counted"""
+        assert aggregator.get("missing") is None
+        aggregator.record("k", [result("unknown", 0.0), result("neutral")])
+        assert aggregator.get("k")["sliding"]["count"] == 1
+
+    def test_sliding_window_expires_old_buckets(self, aggregator, clock):
+        aggregator.record("k", [result("positive")])
+        clock.now += 30
+        aggregator.record("k", [result("negative")])
+
+        clock.now += 25  # first record is 55s old, still within 60s
+        assert aggregator.get("k")["sliding"]["count"] == 2
+        clock.now += 10  # 65s old: its bucket has left the ring
+        sliding = aggregator.get("k")["sliding"]
+        assert sliding["count"] == 1
+        assert sliding["labels"]["negative"]["count"] == 1
+        assert sliding["labels"]["positive"]["mean_confidence"] is None
+
+        clock.now += 1000  # jump far beyond the window
+        assert aggregator.get("k")["sliding"]["count"] == 0
+
+    def test_tumbling_periods(self, aggregator, clock):
+        """Periods are aligned to tumbling_seconds; the previous one is kept only if adjacent"""
+        clock.now = 1200.0
+        aggregator.record("k", [result("positive")] * 2)
+        snapshot = aggregator.get("k")
+        assert (snapshot["tumbling"]["start"], snapshot["tumbling"]["end"]) == (1200.0, 1230.0)
+        assert snapshot["tumbling"]["count"] == 2
+
+        clock.now = 1235.0
+        aggregator.record("k", [result("negative")])
+        snapshot = aggregator.get("k")
+        assert snapshot["tumbling"]["count"] == 1
+        assert snapshot["previous_tumbling"]["count"] == 2
+        assert snapshot["previous_tumbling"]["start"] == 1200.0
+
+        clock.now = 1300.0  # two periods later: nothing recorded in the previous one
+        snapshot = aggregator.get("k")
+        assert snapshot["tumbling"]["count"] == 0
+        assert snapshot["previous_tumbling"]["count"] == 0
+
+    def test_keys_are_independent_and_bounded(self, aggregator):
+        for key in ["a", "b", "c"]:
+            aggregator.record(key, [result("positive")])
+        aggregator.record("a", [result("negative")])  # "a" is now most recently updated
+        aggregator.record("d", [result("neutral")])
+
+        assert aggregator.get("b") is None
+        assert aggregator.get("a")["sliding"]["count"] == 2
+        assert aggregator.get("d")["sliding"]["labels"]["neutral"]["count"] == 1
+        assert aggregator.get_stats()["evicted_keys"] == 1
+
+    def test_running_totals_match_recount(self, aggregator, clock):
+        """Incremental totals equal a recount of the records still inside the window"""
+        records = []
+        for step in range(200):
+            clock.now += 3
+            label = ("negative", "neutral", "positive")[step % 3]
+            confidence = 0.5 + (step % 5) / 10
+            records.append((clock.now, label, confidence))
+            aggregator.record("k", [result(label, confidence)])
+
+        sliding = aggregator.get("k")["sliding"]
+        kept = [r for r in records if r[0] >= sliding["start"]]
+        assert sliding["count"] == len(kept)
+        for label in ("negative", "neutral", "positive"):
+            confidences = [c for _, l, c in kept if l == label]
+            assert sliding["labels"][label]["count"] == len(confidences)
+            assert sliding["labels"][label]["mean_confidence"] == pytest.approx(
+                sum(confidences) / len(confidences), abs=1e-4
+            )
+
+    def test_invalid_windows(self):
+        with pytest.raises(ValueError):
+            SentimentAggregator(bucket_seconds=10, window_seconds=5)
+
+
+class TestAggregateEndpoints:
+    """Test recording from prediction routes and GET /aggregates/{key}"""
+
+    @pytest.fixture
+    def client(self, aggregator):
+        model = Mock()
+        model.predict.return_value = result("positive", 0.9)
+        model.predict_batch.side_effect = lambda texts: [
+            result("positive" if "good" in text else "negative", 0.7) for text in texts
+        ]
+        with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+                patch('main.get_batcher', return_value=None), \
+                patch('api.aggregates.get_aggregator', return_value=aggregator):
+            yield TestClient(app)
+
+    def test_predict_and_batch_record_under_key(self, client):
+        assert client.post("/predict", json={"text": "good", "key": "p-1"}).status_code == 200
+        response = client.post("/predict/batch", json={"texts": ["good", "good", "bad"], "key": "p-1"})
+        assert response.status_code == 200
+        client.post("/predict", json={"text": "good"})  # no key: not aggregated
+
+        response = client.get("/aggregates/p-1")
+        assert response.status_code == 200
+        sliding = response.json()["sliding"]
+        # Duplicates within the batch count once per submitted text
+        assert sliding["count"] == 4
+        assert sliding["labels"]["positive"]["count"] == 3
+        assert sliding["labels"]["negative"]["count"] == 1
+
+    def test_websocket_messages_record_under_key(self, client):
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json([{"id": 1, "text": "good", "key": "chat"}, {"id": 2, "text": "bad", "key": ""}])
+            results = {}
+            while len(results) < 2:
+                for item in ws.receive_json()["results"]:
+                    results[item["id"]] = item
+        assert "error" in results[2]
+        assert client.get("/aggregates/chat").json()["sliding"]["count"] == 1
+
+    def test_unknown_key_404(self, client):
+        assert client.get("/aggregates/nothing").status_code == 404
+
+    def test_key_validation(self, client):
+        assert client.post("/predict", json={"text": "good", "key": "x" * 129}).status_code == 422
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
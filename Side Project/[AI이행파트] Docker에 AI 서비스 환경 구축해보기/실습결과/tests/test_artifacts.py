@@ -0,0 +1,118 @@
+import json
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.artifacts import ArtifactError, bundle, verify
+from models.sentiment_model_improved import SentimentModelImproved
+from utils.config import get_settings
+from tests.tiny_model import build_tiny_tokenizer, build_tiny_model
+
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """Tiny model bundled as an artifact under the production model id"""
+    path = tmp_path / "model"
+    model = build_tiny_model()
+    model.config._commit_hash = "0123abcd"  # set by from_pretrained for Hub models
+    bundle(model, build_tiny_tokenizer(), str(path), model_id=MODEL_ID, revision="main")
+    return path
+
+
+@pytest.fixture
+def artifact_settings(monkeypatch):
+    """Point the shared settings at an artifact directory"""
+    settings = get_settings()
+
+    def use(path, verify_checksums=True):
+        monkeypatch.setattr(settings, "model_artifact_path", str(path))
+        monkeypatch.setattr(settings, "model_artifact_verify", verify_checksums)
+
+    return use
+
+
+class TestBundle:
+    """Test artifact creation and verification"""
+
+    def test_manifest(self, artifact):
+        """The manifest records the model id, labels and a checksum per file"""
+        manifest = json.loads((artifact / "manifest.json").read_text(encoding="utf-8"))
+
+        assert manifest["model_id"] == MODEL_ID
+        assert manifest["revision"] == "0123abcd"  # the resolved commit, not the branch
+        assert manifest["requested_revision"] == "main"
+        assert manifest["labels"]["0"] == "1 star"
+        assert "config.json" in manifest["files"]
+        assert all(len(entry["sha256"]) == 64 for entry in manifest["files"].values())
+
+    def test_verify_ok(self, artifact):
+        """An untouched artifact verifies"""
+        assert verify(str(artifact), expected_model_id=MODEL_ID)["model_id"] == MODEL_ID
+
+    def test_verify_detects_tampering(self, artifact):
+        """A modified file fails the checksum"""
+        config = artifact / "config.json"
+        config.write_text(config.read_text(encoding="utf-8") + " ", encoding="utf-8")
+
+        with pytest.raises(ArtifactError, match="체크섬"):
+            verify(str(artifact))
+
+    def test_verify_detects_missing_file(self, artifact):
+        """A deleted file fails verification"""
+        (artifact / "config.json").unlink()
+
+        with pytest.raises(ArtifactError):
+            verify(str(artifact))
+
+    def test_verify_model_mismatch(self, artifact):
+        """An artifact for another model is rejected"""
+        with pytest.raises(ArtifactError):
+            verify(str(artifact), expected_model_id="some/other-model")
+
+    def test_missing_manifest(self, tmp_path):
+        """A directory without manifest is not an artifact"""
+        with pytest.raises(ArtifactError):
+            verify(str(tmp_path))
+
+
+class TestLoadFromArtifact:
+    """Test that the service loads strictly from the bundled artifact"""
+
+    def test_loads_offline(self, artifact, artifact_settings):
+        """The model loads from the artifact directory without the Hub"""
+        artifact_settings(artifact)
+        model = SentimentModelImproved()
+
+        assert model.model.config.num_labels == 5
+        assert model.predict("good movie")["sentiment"] in ("positive", "neutral", "negative")
+        assert model.get_model_info()["artifact_path"] == str(artifact)
+
+    def test_refuses_tampered_artifact(self, artifact, artifact_settings):
+        """Checksum failures stop model loading"""
+        (artifact / "config.json").write_text("{}", encoding="utf-8")
+        artifact_settings(artifact)
+
+        with pytest.raises(ArtifactError):
+            SentimentModelImproved()
+
+    def test_dynamic_int8_quantization(self, tmp_path, artifact_settings):
+        """A dynamic-int8 artifact is quantized at load time"""
+        import torch
+
+        path = tmp_path / "quantized"
+        bundle(build_tiny_model(), build_tiny_tokenizer(), str(path), model_id=MODEL_ID, quantize="dynamic-int8")
+        artifact_settings(path)
+        model = SentimentModelImproved()
+
+        quantized = [m for m in model.model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+        assert quantized
+        assert model.predict("good movie")["raw_label"].endswith(("star", "stars"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
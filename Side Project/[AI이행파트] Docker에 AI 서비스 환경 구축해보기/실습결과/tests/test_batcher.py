@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.batcher import AdaptiveBatchController, MicroBatcher, simulate
+
+def service_time(batch_size):
+    """Synthetic forward-pass latency: 10ms fixed + 1ms per text"""
+    return 0.010 + 0.001 * batch_size
+
+def arrivals(gap, count=2000):
+    return [i * gap for i in range(count)]
+
+class TestAdaptiveBatchController:
+    """Test the adaptive controller through deterministic simulation"""
+
+    def test_low_load_dispatches_immediately(self):
+        """At low load the wait window collapses and requests are served alone"""
+        controller = AdaptiveBatchController(target_p99=0.2, initial_wait=0.005)
+        result = simulate(controller, arrivals(gap=0.5, count=200), service_time)
+
+        assert controller.max_wait == 0.0
+        assert result["mean_batch_size"] == pytest.approx(1.0, abs=0.05)
+        assert result["p99"] == pytest.approx(service_time(1), abs=1e-3)
+
+    def test_high_load_grows_batches_within_target(self):
+        """At peak load batches grow while p99 stays within the target"""
+        controller = AdaptiveBatchController(target_p99=0.2)
+        result = simulate(controller, arrivals(gap=0.0015), service_time)
+
+        # One-at-a-time capacity is ~90 req/s, far below the ~667 req/s offered
+        assert result["mean_batch_size"] > 5
+        assert result["p99"] <= 0.2
+        assert controller.max_batch > 1
+
+    def test_learns_latency_model(self):
+        """The per-batch latency model converges to the observed service time"""
+        controller = AdaptiveBatchController(target_p99=0.2)
+        simulate(controller, arrivals(gap=0.002), service_time)
+
+        metrics = controller.get_metrics()
+        assert metrics["latency_intercept_ms"] == pytest.approx(10.0, abs=0.5)
+        assert metrics["latency_per_item_ms"] == pytest.approx(1.0, abs=0.05)
+        assert metrics["decisions"] > 0
+
+    def test_batch_cap_respects_target(self):
+        """max_batch never exceeds what fits within the p99 target"""
+        controller = AdaptiveBatchController(target_p99=0.03, max_batch_limit=64)
+        simulate(controller, arrivals(gap=0.001), service_time)
+
+        assert service_time(controller.max_batch) <= 0.03
+
+    def test_simulation_is_deterministic(self):
+        """Identical inputs produce identical decisions and latencies"""
+        runs = [
+            simulate(AdaptiveBatchController(target_p99=0.1), arrivals(gap=0.003), service_time)
+            for _ in range(2)
+        ]
+        assert runs[0]["latencies"] == runs[1]["latencies"]
+        assert runs[0]["trace"] == runs[1]["trace"]
+
+class TestMicroBatcher:
+    """Test the asyncio micro-batcher"""
+
+    def test_concurrent_submits_are_batched(self):
+        """Concurrent requests share forward passes and get their own results"""
+        batches = []
+
+        def predict_batch(texts):
+            batches.append(list(texts))
+            return [text.upper() for text in texts]
+
+        async def run():
+            batcher = MicroBatcher(predict_batch, max_wait=0.02, max_batch=8)
+            await batcher.start()
+            try:
+                results = await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(20)))
+                return results, batcher.get_metrics()
+            finally:
+                await batcher.stop()
+
+        results, metrics = asyncio.run(run())
+
+        assert results == [f"T{i}" for i in range(20)]
+        assert len(batches) < 20
+        assert all(len(batch) <= 8 for batch in batches)
+        assert metrics["items"] == 20
+
+    def test_errors_propagate(self):
+        """A failing batch raises for every request in it"""
+        def predict_batch(texts):
+            raise RuntimeError("model error")
+
+        async def run():
+            batcher = MicroBatcher(predict_batch, max_wait=0.01)
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_controller_updates_window(self):
+        """The controller's decisions are applied after each batch"""
+        controller = AdaptiveBatchController(target_p99=0.2, initial_wait=0.005)
+
+        async def run():
+            batcher = MicroBatcher(lambda texts: list(texts), controller=controller)
+            await batcher.start()
+            try:
+                for i in range(5):
+                    await batcher.submit(str(i))
+                return batcher.get_metrics()
+            finally:
+                await batcher.stop()
+
+        metrics = asyncio.run(run())
+        assert metrics["controller"]["decisions"] == 5
+        assert metrics["max_wait_ms"] == metrics["controller"]["max_wait_ms"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,151 @@
+import json
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.calibration import (
+    TemperatureCalibrator, expected_calibration_error, fit_model_calibration, negative_log_likelihood,
+    scale_temperature
+)
+from tests.tiny_model import build_improved_model
+
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+
+def softmax(logits):
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def overconfident_sample(n=4000, classes=5, sharpen=3.0, seed=0):
+    """Labels drawn from softmax(z); the 'model' reports softmax(sharpen * z)"""
+    rng = np.random.default_rng(seed)
+    logits = rng.normal(scale=1.5, size=(n, classes))
+    true_probs = softmax(logits)
+    labels = np.array([rng.choice(classes, p=p) for p in true_probs])
+    return softmax(sharpen * logits).astype(np.float32), labels
+
+
+class TestTemperatureScaling:
+    """Test the vectorized temperature transform and fitting"""
+
+    def test_identity_at_one(self):
+        """T=1 returns the probabilities unchanged"""
+        probs, _ = overconfident_sample(n=10)
+        assert TemperatureCalibrator(1.0).apply(probs) is probs
+
+    def test_flattens_and_keeps_ranking(self):
+        """T>1 lowers confidence, keeps argmax and row sums"""
+        probs, _ = overconfident_sample(n=200)
+        scaled = scale_temperature(probs, 2.5)
+
+        assert scaled.dtype == np.float32
+        np.testing.assert_allclose(scaled.sum(axis=1), 1.0, atol=1e-5)
+        np.testing.assert_array_equal(scaled.argmax(axis=1), probs.argmax(axis=1))
+        assert (scaled.max(axis=1) <= probs.max(axis=1) + 1e-6).all()
+
+    def test_fit_recovers_temperature(self):
+        """Probabilities sharpened by 3x are fitted with T close to 3"""
+        probs, labels = overconfident_sample()
+        calibrator = TemperatureCalibrator.fit(probs, labels)
+
+        assert calibrator.temperature == pytest.approx(3.0, rel=0.15)
+
+    def test_fit_reduces_calibration_error(self):
+        """ECE and NLL improve after calibration"""
+        probs, labels = overconfident_sample()
+        calibrated = TemperatureCalibrator.fit(probs, labels).apply(probs)
+
+        assert expected_calibration_error(calibrated, labels) < expected_calibration_error(probs, labels) / 2
+        assert negative_log_likelihood(calibrated, labels) < negative_log_likelihood(probs, labels)
+
+    def test_fit_on_groups(self):
+        """Fitting through a label -> group projection works on grouped labels"""
+        probs, labels = overconfident_sample()
+        projection = np.zeros((5, 3), dtype=np.float32)
+        projection[[0, 1, 2, 3, 4], [0, 0, 1, 2, 2]] = 1.0
+        group_labels = np.array([0, 0, 1, 2, 2])[labels]
+
+        calibrator = TemperatureCalibrator.fit(probs, group_labels, projection)
+        before = expected_calibration_error(probs @ projection, group_labels)
+        after = expected_calibration_error(calibrator.apply(probs) @ projection, group_labels)
+
+        assert calibrator.temperature > 1.0
+        assert after < before
+
+    def test_save_and_load(self, tmp_path):
+        """Temperature and metadata round-trip through calibration.json"""
+        path = tmp_path / "calibration.json"
+        TemperatureCalibrator(1.7, {"model_id": MODEL_ID}).save(str(path))
+        loaded = TemperatureCalibrator.load(str(path))
+
+        assert loaded.temperature == pytest.approx(1.7)
+        assert loaded.metadata["model_id"] == MODEL_ID
+
+    def test_invalid_temperature(self):
+        with pytest.raises(ValueError):
+            TemperatureCalibrator(0.0)
+
+
+class TestModelCalibration:
+    """Test calibration inside SentimentModelImproved"""
+
+    def test_scores_are_calibrated(self, tmp_path):
+        """Batch scores, grouped scores and confidences use the calibrated probabilities"""
+        path = tmp_path / "calibration.json"
+        TemperatureCalibrator(0.5, {"model_id": MODEL_ID}).save(str(path))
+        model = build_improved_model(calibration_path=str(path))
+        texts = ["good movie", "terrible day", "ok"]
+
+        raw, grouped = model.predict_scores_batch(texts)
+        uncalibrated = model.predict_scores_batch(texts, calibrated=False)[0]
+
+        np.testing.assert_allclose(raw, scale_temperature(uncalibrated, 0.5), atol=1e-6)
+        np.testing.assert_allclose(grouped, raw @ model.group_projection, atol=1e-6)
+        assert model.predict("good movie")["confidence"] == pytest.approx(float(raw[0].max()), abs=1e-4)
+        assert model.get_model_info()["calibration"]["temperature"] == 0.5
+
+    def test_document_scores_are_calibrated(self, tmp_path):
+        """Window probabilities are calibrated before pooling"""
+        path = tmp_path / "calibration.json"
+        TemperatureCalibrator(0.5, {"model_id": MODEL_ID}).save(str(path))
+        calibrated = build_improved_model(calibration_path=str(path)).predict_document("good movie", pooling="mean")
+        plain = build_improved_model().predict_document("good movie", pooling="mean")
+
+        assert calibrated["confidence"] > plain["confidence"]
+
+    def test_ignores_calibration_for_other_model(self, tmp_path):
+        """A calibration fitted for a different model is not applied"""
+        path = tmp_path / "calibration.json"
+        TemperatureCalibrator(2.0, {"model_id": "some/other-model"}).save(str(path))
+
+        assert build_improved_model(calibration_path=str(path)).calibrator is None
+
+    def test_fit_model_calibration_reports(self, tiny_improved_model):
+        """Fitting on a labelled set records before/after metrics on the held-out part"""
+        model = tiny_improved_model
+        rows = [{"text": text, "label": label} for text, label in [
+            ("good movie", "positive"), ("great day", "positive"), ("really good", "5 stars"),
+            ("terrible day", "negative"), ("bad movie", "negative"), ("the movie was bad", "1 star"),
+            ("ok", "neutral"), ("the day was ok", "neutral"), ("good good", "positive"), ("bad bad", "negative")
+        ] * 3]
+
+        calibrator = fit_model_calibration(model, rows, holdout=0.2)
+        report = json.loads(json.dumps(calibrator.to_dict()))
+
+        assert report["model_id"] == MODEL_ID
+        assert report["samples"] == {"fit": 24, "eval": 6}
+        assert set(report["before"]) == {"ece", "nll", "accuracy"}
+
+    def test_unknown_label(self, tiny_improved_model):
+        model = tiny_improved_model
+        with pytest.raises(ValueError):
+            fit_model_calibration(model, [{"text": "good", "label": "happy"}])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.dedup import SingleFlight, dedupe_texts, normalize_text, scatter_results
+
+class TestBatchDedup:
+    """Test deduplication within a batch"""
+
+    def test_normalize_text(self):
+        """Whitespace runs collapse and ends are stripped"""
+        assert normalize_text("  좋은   하루\n") == "좋은 하루"
+
+    def test_dedupe_and_scatter(self):
+        """Duplicates are collapsed and results scattered back in order"""
+        texts = ["good", "bad", "good ", "  good", "bad"]
+        unique_texts, index = dedupe_texts(texts)
+
+        assert unique_texts == ["good", "bad"]
+        assert index == [0, 1, 0, 0, 1]
+
+        results = scatter_results([{"sentiment": "positive"}, {"sentiment": "negative"}], index)
+        assert [r["sentiment"] for r in results] == [
+            "positive", "negative", "positive", "positive", "negative"
+        ]
+        # Duplicated entries must not share the same dict
+        assert results[0] is not results[2]
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical requests"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Concurrent callers with the same key run the function once"""
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"sentiment": "positive"}
+
+        async def run():
+            flight = SingleFlight()
+            results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+            return flight, results
+
+        flight, results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(r == {"sentiment": "positive"} for r in results)
+        assert flight.get_stats() == {"in_flight": 0, "executed": 1, "coalesced": 9}
+
+    def test_do_many_only_runs_keys_not_in_flight(self):
+        """Batch calls reuse in-flight keys and only send the rest to the model"""
+        batches = []
+
+        async def single():
+            await asyncio.sleep(0.02)
+            return "a-result"
+
+        async def batch(keys):
+            batches.append(list(keys))
+            await asyncio.sleep(0.01)
+            return [f"{k}-result" for k in keys]
+
+        async def run():
+            flight = SingleFlight()
+            first = asyncio.ensure_future(flight.do("a", single))
+            await asyncio.sleep(0)
+            many = await flight.do_many(["a", "b", "c"], batch)
+            return await first, many
+
+        first, many = asyncio.run(run())
+
+        assert batches == [["b", "c"]]
+        assert first == "a-result"
+        assert many == ["a-result", "b-result", "c-result"]
+
+    def test_errors_propagate_to_all_waiters(self):
+        """A failing execution raises for every coalesced caller"""
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(
+                *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,110 @@
+import json
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.distillation import (
+    build_student, count_parameters, distill, evaluate, export_student, load_corpus, write_report
+)
+from models.sentiment_model_improved import SentimentModelImproved
+from tests.tiny_model import build_tiny_tokenizer, build_tiny_model
+
+CORPUS = ["good movie", "terrible day", "the movie was ok .", "really great day",
+          "bad movie", "the day was really bad", "great", "ok ."] * 4
+
+class TestDistillation:
+    """Test the teacher -> student distillation pipeline"""
+
+    def test_build_student_is_smaller(self):
+        """Student has fewer layers/hidden units and keeps the teacher labels"""
+        teacher = build_tiny_model()
+        student = build_student(teacher, num_layers=1, hidden_size=8)
+
+        assert student.config.num_hidden_layers == 1
+        assert student.config.hidden_size == 8
+        assert student.config.id2label == teacher.config.id2label
+        assert count_parameters(student) < count_parameters(teacher)
+
+    def test_build_student_copies_layers_with_same_hidden(self):
+        """With the same hidden size, teacher embeddings and layers are copied"""
+        teacher = build_tiny_model()
+        student = build_student(teacher, num_layers=1, hidden_size=16)
+
+        assert student.base_model.embeddings.word_embeddings.weight.equal(
+            teacher.base_model.embeddings.word_embeddings.weight
+        )
+
+    def test_distill_reduces_loss(self):
+        """Distillation moves the student towards the teacher"""
+        teacher = build_tiny_model()
+        student = build_student(teacher, num_layers=1, hidden_size=8)
+
+        history = distill(teacher, student, build_tiny_tokenizer(), CORPUS,
+                          epochs=5, batch_size=8, learning_rate=1e-2)
+
+        assert len(history) == 5
+        assert history[-1]["loss"] < history[0]["loss"]
+
+    def test_export_evaluate_and_report(self, tmp_path):
+        """Exported student reloads and the report compares it with the teacher"""
+        teacher = build_tiny_model()
+        tokenizer = build_tiny_tokenizer()
+        student = build_student(teacher, num_layers=1, hidden_size=8)
+        export_student(student, tokenizer, str(tmp_path), {"layers": 1, "hidden_size": 8})
+
+        assert (tmp_path / "config.json").exists()
+        assert json.loads((tmp_path / "distillation.json").read_text())["layers"] == 1
+
+        labels = ["positive", "negative", "neutral", "positive",
+                  "negative", "negative", "positive", "neutral"] * 4
+        report = evaluate(teacher, student, tokenizer, CORPUS, labels, latency_samples=4)
+
+        assert 0.0 <= report["agreement"]["sentiment"] <= 1.0
+        assert "accuracy" in report["teacher"] and "accuracy" in report["student"]
+        assert report["student"]["parameters"] < report["teacher"]["parameters"]
+        assert report["teacher"]["latency_p50_ms"] > 0
+
+        write_report(report, str(tmp_path))
+        assert "Teacher" in (tmp_path / "EVALUATION.md").read_text(encoding="utf-8")
+        assert (tmp_path / "evaluation_report.json").exists()
+
+    def test_load_corpus_formats(self, tmp_path):
+        """Corpus loads from plain text and JSONL"""
+        txt = tmp_path / "corpus.txt"
+        txt.write_text("good movie\n\nbad day\n", encoding="utf-8")
+        jsonl = tmp_path / "corpus.jsonl"
+        jsonl.write_text('{"text": "good movie"}\n{"text": "bad day"}\n', encoding="utf-8")
+
+        assert load_corpus(str(txt)) == ["good movie", "bad day"]
+        assert load_corpus(str(jsonl)) == ["good movie", "bad day"]
+
+class TestStudentVariant:
+    """Test selecting the distilled student in SentimentModelImproved"""
+
+    @patch('models.sentiment_model_improved.pipeline')
+    @patch('models.sentiment_model_improved.AutoModelForSequenceClassification')
+    @patch('models.sentiment_model_improved.AutoTokenizer')
+    def test_student_variant_loads_student_path(self, mock_tokenizer, mock_model, mock_pipeline):
+        """The student variant loads from student_model_path with the same label mapping"""
+        teacher = SentimentModelImproved(model_variant="teacher")
+        student = SentimentModelImproved(model_variant="student")
+
+        assert student.model_name == student.settings.student_model_path
+        assert mock_model.from_pretrained.call_args[0][0] == student.settings.student_model_path
+        assert student.label_mapping == teacher.label_mapping
+        assert student.get_model_info()["model_variant"] == "student"
+
+    @patch('models.sentiment_model_improved.pipeline')
+    @patch('models.sentiment_model_improved.AutoModelForSequenceClassification')
+    @patch('models.sentiment_model_improved.AutoTokenizer')
+    def test_unknown_variant(self, mock_tokenizer, mock_model, mock_pipeline):
+        """Unknown variants are rejected"""
+        with pytest.raises(ValueError):
+            SentimentModelImproved(model_variant="tiny")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
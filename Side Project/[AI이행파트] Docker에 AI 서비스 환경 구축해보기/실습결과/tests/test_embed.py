@@ -0,0 +1,149 @@
+import base64
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.endpoints import get_model_or_fallback
+from models.rule_based_model import get_fallback_model
+from models.stub_model import StubSentimentModel
+from main import app
+
+TEXTS = ["good movie", "terrible day", "the movie was ok .", "really great"]
+
+
+def decode(array):
+    dtype = {"float32": "<f4", "float16": "<f2"}[array["dtype"]]
+    return np.frombuffer(base64.b64decode(array["data"]), dtype=dtype).reshape(array["shape"])
+
+
+class TestModelEmbeddings:
+    """Test pooled encoder vectors from the classification pass"""
+
+    def test_pooling_matches_encoder_output(self, tiny_improved_model):
+        for text in TEXTS:
+            encoded = tiny_improved_model.tokenizer([text], return_tensors="pt")
+            with torch.no_grad():
+                hidden = tiny_improved_model.model.base_model(**encoded).last_hidden_state[0]
+            cls, mean = (tiny_improved_model.embed([text], pooling=pooling)[0] for pooling in ("cls", "mean"))
+            np.testing.assert_allclose(cls, hidden[0].numpy(), atol=1e-5)
+            np.testing.assert_allclose(mean, hidden.mean(dim=0).numpy(), atol=1e-5)
+
+    def test_padding_does_not_change_vectors(self, tiny_improved_model):
+        """Padded rows in a batch give the same vectors as each text alone"""
+        for pooling in ("cls", "mean"):
+            batched = tiny_improved_model.embed(TEXTS, pooling=pooling)
+            assert batched.shape == (len(TEXTS), tiny_improved_model.embedding_dimension)
+            assert batched.dtype == np.float32
+            for text, row in zip(TEXTS, batched):
+                np.testing.assert_allclose(row, tiny_improved_model.embed([text], pooling=pooling)[0], atol=1e-5)
+
+    def test_one_pass_for_sentiment_and_embedding(self, tiny_improved_model, monkeypatch):
+        monkeypatch.setattr(tiny_improved_model.settings, "inference_batch_size", 3)
+        calls = []
+        hook = tiny_improved_model.model.base_model.register_forward_hook(lambda *args: calls.append(1))
+        try:
+            results = tiny_improved_model.predict_batch(TEXTS, embedding="mean")
+        finally:
+            hook.remove()
+
+        assert len(calls) == 2  # ceil(4 / 3) batches for both outputs
+        vectors = np.stack([r["embedding"] for r in results])
+        np.testing.assert_allclose(vectors, tiny_improved_model.embed(TEXTS, "mean"), atol=1e-5)
+        plain = tiny_improved_model.predict_batch(TEXTS)
+        assert [(r["sentiment"], r["confidence"]) for r in results] == \
+            [(r["sentiment"], r["confidence"]) for r in plain]
+        assert "embedding" not in plain[0]
+
+    def test_invalid_input(self, tiny_improved_model):
+        with pytest.raises(ValueError):
+            tiny_improved_model.embed(TEXTS, pooling="max")
+        with pytest.raises(ValueError):
+            tiny_improved_model.embed(["good", " "])
+        assert tiny_improved_model.get_model_info()["embedding"]["dimension"] == 16
+
+
+class TestEmbedEndpoints:
+    """Test /embed and the include_embedding option"""
+
+    @pytest.fixture
+    def client(self, tiny_improved_model):
+        with patch('main.model_instance', tiny_improved_model), \
+                patch('api.endpoints._model_instance', tiny_improved_model), \
+                patch('main.get_batcher', return_value=None), \
+                patch('main.get_prediction_store', return_value=None):
+            yield TestClient(app)
+
+    def test_embed_base64(self, client, tiny_improved_model):
+        texts = TEXTS + [TEXTS[0]]
+        response = client.post("/embed", json={"texts": texts, "pooling": "mean", "dtype": "float16"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["embeddings"]["shape"] == [5, 16]
+        assert (body["total_processed"], body["unique_processed"]) == (5, 4)
+        assert body["model"] == tiny_improved_model.model_name
+
+        vectors = decode(body["embeddings"])
+        assert vectors.dtype == np.float16
+        np.testing.assert_allclose(vectors[:4], tiny_improved_model.embed(TEXTS, "mean"), atol=1e-2)
+        np.testing.assert_array_equal(vectors[4], vectors[0])
+
+    def test_embed_binary_normalized(self, client):
+        response = client.post("/embed", json={"texts": TEXTS, "normalize": True, "format": "binary"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["x-embedding-shape"] == "4,16"
+        assert response.headers["x-embedding-pooling"] == "cls"
+        vectors = np.frombuffer(response.content, dtype="<f4").reshape(4, 16)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+    def test_predict_includes_embedding(self, client, tiny_improved_model):
+        plain = client.post("/predict", json={"text": "good movie"}).json()
+        assert plain["embedding"] is None
+
+        body = client.post("/predict", json={"text": "good movie", "include_embedding": True}).json()
+        assert body["sentiment"] == plain["sentiment"]
+        assert body["embedding"]["shape"] == [16]
+        np.testing.assert_allclose(decode(body["embedding"]), tiny_improved_model.embed(["good movie"])[0], atol=1e-6)
+
+        texts = ["good movie", "bad day", "good movie"]
+        batch = client.post("/predict/batch", json={
+            "texts": texts, "include_embedding": True, "embedding": {"pooling": "mean"}
+        }).json()
+        vectors = decode(batch["embeddings"])
+        assert vectors.shape == (3, 16) and len(batch["results"]) == 3
+        np.testing.assert_allclose(vectors[:2], tiny_improved_model.embed(texts[:2], "mean"), atol=1e-6)
+        np.testing.assert_array_equal(vectors[2], vectors[0])
+
+    def test_store_cache_skipped_for_embeddings(self, client):
+        store = Mock()
+        store.get.return_value = {"sentiment": "positive", "confidence": 0.99, "processing_time": 0.0}
+        with patch('main.get_prediction_store', return_value=store):
+            body = client.post("/predict", json={"text": "good movie", "include_embedding": True}).json()
+        assert body["embedding"] is not None
+        store.get.assert_not_called()
+        store.record.assert_called_once()
+
+    def test_unavailable_and_invalid(self, client):
+        assert client.post("/embed", json={"texts": ["good"], "pooling": "max"}).status_code == 422
+        assert client.post("/embed", json={"texts": ["good", " "]}).status_code == 422
+        assert client.post("/embed", json={"texts": ["good"], "format": "npy"}).status_code == 422
+
+        with patch('api.endpoints._model_instance', StubSentimentModel()):
+            response = client.post("/embed", json={"texts": ["good"]})
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Embeddings require INFERENCE_BACKEND=thread"
+        with patch.dict(app.dependency_overrides, {get_model_or_fallback: get_fallback_model}):
+            assert client.post("/embed", json={"texts": ["good"]}).status_code == 503
+            response = client.post("/predict", json={"text": "good", "include_embedding": True})
+            assert response.status_code == 503
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
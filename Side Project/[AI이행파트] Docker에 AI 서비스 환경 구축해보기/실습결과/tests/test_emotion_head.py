@@ -0,0 +1,193 @@
+import threading
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.endpoints import get_model_or_fallback
+from models.emotion_head import EmotionHead, emotion_metrics, fit_model_emotion_head, load_emotion_head
+from models.rule_based_model import get_fallback_model
+from models.stub_model import StubSentimentModel
+from utils.config import get_settings
+from tests.tiny_model import build_improved_model
+from main import app
+
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+EMOTIONS = ["joy", "anger", "sadness"]
+TEXTS = ["good movie", "terrible day", "the movie was ok .", "really great", "bad bad day"]
+
+
+def separable_sample(n=600, hidden=16, seed=0):
+    """Features where each emotion depends on one direction; some rows have two emotions"""
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(n, hidden)).astype(np.float32)
+    targets = (features[:, :len(EMOTIONS)] > 0.5).astype(np.float32)
+    return features, targets
+
+
+@pytest.fixture(scope="module")
+def head_path(tmp_path_factory):
+    features, targets = separable_sample()
+    head = EmotionHead.fit(features, targets, EMOTIONS)
+    head.metadata = {"model_id": MODEL_ID}
+    path = str(tmp_path_factory.mktemp("emotion") / "emotion_head.pt")
+    head.save(path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def model(head_path):
+    return build_improved_model(emotion_head_path=head_path)
+
+
+class TestEmotionHead:
+    """Test fitting, metrics and persistence of the linear head"""
+
+    def test_fit_learns_multi_label_targets(self):
+        features, targets = separable_sample()
+        head = EmotionHead.fit(features[:500], targets[:500], EMOTIONS)
+        metrics = emotion_metrics(head.predict_proba(features[500:]), targets[500:])
+        assert metrics["micro_f1"] > 0.9
+        assert metrics["macro_f1"] > 0.9
+
+    def test_metrics(self):
+        targets = np.array([[1, 0], [1, 1], [0, 0]])
+        assert emotion_metrics(targets.astype(np.float32), targets)["exact_match"] == 1.0
+        probs = np.array([[0.9, 0.1], [0.9, 0.2], [0.1, 0.1]])
+        metrics = emotion_metrics(probs, targets)
+        assert metrics["micro_f1"] == pytest.approx(2 * 2 / (2 * 2 + 1))
+        assert metrics["exact_match"] == pytest.approx(2 / 3, abs=1e-4)
+
+    def test_save_load_and_model_check(self, head_path, monkeypatch):
+        monkeypatch.setattr(get_settings(), "emotion_head_path", head_path)
+        loaded = load_emotion_head(get_settings(), MODEL_ID, 16)
+        assert loaded.labels == EMOTIONS
+        features, _ = separable_sample(n=5, seed=1)
+        np.testing.assert_allclose(loaded.predict_proba(features), EmotionHead.load(head_path).predict_proba(features))
+
+        # Heads trained on another encoder are ignored
+        assert load_emotion_head(get_settings(), "other/model", 16) is None
+        assert load_emotion_head(get_settings(), MODEL_ID, 32) is None
+
+
+class TestSharedEncoder:
+    """Test sentiment and emotion from one encoder pass"""
+
+    def test_one_encoder_pass_for_both_heads(self, model, monkeypatch):
+        monkeypatch.setattr(model.settings, "inference_batch_size", 2)
+        calls = []
+        hook = model.model.base_model.register_forward_hook(lambda *args: calls.append(1))
+        try:
+            results = model.predict_batch(TEXTS)
+        finally:
+            hook.remove()
+
+        assert len(calls) == 3  # ceil(5 / 2) batches, not one per head
+        assert all(set(r["emotions"]["scores"]) == set(EMOTIONS) for r in results)
+
+    def test_heads_match_separate_computation(self, model, tiny_improved_model):
+        results = model.predict_batch(TEXTS)
+        expected = model.emotion_head.predict_proba(model.encode_features(TEXTS))
+        sentiment_only = tiny_improved_model
+
+        for result, row, plain in zip(results, expected, sentiment_only.predict_batch(TEXTS)):
+            assert list(result["emotions"]["scores"].values()) == pytest.approx(row.tolist(), abs=1e-4)
+            assert (result["sentiment"], result["confidence"]) == (plain["sentiment"], plain["confidence"])
+            assert "emotions" not in plain
+        assert model.tasks == ("sentiment", "emotion")
+        assert sentiment_only.tasks == ("sentiment",)
+
+    def test_threshold_selects_labels(self, model, monkeypatch):
+        monkeypatch.setattr(model.settings, "emotion_threshold", 0.0)
+        emotions = model.predict("good movie")["emotions"]
+        assert set(emotions["labels"]) == set(EMOTIONS)
+        assert emotions["labels"] == sorted(EMOTIONS, key=lambda label: -emotions["scores"][label])
+        monkeypatch.setattr(model.settings, "emotion_threshold", 1.01)
+        assert model.predict("good movie")["emotions"]["labels"] == []
+
+    def test_features_stay_with_their_thread(self, head_path):
+        """Replicas share the encoder hook; each thread only receives its own batch's vectors"""
+        model = build_improved_model(emotion_head_path=head_path, model_replicas=4)
+        expected = {text: model.predict(text)["emotions"] for text in TEXTS}
+        mismatches = []
+
+        def worker(text):
+            for _ in range(20):
+                if model.predict(text)["emotions"] != expected[text]:
+                    mismatches.append(text)
+
+        threads = [threading.Thread(target=worker, args=(text,)) for text in TEXTS]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not mismatches
+
+    def test_fit_from_model(self, tiny_improved_model):
+        model = tiny_improved_model
+        rows = [{"text": text, "emotions": ["joy"] if "good" in text or "great" in text else ["sadness"]}
+                for text in TEXTS * 4]
+        head = fit_model_emotion_head(model, rows, holdout=0.25, epochs=50)
+        assert head.labels == ["joy", "sadness"]
+        assert head.metadata["model_id"] == model.model_name
+        assert head.metadata["samples"] == {"fit": 15, "eval": 5}
+        with pytest.raises(ValueError):
+            fit_model_emotion_head(model, rows, labels=["joy"])
+
+
+class TestTasksOption:
+    """Test the tasks option of /predict and /predict/batch"""
+
+    @pytest.fixture
+    def client(self, model):
+        with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+                patch('main.get_batcher', return_value=None), \
+                patch('main.get_prediction_store', return_value=None):
+            yield TestClient(app)
+
+    def test_either_or_both(self, client):
+        default = client.post("/predict", json={"text": "good movie"}).json()
+        assert default["sentiment"] and default["emotions"] is None
+
+        emotion = client.post("/predict", json={"text": "good movie", "tasks": ["emotion"]}).json()
+        assert emotion["sentiment"] is None and emotion["confidence"] is None
+        assert set(emotion["emotions"]["scores"]) == set(EMOTIONS)
+
+        both = client.post("/predict/batch", json={"texts": TEXTS, "tasks": ["sentiment", "emotion"]}).json()
+        assert all(r["sentiment"] and r["emotions"] for r in both["results"])
+
+    def test_invalid_and_unavailable_tasks(self, client, tiny_improved_model):
+        assert client.post("/predict", json={"text": "good", "tasks": ["topic"]}).status_code == 422
+        assert client.post("/predict", json={"text": "good", "tasks": []}).status_code == 422
+
+        with patch('api.endpoints._model_instance', tiny_improved_model):
+            response = client.post("/predict", json={"text": "good", "tasks": ["emotion"]})
+            assert response.status_code == 400
+            assert response.json()["detail"].endswith("(set EMOTION_HEAD_PATH)")
+        with patch('api.endpoints._model_instance', StubSentimentModel()):
+            response = client.post("/predict", json={"text": "good", "tasks": ["emotion"]})
+            assert response.status_code == 400
+            assert "requires INFERENCE_BACKEND=thread" in response.json()["detail"]
+        # Degraded (rule-based fallback): no emotion head until the model is back
+        with patch.dict(app.dependency_overrides, {get_model_or_fallback: get_fallback_model}):
+            response = client.post("/predict/batch", json={"texts": ["good"], "tasks": ["emotion"]})
+            assert response.status_code == 503
+
+    def test_store_cache_skipped_for_emotions(self, client, model):
+        store = Mock()
+        store.get.return_value = {"sentiment": "positive", "confidence": 0.99, "processing_time": 0.0}
+        with patch('main.get_prediction_store', return_value=store):
+            cached = client.post("/predict", json={"text": "good movie"}).json()
+            fresh = client.post("/predict", json={"text": "good movie", "tasks": ["sentiment", "emotion"]}).json()
+        assert cached["confidence"] == 0.99
+        assert fresh["emotions"] is not None
+        store.record.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.lexicon import LexiconEngine, expand_korean_forms
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LexiconEngine()
+
+
+class TestKoreanForms:
+    """Test dictionary-form expansion of Korean predicates"""
+
+    @pytest.mark.parametrize("word,forms", [
+        ("좋다", {"좋다", "좋"}),
+        ("기쁘다", {"기쁘", "기뻐", "기쁜"}),
+        ("나쁘다", {"나쁘", "나빠", "나쁜"}),
+        ("무섭다", {"무섭", "무서워", "무서운"}),
+        ("행복하다", {"행복하", "행복해", "행복한"}),
+        ("보다", {"보", "봐", "본"}),
+    ])
+    def test_expansion(self, word, forms):
+        """Stems and contracted / adnominal forms are generated"""
+        assert forms <= expand_korean_forms(word)
+
+    def test_non_predicate_unchanged(self):
+        """Nouns and English words are matched as-is"""
+        assert expand_korean_forms("최고") == {"최고"}
+        assert expand_korean_forms("good") == {"good"}
+
+
+class TestLexiconEngine:
+    """Test lexicon scoring"""
+
+    @pytest.mark.parametrize("text", ["정말 좋아요", "좋은 하루", "기뻐요!", "This is GOOD"])
+    def test_inflected_positive(self, engine, text):
+        """Inflected forms of a dictionary entry match"""
+        assert engine.score(text)["score"] > 0
+
+    @pytest.mark.parametrize("text", ["안 좋아요", "좋지 않아요", "좋지않다", "not good", "행복하지 못했다"])
+    def test_negation(self, engine, text):
+        """Pre- and post-negation flip the polarity"""
+        scores = engine.score(text)
+        assert scores["score"] < 0
+        assert scores["negated"] == 1
+
+    def test_negation_requires_token_boundary(self, engine):
+        """Negators inside other words do not negate ("안녕", "nothing")"""
+        assert engine.score("안녕 좋아요")["score"] > 0
+        assert engine.score("nothing good")["score"] > 0
+
+    @pytest.mark.parametrize("text", ["The ambassador wore a badge", "I bought gloves", "goodwill"])
+    def test_latin_terms_require_word_boundary(self, engine, text):
+        """English terms inside other words do not match ("sad"/"bad" in "ambassador"/"badge")"""
+        assert engine.score(text)["matched"] == 0
+
+    def test_latin_term_next_to_hangul_or_punctuation(self, engine):
+        """Hangul particles and punctuation count as word boundaries"""
+        assert engine.score("good이야")["score"] > 0
+        assert engine.score("(bad)")["score"] < 0
+
+    def test_weights(self):
+        """Weights are summed per occurrence"""
+        engine = LexiconEngine(positive={"good": 2.0}, negative={"bad": 0.5})
+        scores = engine.score("good good bad")
+
+        assert scores["positive"] == 4.0
+        assert scores["negative"] == 0.5
+        assert scores["matched"] == 3
+
+    def test_overlapping_forms_counted_once(self, engine):
+        """A word matching several expanded forms counts once"""
+        assert engine.score("좋다")["matched"] == 1
+
+    def test_score_batch(self, engine):
+        """Batch scoring equals per-text scoring"""
+        texts = ["최고", "최악이야", "그냥"]
+        assert engine.score_batch(texts) == [engine.score(text) for text in texts]
+
+    def test_from_file(self, tmp_path):
+        """TSV lexicon: weight sign gives the polarity"""
+        path = tmp_path / "lexicon.tsv"
+        path.write_text("# word\tweight\n꿀잼\t2\n노잼\t-1.5\n", encoding="utf-8")
+        engine = LexiconEngine.from_file(str(path))
+
+        assert len(engine) == 2
+        assert engine.score("꿀잼 노잼")["score"] == 0.5
+
+    def test_large_lexicon(self):
+        """Tens of thousands of entries compile and score correctly"""
+        positive = {f"pos{i:05d}x": 1.0 for i in range(20000)}
+        negative = {f"neg{i:05d}x": 1.0 for i in range(20000)}
+        engine = LexiconEngine(positive=positive, negative=negative)
+
+        scores = engine.score("pos00001x pos19999x neg12345x unrelated")
+        assert scores["positive"] == 2.0
+        assert scores["negative"] == 1.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
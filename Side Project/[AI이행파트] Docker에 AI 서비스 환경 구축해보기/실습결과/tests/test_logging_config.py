@@ -0,0 +1,118 @@
+import json
+import logging
+import queue
+import pytest
+from types import SimpleNamespace
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import logging_config
+from utils.logging_config import JsonFormatter, NonBlockingQueueHandler, RouteSampler
+
+
+def make_record(level=logging.INFO, msg="done", args=None, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class ExplodingArg:
+    """Fails if formatted, to prove formatting is deferred"""
+
+    def __str__(self):
+        raise AssertionError("formatted in the calling thread")
+
+
+class TestJsonFormatter:
+    """Test JSON log lines"""
+
+    def test_extra_fields_included(self):
+        """Fields passed via extra= become JSON keys"""
+        line = JsonFormatter().format(make_record(msg="took %.1f", args=(1.25,), route="/predict", texts=3))
+        entry = json.loads(line)
+
+        assert entry["message"] == "took 1.2"
+        assert entry["level"] == "INFO"
+        assert entry["route"] == "/predict"
+        assert entry["texts"] == 3
+
+
+class TestRouteSampler:
+    """Test per-route success-log sampling"""
+
+    def test_sampling(self):
+        """Success logs for sampled routes are dropped, others kept"""
+        sampler = RouteSampler({"/predict": 0.0})
+
+        assert not sampler.filter(make_record(route="/predict"))
+        assert sampler.filter(make_record(route="/predict/batch"))
+        assert sampler.filter(make_record())
+
+    def test_warnings_always_kept(self):
+        """Warnings and errors bypass sampling"""
+        sampler = RouteSampler({"/predict": 0.0})
+        assert sampler.filter(make_record(level=logging.ERROR, route="/predict"))
+
+
+class TestNonBlockingQueueHandler:
+    """Test the hot-path handler"""
+
+    def test_no_formatting_in_caller(self):
+        """Records are queued unformatted"""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        handler.handle(make_record(msg="value %s", args=(ExplodingArg(),)))
+
+        assert handler.queue.qsize() == 1
+
+    def test_drops_when_full(self):
+        """A full queue drops records instead of blocking"""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        assert handler.dropped == 1
+
+
+class TestSetupLogging:
+    """Test the background writer"""
+
+    @pytest.fixture
+    def restore_root(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        yield
+        logging_config.shutdown_logging()
+        root.handlers, root.level = handlers, level
+
+    def test_writes_json_file(self, tmp_path, restore_root):
+        """Records reach the rotating file as JSON after the queue is flushed"""
+        settings = SimpleNamespace(
+            log_format="json", log_dir=str(tmp_path), log_level="INFO",
+            log_file_max_bytes=1024 * 1024, log_file_backup_count=1,
+            log_queue_size=100, log_sample_rates={}
+        )
+        logging_config.setup_logging(settings)
+        logging.getLogger("test").info("Prediction completed", extra={"route": "/predict"})
+        logging_config.shutdown_logging()
+
+        lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+        assert json.loads(lines[-1])["route"] == "/predict"
+
+    def test_missing_log_dir_skips_file(self, tmp_path, restore_root):
+        """Without the log directory, only stdout is used"""
+        settings = SimpleNamespace(
+            log_format="text", log_dir=str(tmp_path / "missing"), log_level="INFO",
+            log_file_max_bytes=1024, log_file_backup_count=1,
+            log_queue_size=100, log_sample_rates={}
+        )
+        listener = logging_config.setup_logging(settings)
+
+        assert len(listener.handlers) == 1
+        assert not (tmp_path / "missing").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -9,7 +9,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from main import app
-from models.sentiment_model import SentimentModel
+from models.registry import SentimentPredictor as SentimentModel
+from models.stub_model import StubSentimentModel
 
 @pytest.fixture
 def client():
@@ -151,5 +152,28 @@ class TestModelEndpoints:
         assert "model_healthy" in data
         assert "status" in data
 
+class TestDocumentEndpoint:
+    """Test /predict/document limits and models without document support"""
+
+    def test_length_limit_follows_settings(self, client, tiny_improved_model, monkeypatch):
+        with patch('main.model_instance', tiny_improved_model), \
+                patch('api.endpoints._model_instance', tiny_improved_model):
+            monkeypatch.setattr(tiny_improved_model.settings, "max_document_length", 30000)
+            response = client.post("/predict/document", json={"text": "good movie . " * 2000})
+            assert response.status_code == 200
+            assert response.json()["num_windows"] > 1
+
+            monkeypatch.setattr(tiny_improved_model.settings, "max_document_length", 20)
+            response = client.post("/predict/document", json={"text": "good movie . " * 3})
+            assert response.status_code == 400
+
+    def test_stub_backend_rejected(self, client):
+        stub = StubSentimentModel()
+        with patch('main.model_instance', stub), patch('api.endpoints._model_instance', stub):
+            response = client.post("/predict/document", json={"text": "good movie"})
+
+        assert response.status_code == 400
+        assert "INFERENCE_BACKEND" in response.json()["detail"]
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
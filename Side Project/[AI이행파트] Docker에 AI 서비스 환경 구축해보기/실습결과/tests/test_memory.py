@@ -0,0 +1,162 @@
+import tracemalloc
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.aggregates import SentimentAggregator
+from utils import soak
+from utils.config import get_settings
+from utils.memory import AllocationTracker, MemoryMonitor, fit_slope, process_rss
+import main
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryMonitor:
+    """Test RSS sampling, the growth slope and component accounting"""
+
+    def test_rss_tracks_allocations(self):
+        before = process_rss()
+        block = b"x" * (64 * 2 ** 20)
+        assert process_rss() - before > 32 * 2 ** 20
+        del block
+
+    def test_fit_slope(self):
+        assert fit_slope([(0, 1.0), (1, 3.0), (2, 5.0)]) == pytest.approx(2.0)
+        assert fit_slope([(0, 1.0)]) is None
+        assert fit_slope([(1, 1.0), (1, 2.0)]) is None
+
+    def test_slope_from_history(self):
+        clock = FakeClock()
+        monitor = MemoryMonitor(history_size=3, clock=clock)
+        for i, rss in enumerate([100, 200, 300, 400]):
+            clock.now = i * 60.0
+            with patch("utils.memory.process_rss", return_value=rss * 2 ** 20):
+                monitor.sample()
+        # Oldest sample dropped; 100 MB per minute
+        assert len(monitor.history) == 3
+        assert monitor.slope_mb_per_hour() == pytest.approx(6000.0)
+        assert monitor.peak_rss == 400 * 2 ** 20
+
+        # Reading stats does not add samples
+        clock.now = 4 * 60.0
+        with patch("utils.memory.process_rss", return_value=10000 * 2 ** 20):
+            stats = monitor.get_stats()
+        assert stats["rss_bytes"] == stats["peak_rss_bytes"] == 10000 * 2 ** 20
+        assert stats["history_samples"] == 3
+        assert stats["rss_slope_mb_per_hour"] == pytest.approx(6000.0)
+
+    def test_components(self):
+        monitor = MemoryMonitor()
+        monitor.register("cache", lambda: {"entries": 3})
+        monitor.register("broken", lambda: 1 / 0)
+        stats = monitor.get_stats()
+        assert stats["components"]["cache"] == {"entries": 3}
+        assert "division by zero" in stats["components"]["broken"]["error"]
+        assert stats["rss_bytes"] > 0 and stats["threads"] >= 1
+
+    def test_aggregate_keys_allocate_only_used_buckets(self):
+        aggregator = SentimentAggregator(bucket_seconds=10, window_seconds=3600)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(1000):
+                aggregator.record(f"key-{i}", [{"sentiment": "positive", "confidence": 0.9}])
+            per_key = (tracemalloc.get_traced_memory()[0] - before) / 1000
+        finally:
+            tracemalloc.stop()
+        assert per_key < 4096
+        assert aggregator.get_stats()["buckets"] == 1000
+
+
+class TestAllocationTracker:
+    """Test tracemalloc snapshot diffs"""
+
+    def test_reports_growing_site(self):
+        tracker = AllocationTracker()
+        retained = []
+        try:
+            assert tracker.diff()["started"] is True
+            retained.extend(bytearray(1000) for _ in range(2000))
+            report = tracker.diff(limit=5)
+            assert report["started"] is False
+            top = report["top"][0]
+            assert top["location"][0].startswith(__file__)
+            assert top["size_diff_bytes"] >= 2000 * 1000
+
+            # The previous snapshot is the new baseline
+            assert tracker.diff(limit=5)["total_diff_bytes"] < 2000 * 1000
+        finally:
+            assert tracker.stop() is True
+        assert not tracemalloc.is_tracing()
+        assert tracker.stop() is False
+
+
+class TestMemoryEndpoints:
+    """Test /metrics/memory and the admin snapshot endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        with patch.object(get_settings(), "admin_token", "secret"):
+            yield TestClient(main.app)
+
+    def test_metrics(self, client):
+        response = client.get("/metrics/memory")
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["rss_bytes"] > 0
+        assert {"token_cache", "aggregates", "prediction_store", "log_queue"} <= set(stats["components"])
+
+    def test_snapshot_requires_admin(self, client):
+        assert client.post("/admin/memory/snapshot").status_code == 401
+        headers = {"X-Admin-Token": "secret"}
+        try:
+            assert client.post("/admin/memory/snapshot", headers=headers).json()["started"] is True
+            assert "top" in client.post("/admin/memory/snapshot?limit=3", headers=headers).json()
+        finally:
+            assert client.delete("/admin/memory/snapshot", headers=headers).json() == {"stopped": True}
+
+
+class TestSoak:
+    """Test the soak script"""
+
+    def test_evaluate(self):
+        flat = [(t, 100 * 2 ** 20) for t in range(0, 100, 10)]
+        growing = [(t, (100 + t) * 2 ** 20) for t in range(0, 100, 10)]
+        warming_up = [(t, (100 + min(t, 40)) * 2 ** 20) for t in range(0, 100, 10)]
+
+        assert soak.evaluate(flat, warmup=0.0, max_slope_mb_per_hour=1)["passed"]
+        assert not soak.evaluate(growing, warmup=0.5, max_slope_mb_per_hour=1)["passed"]
+        assert not soak.evaluate(warming_up, warmup=0.0, max_slope_mb_per_hour=1)["passed"]
+        assert soak.evaluate(warming_up, warmup=0.5, max_slope_mb_per_hour=1)["passed"]
+        assert soak.evaluate([], warmup=0.5, max_slope_mb_per_hour=1)["reason"] == "no memory samples"
+
+    def test_short_run_against_stub_server(self):
+        port = soak._free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = soak.start_server(port)
+        try:
+            soak.wait_ready(url)
+            report = soak.run(url, duration=2, concurrency=2, sample_seconds=0.5, warmup=0.0,
+                              max_slope_mb_per_hour=float("inf"))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        assert report["passed"]
+        assert report["requests"] > 0 and report["errors"] == 0
+        assert report["steady_samples"] >= 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,113 @@
+"""
+Contract every inference backend must satisfy
+
+Batching, caching, single-flight, the prediction store and shadow evaluation only rely on
+the SentimentPredictor interface. Each backend below is checked against the same
+behaviour so any of them can be dropped in behind the API. Add new backends to BACKENDS.
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.artifacts import bundle
+from models.rule_based_model import RuleBasedSentimentModel
+from models.stub_model import StubSentimentModel
+from utils.config import get_settings
+from tests.tiny_model import build_tiny_tokenizer, build_tiny_model
+
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+SENTIMENTS = {"negative", "neutral", "positive"}
+TEXTS = ["good movie", "terrible day", "the movie was ok .", "really really good", "bad", "great day ."]
+
+BACKENDS = ["stub", "rule_based", "torch", "torch_int8", "process"]
+
+
+def _artifact(tmp_path_factory, quantize="none"):
+    path = tmp_path_factory.mktemp("artifact") / "model"
+    bundle(build_tiny_model(), build_tiny_tokenizer(), str(path), model_id=MODEL_ID, quantize=quantize)
+    return str(path)
+
+
+@pytest.fixture(scope="module", params=BACKENDS)
+def backend(request, tmp_path_factory):
+    """Each backend loaded once per module (torch backends from an offline tiny-model artifact)"""
+    name = request.param
+    if name == "stub":
+        yield StubSentimentModel(latency_per_batch_ms=1)
+    elif name == "rule_based":
+        yield RuleBasedSentimentModel()
+    elif name in ("torch", "torch_int8"):
+        from models.sentiment_model_improved import SentimentModelImproved
+
+        path = _artifact(tmp_path_factory, "dynamic-int8" if name == "torch_int8" else "none")
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "model_artifact_path", path)
+            yield SentimentModelImproved()
+    elif name == "process":
+        from models.process_pool import ProcessPoolSentimentModel
+
+        path = _artifact(tmp_path_factory)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setenv("MODEL_ARTIFACT_PATH", path)
+            model = ProcessPoolSentimentModel(workers=1, max_batch=4, start_timeout=300)
+        yield model
+        model.close()
+
+
+class TestModelContract:
+    """Behaviour shared by all backends"""
+
+    def test_result_shape(self, backend):
+        result = backend.predict("good movie")
+        assert result["sentiment"] in SENTIMENTS
+        assert 0.0 <= result["confidence"] <= 1.0
+        assert result["processing_time"] >= 0.0
+
+    def test_batch_matches_single_predictions(self, backend):
+        """Batching never changes a text's result (order preserved, independent of batch mates)"""
+        batch = backend.predict_batch(TEXTS)
+        assert len(batch) == len(TEXTS)
+        for text, result in zip(TEXTS, batch):
+            single = backend.predict(text)
+            assert result["sentiment"] == single["sentiment"], text
+            assert result["confidence"] == pytest.approx(single["confidence"], abs=0.02), text
+
+    def test_deterministic(self, backend):
+        def outcome(results):
+            return [(r["sentiment"], r["confidence"]) for r in results]
+
+        assert outcome(backend.predict_batch(TEXTS)) == outcome(backend.predict_batch(TEXTS))
+
+    def test_empty_inputs(self, backend):
+        """An empty batch is a no-op; an empty or blank text is rejected with ValueError"""
+        assert backend.predict_batch([]) == []
+        with pytest.raises(ValueError):
+            backend.predict("   ")
+        with pytest.raises(ValueError):
+            backend.predict_batch(["good", ""])
+
+    def test_non_ascii_and_long_texts(self, backend):
+        texts = ["정말 최고예요 👍", "とても良い", "good " * 2000]
+        results = backend.predict_batch(texts)
+        assert [r["sentiment"] in SENTIMENTS for r in results] == [True] * 3
+
+    def test_concurrent_callers(self, backend):
+        """Concurrent batches from many threads (the threadpool / batcher) get the sequential results"""
+        expected = [r["sentiment"] for r in backend.predict_batch(TEXTS)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda _: backend.predict_batch(TEXTS), range(16)))
+        assert all([r["sentiment"] for r in output] == expected for output in outputs)
+
+    def test_health_and_info(self, backend):
+        assert backend.health_check() is True
+        info = backend.get_model_info()
+        assert info["model_name"]
+        assert info["loaded"] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
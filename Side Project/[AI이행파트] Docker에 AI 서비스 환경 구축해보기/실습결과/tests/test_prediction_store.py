@@ -0,0 +1,158 @@
+import sqlite3
+import time
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.prediction_store import PredictionStore, model_fingerprint, text_hash
+from main import app
+
+
+def result(sentiment, confidence=0.8, **extra):
+    return {"sentiment": sentiment, "confidence": confidence, "processing_time": 0.01, **extra}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "predictions.db")
+
+
+@pytest.fixture
+def store(db_path):
+    store = PredictionStore(db_path, "model-a", flush_interval=0.01)
+    yield store
+    store.close()
+
+
+class TestPredictionStore:
+    """Test batched persistence, indexed queries and the warm cache"""
+
+    def test_record_and_query(self, store):
+        store.record(["good", "bad", "fine"], [result("positive", 0.9), result("negative"), result("neutral")])
+        assert store.flush()
+
+        assert [row["text"] for row in store.query(text="bad")] == ["bad"]
+        rows = store.query(sentiment="positive")
+        assert len(rows) == 1
+        assert rows[0]["confidence"] == pytest.approx(0.9)
+        assert rows[0]["model_id"] == "model-a"
+        assert len(store.query(limit=2)) == 2
+        assert store.query(since=time.time() + 60) == []
+
+    def test_unknown_results_are_not_stored(self, store):
+        store.record(["x", "y"], [result("unknown", 0.0), result("positive")])
+        assert store.flush()
+        assert [row["text"] for row in store.query()] == ["y"]
+
+    def test_writes_are_batched(self, db_path):
+        """Rows queued together are written in few transactions by the writer thread"""
+        store = PredictionStore(db_path, "model-a", flush_interval=0.2, batch_size=100)
+        texts = [f"text {i}" for i in range(250)]
+        store.record(texts, [result("positive")] * len(texts))
+        assert store.flush()
+        store.close()
+
+        assert store.written == 250
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 250
+
+    def test_full_queue_drops_without_blocking(self, db_path):
+        store = PredictionStore(db_path, "model-a", queue_size=5, flush_interval=0.01)
+        with patch.object(store, "_write", side_effect=lambda *a: time.sleep(0.2)):
+            started = time.perf_counter()
+            store.record([f"t{i}" for i in range(50)], [result("positive")] * 50)
+            assert time.perf_counter() - started < 0.1
+        assert store.dropped > 0
+        store.close()
+
+    def test_warm_cache_survives_restart(self, db_path):
+        store = PredictionStore(db_path, "model-a", flush_interval=0.01)
+        store.record(["good", "meh"], [result("positive", 0.9), result("neutral", 0.6)])
+        store.record(["good"], [result("negative", 0.7)])  # newer result wins
+        store.record(["fallback"], [result("neutral", 0.5, degraded=True)])
+        store.close()
+
+        restarted = PredictionStore(db_path, "model-a")
+        assert restarted.warmed == 2
+        assert restarted.get("good") == {"sentiment": "negative", "confidence": pytest.approx(0.7), "processing_time": 0.0}
+        assert restarted.get("fallback") is None  # rule-based results are not served as model results
+        restarted.close()
+
+        other_model = PredictionStore(db_path, "model-b")
+        assert other_model.warmed == 0
+        assert other_model.get("good") is None
+        other_model.close()
+
+    def test_cache_is_bounded(self, db_path):
+        store = PredictionStore(db_path, "model-a", cache_entries=2)
+        store.record(["a", "b", "c"], [result("positive")] * 3)
+        assert store.get("a") is None
+        assert store.get("c") is not None
+        store.close()
+
+    def test_queries_use_indexes(self, store):
+        """Text, label and time filters are answered from indexes, not table scans"""
+        conn = sqlite3.connect(store.path)
+        for where, params in [
+            ("text_hash = ?", (text_hash("good"),)),
+            ("sentiment = ? AND created_at >= ?", ("positive", 0.0)),
+            ("created_at >= ?", (0.0,)),
+        ]:
+            plan = " ".join(row[-1] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM predictions WHERE {where} ORDER BY created_at DESC", params
+            ))
+            assert "USING INDEX" in plan, plan
+        conn.close()
+
+    def test_model_fingerprint(self):
+        assert model_fingerprint({"model_name": "m"}) == "m"
+        assert model_fingerprint({"model_name": "m", "calibration": {"temperature": 1.5}}) == "m@T=1.5"
+
+
+class TestPredictionStoreEndpoints:
+    """Test the warm cache on prediction routes and /predictions/query"""
+
+    @pytest.fixture
+    def model(self):
+        model = Mock()
+        model.predict.return_value = result("positive", 0.9)
+        model.predict_batch.side_effect = lambda texts: [result("negative", 0.6) for _ in texts]
+        return model
+
+    @pytest.fixture
+    def client(self, model, store):
+        with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+                patch('main.get_batcher', return_value=None), \
+                patch('main.get_prediction_store', return_value=store):
+            yield TestClient(app)
+
+    def test_predictions_are_persisted_and_reused(self, client, model, store):
+        assert client.post("/predict", json={"text": "great  product"}).json()["sentiment"] == "positive"
+        # Same normalized text: answered from the cache without the model
+        response = client.post("/predict", json={"text": "great product"})
+        assert response.json()["sentiment"] == "positive"
+        assert response.json()["processing_time"] == 0.0
+        assert model.predict.call_count == 1
+
+        client.post("/predict/batch", json={"texts": ["great product", "awful", "awful"]})
+        model.predict_batch.assert_called_once_with(["awful"])
+
+        assert store.flush()
+        response = client.get("/predictions/query", params={"sentiment": "negative"})
+        assert response.status_code == 200
+        assert [row["text"] for row in response.json()["results"]] == ["awful"]
+        assert client.get("/predictions/query", params={"text": "great   product"}).json()["count"] == 1
+
+    def test_query_disabled_without_store(self, model):
+        with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+                patch('main.get_prediction_store', return_value=None):
+            assert TestClient(app).get("/predictions/query").status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.artifacts import bundle
+from models.process_pool import ProcessPoolSentimentModel
+from models.sentiment_model_improved import SentimentModelImproved
+from utils.config import get_settings
+from tests.tiny_model import build_tiny_tokenizer, build_tiny_model
+
+MODEL_ID = "nlptown/bert-base-multilingual-uncased-sentiment"
+TEXTS = ["good movie", "terrible day", "the movie was ok .", "really really good", "bad", "great day ."]
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory):
+    """Tiny model bundled as an artifact; worker processes load it offline through MODEL_ARTIFACT_PATH"""
+    path = tmp_path_factory.mktemp("artifact") / "model"
+    bundle(build_tiny_model(), build_tiny_tokenizer(), str(path), model_id=MODEL_ID)
+    return path
+
+
+@pytest.fixture(scope="module")
+def pool(artifact):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MODEL_ARTIFACT_PATH", str(artifact))
+        pool = ProcessPoolSentimentModel(workers=2, max_batch=4, start_timeout=300)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="module")
+def reference(artifact):
+    """The same model loaded in-process"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(get_settings(), "model_artifact_path", str(artifact))
+        yield SentimentModelImproved()
+
+
+class TestProcessPool:
+    """Test the multi-process inference backend"""
+
+    def test_scores_match_in_process_model(self, pool, reference):
+        """Scores computed in the workers match the in-process model"""
+        raw, grouped = pool.predict_scores_batch(TEXTS)
+        expected_raw, expected_grouped = reference.predict_scores_batch(TEXTS)
+
+        np.testing.assert_allclose(raw, expected_raw, atol=1e-5)
+        np.testing.assert_allclose(grouped, expected_grouped, atol=1e-5)
+
+    def test_large_batch_split_across_workers(self, pool, reference):
+        """Batches larger than max_batch are split and reassembled in order"""
+        texts = [f"{text} {'good ' * i}" for i, text in enumerate(TEXTS * 3)]
+        results = pool.predict_batch(texts)
+        expected = reference.predict_batch(texts)
+
+        assert [r["raw_label"] for r in results] == [r["raw_label"] for r in expected]
+        assert [r["confidence"] for r in results] == pytest.approx([r["confidence"] for r in expected], abs=1e-4)
+
+    def test_non_ascii_texts(self, pool, reference):
+        """Multi-byte UTF-8 texts round-trip through shared memory"""
+        texts = ["정말 좋은 영화", "最悪", "good 🙂 movie"]
+        np.testing.assert_allclose(
+            pool.predict_scores_batch(texts)[0], reference.predict_scores_batch(texts)[0], atol=1e-5
+        )
+
+    def test_concurrent_clients(self, pool, reference):
+        """Concurrent callers each get their own results"""
+        expected = {text: reference.predict(text)["raw_label"] for text in TEXTS}
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda i: (TEXTS[i % len(TEXTS)], pool.predict(TEXTS[i % len(TEXTS)])), range(64)))
+
+        for text, result in results:
+            assert result["raw_label"] == expected[text]
+
+    def test_predict_document_forwarded(self, pool, reference):
+        """Methods without a shared-memory path are forwarded over the pipe"""
+        document = " ".join(["good movie"] * 300)
+        result = pool.predict_document(document, pooling="max")
+        expected = reference.predict_document(document, pooling="max")
+
+        assert result["num_windows"] == expected["num_windows"]
+        assert result["scores"] == pytest.approx(expected["scores"], abs=1e-4)
+
+    def test_errors_propagate(self, pool):
+        """Input errors keep their type; the pool stays usable"""
+        with pytest.raises(ValueError):
+            pool.predict("   ")
+        with pytest.raises(ValueError):
+            pool.predict_document("good", pooling="median")
+
+        assert pool.predict("good")["sentiment"] in ("positive", "neutral", "negative")
+
+    def test_health_and_info(self, pool):
+        """Health check and model info report the worker processes"""
+        assert pool.health_check() is True
+        info = pool.get_model_info()
+
+        assert info["backend"] == "process"
+        assert info["workers"] == 2
+        assert info["alive_workers"] == 2
+        assert os.getpid() not in info["worker_pids"]
+
+    def test_close_releases_shared_memory(self, artifact):
+        """Closing stops the workers and unlinks the shared-memory blocks"""
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setenv("MODEL_ARTIFACT_PATH", str(artifact))
+            pool = ProcessPoolSentimentModel(workers=1, max_batch=2, start_timeout=300)
+        names = [pool.workers[0].input_shm.name, pool.workers[0].output_shm.name]
+        process = pool.workers[0].process
+
+        pool.close()
+
+        assert not process.is_alive()
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+        assert pool.health_check() is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,136 @@
+import threading
+import time
+import pytest
+import torch
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import profiling
+from utils.config import get_settings
+from utils.profiling import ProfileBusyError, StackSampler, capture_profile
+import main
+
+
+def busy_inference_loop(stop: threading.Event):
+    """CPU-bound work the profiler should find"""
+    weight = torch.randn(64, 64)
+    while not stop.is_set():
+        torch.mm(weight, weight)
+        sum(i * i for i in range(500))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_inference_loop, args=(stop,), name="busy-worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestStackSampler:
+    """Test stack sampling and the folded output"""
+
+    def test_finds_busy_function(self, busy_thread):
+        sampler = StackSampler(interval=0.005)
+        sampler.run(0.3)
+
+        assert sampler.samples > 10
+        busy = [stack for stack in sampler.stacks if stack[0] == "busy-worker"]
+        assert busy and all(any("busy_inference_loop" in label for label in stack) for stack in busy)
+        top = sampler.top_functions()
+        assert any("busy_inference_loop" in f["function"] or "<genexpr>" in f["function"] for f in top)
+
+    def test_folded_format(self):
+        sampler = StackSampler()
+        sampler.stacks[("main", "run (a.py:1)", "step; inner (b.py:2)")] = 3
+        sampler.stacks[("main", "run (a.py:1)")] = 1
+        # "frames;separated;by;semicolons count", semicolons inside labels are escaped
+        assert sampler.folded().splitlines() == [
+            "main;run (a.py:1) 1",
+            "main;run (a.py:1);step: inner (b.py:2) 3"
+        ]
+
+    def test_idle_threads_skipped(self):
+        stop = threading.Event()
+        waiter = threading.Thread(target=stop.wait, name="waiter")
+        waiter.start()
+        try:
+            quiet, everything = StackSampler(), StackSampler(include_idle=True)
+            quiet.sample()
+            everything.sample()
+        finally:
+            stop.set()
+            waiter.join()
+        assert not any(stack[0] == "waiter" for stack in quiet.stacks)
+        assert quiet.idle >= 1
+        assert any(stack[0] == "waiter" for stack in everything.stacks)
+
+
+class TestCaptureProfile:
+    """Test the combined capture"""
+
+    def test_torch_ops_from_other_threads(self, busy_thread):
+        report = capture_profile(0.3, interval=0.01, include_torch=True)
+
+        assert 0 < report["sampler_overhead_s"] / report["duration_s"] < 0.5
+        # The torch profiler's start/stop/aggregation is counted too (it dominates under load)
+        assert report["overhead_ratio"] * report["duration_s"] == pytest.approx(
+            report["sampler_overhead_s"] + report["torch_overhead_s"], abs=0.01
+        )
+        assert report["torch_events"] >= sum(op["calls"] for op in report["torch_ops"])
+        assert report["duration_s"] >= 0.3
+        assert "aten::mm" in {op["name"] for op in report["torch_ops"]}
+        assert "busy_inference_loop" in report["folded"]
+
+    def test_one_capture_at_a_time(self):
+        with profiling._capture_lock:
+            with pytest.raises(ProfileBusyError):
+                capture_profile(0.01)
+        report = capture_profile(0.01)
+        assert report["torch_ops"] is None and report["torch_overhead_s"] is None
+
+
+class TestProfileEndpoint:
+    """Test POST /admin/profile"""
+
+    @pytest.fixture
+    def client(self):
+        with patch.object(get_settings(), "admin_token", "secret"):
+            yield TestClient(main.app)
+
+    def test_requires_admin_token(self, client):
+        assert client.post("/admin/profile?seconds=0.01").status_code == 401
+
+    def test_folded_download(self, client, busy_thread):
+        response = client.post("/admin/profile?seconds=0.2&interval_ms=5", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert ".folded" in response.headers["content-disposition"]
+        assert "busy_inference_loop" in response.text
+
+    def test_duration_capped_and_busy(self, client):
+        headers = {"X-Admin-Token": "secret"}
+        with patch.object(get_settings(), "profile_max_seconds", 0.05):
+            started = time.perf_counter()
+            response = client.post("/admin/profile?seconds=60&format=json&torch=false", headers=headers)
+            assert time.perf_counter() - started < 5
+        assert response.status_code == 200
+        assert response.json()["duration_s"] < 1
+
+        with patch.object(get_settings(), "profile_torch_max_seconds", 0.05):
+            report = client.post("/admin/profile?seconds=60&format=json&torch=true", headers=headers).json()
+        assert report["duration_s"] < 1 and report["torch_ops"] is not None
+
+        with profiling._capture_lock:
+            assert client.post("/admin/profile?seconds=0.01", headers=headers).status_code == 409
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,185 @@
+import random
+import threading
+import time
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.replica_pool import ReplicaPool
+from tests.tiny_model import VOCAB, build_improved_model, build_tiny_tokenizer
+
+WORDS = [w for w in VOCAB if not w.startswith("[")]
+
+
+def random_texts(seed: int, count: int, min_words: int = 1, max_words: int = 12):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words))) for _ in range(count)]
+
+
+class TestReplicaPool:
+    """Test replica checkout"""
+
+    def test_replicas_have_own_tokenizer_and_shared_model(self):
+        """Each replica gets a tokenizer copy; the weights are shared"""
+        tokenizer, model = build_tiny_tokenizer(), object()
+        pool = ReplicaPool(tokenizer, model, size=3)
+
+        assert pool.replicas[0].tokenizer is tokenizer
+        assert len({id(r.tokenizer) for r in pool.replicas}) == 3
+        assert all(r.model is model for r in pool.replicas)
+
+    def test_exclusive_checkout(self):
+        """A replica is never held by two threads at once"""
+        pool = ReplicaPool(build_tiny_tokenizer(), object(), size=2)
+        holders = {}
+        violations = []
+        guard = threading.Lock()
+
+        def work():
+            for _ in range(200):
+                with pool.acquire() as replica:
+                    with guard:
+                        if replica.index in holders:
+                            violations.append(replica.index)
+                        holders[replica.index] = threading.get_ident()
+                    time.sleep(0)
+                    with guard:
+                        del holders[replica.index]
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert violations == []
+        stats = pool.get_stats()
+        assert stats["acquisitions"] == 1600
+        assert stats["peak_in_use"] <= 2
+        assert stats["in_use"] == 0
+
+    def test_reentrant_acquire(self):
+        """Nested acquire in the same thread reuses the held replica instead of deadlocking"""
+        pool = ReplicaPool(build_tiny_tokenizer(), object(), size=1, timeout=1.0)
+
+        with pool.acquire() as outer:
+            with pool.acquire() as inner:
+                assert inner is outer
+            # The replica is still held by the outer block
+            assert pool.get_stats()["in_use"] == 1
+
+        assert pool.get_stats()["in_use"] == 0
+
+    def test_timeout(self):
+        """Waiting longer than the timeout raises TimeoutError"""
+        pool = ReplicaPool(build_tiny_tokenizer(), object(), size=1, timeout=0.05)
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold():
+            with pool.acquire():
+                acquired.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        acquired.wait(5)
+        try:
+            with pytest.raises(TimeoutError):
+                with pool.acquire():
+                    pass
+        finally:
+            release.set()
+            holder.join()
+
+    def test_released_on_error(self):
+        """An exception inside the block returns the replica"""
+        pool = ReplicaPool(build_tiny_tokenizer(), object(), size=1, timeout=0.05)
+
+        with pytest.raises(RuntimeError):
+            with pool.acquire():
+                raise RuntimeError("boom")
+
+        with pool.acquire() as replica:
+            assert replica.index == 0
+
+    def test_invalid_size(self):
+        """At least one replica is required"""
+        with pytest.raises(ValueError):
+            ReplicaPool(build_tiny_tokenizer(), object(), size=0)
+
+
+@pytest.mark.parametrize("replicas", [1, 4])
+class TestConcurrentInference:
+    """Hammer one model instance from many threads and compare with sequential results"""
+
+    def test_predictions_match_sequential(self, replicas):
+        """Concurrent predict/predict_batch return exactly the sequential results"""
+        model = build_improved_model(model_replicas=replicas)
+        texts = random_texts(seed=replicas, count=120)
+        expected = model.predict_scores_batch(texts)[0]
+        model.token_cache.clear()
+
+        def work(worker: int):
+            rng = random.Random(worker)
+            checked = 0
+            for _ in range(40):
+                idx = rng.sample(range(len(texts)), rng.randint(1, 6))
+                if len(idx) == 1:
+                    result = model.predict(texts[idx[0]])
+                    assert result["raw_label"] == model.raw_labels[int(expected[idx[0]].argmax())]
+                else:
+                    raw = model.predict_scores_batch([texts[i] for i in idx])[0]
+                    np.testing.assert_allclose(raw, expected[idx], atol=1e-5)
+                checked += len(idx)
+            return checked
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            checked = sum(executor.map(work, range(16)))
+
+        assert checked > 0
+        stats = model.replicas.get_stats()
+        assert stats["in_use"] == 0
+        assert stats["peak_in_use"] <= replicas
+
+    def test_documents_not_truncated_by_concurrent_requests(self, replicas):
+        """
+        Short-text tokenization (truncation=512) running next to document tokenization
+        (no truncation) must not leak truncation state into the document windows
+        """
+        model = build_improved_model(model_replicas=replicas)
+        document = " ".join(["good movie"] * 350)  # 700 tokens, longer than MAX_TOKENS
+        expected = model.predict_document(document)
+        assert expected["num_tokens"] == 700
+
+        stop = threading.Event()
+
+        def short_requests(seed: int):
+            for text in random_texts(seed, 300):
+                if stop.is_set():
+                    break
+                model.predict(text)
+
+        def documents():
+            results = [model.predict_document(document) for _ in range(15)]
+            stop.set()
+            return results
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            noise = [executor.submit(short_requests, seed) for seed in range(6)]
+            results = executor.submit(documents).result()
+            for future in noise:
+                future.result()
+
+        for result in results:
+            assert result["num_tokens"] == 700
+            assert result["num_windows"] == expected["num_windows"]
+            assert result["scores"] == pytest.approx(expected["scores"], abs=1e-4)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
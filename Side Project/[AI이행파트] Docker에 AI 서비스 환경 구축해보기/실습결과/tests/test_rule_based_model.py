@@ -0,0 +1,148 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import random
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.automaton import AhoCorasick
+from models.lexicon import LexiconEngine
+from models.rule_based_model import RuleBasedSentimentModel, get_fallback_model
+
+
+class TestAhoCorasick:
+    """Test the multi-pattern automaton"""
+
+    def test_overlapping_matches(self):
+        """Overlapping and nested keywords are all reported"""
+        automaton = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+        matches = automaton.find_all("ushers")
+
+        assert sorted(matches) == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+
+    def test_matches_agree_with_naive_search(self):
+        """Match positions equal a brute-force scan on random text"""
+        rng = random.Random(0)
+        keywords = ["ab", "abc", "bca", "c", "aaa"]
+        automaton = AhoCorasick([(word, word) for word in keywords])
+
+        for _ in range(50):
+            text = "".join(rng.choice("abc") for _ in range(40))
+            expected = sorted(
+                (i, i + len(word), word)
+                for word in keywords
+                for i in range(len(text)) if text.startswith(word, i)
+            )
+            assert sorted(automaton.find_all(text)) == expected
+
+    def test_empty_keyword_ignored(self):
+        """Empty keywords never match"""
+        automaton = AhoCorasick([("", 0), ("x", 1)])
+        assert automaton.find_all("axb") == [(1, 2, 1)]
+
+
+class TestRuleBasedSentimentModel:
+    """Test the compiled rule-based fallback model"""
+
+    @pytest.mark.parametrize("text,sentiment,confidence", [
+        ("정말 좋아요! 최고의 경험이었어요", "positive", 0.85),
+        ("별로였고 실망스러웠어요", "negative", 0.8),
+        ("안 좋아요", "negative", 0.7),
+        ("그냥 그랬어요", "neutral", 0.7),
+    ])
+    def test_verdict(self, text, sentiment, confidence):
+        """Lexicon score difference maps to sentiment and confidence"""
+        result = RuleBasedSentimentModel().score(text)
+        assert result == {"sentiment": sentiment, "confidence": confidence}
+
+    def test_custom_lexicon(self):
+        """A custom lexicon replaces the built-in one"""
+        model = RuleBasedSentimentModel(LexiconEngine(positive=["대박"], negative=["노잼"]))
+        assert model.score("완전 대박")["sentiment"] == "positive"
+        assert model.score("최고")["sentiment"] == "neutral"
+
+    def test_predict_batch(self):
+        """Batch predictions match single predictions"""
+        model = RuleBasedSentimentModel()
+        texts = ["최고", "최악", "보통"]
+        results = model.predict_batch(texts)
+
+        assert [r["sentiment"] for r in results] == [model.score(t)["sentiment"] for t in texts]
+        assert all(r["degraded"] for r in results)
+
+    def test_predict_marks_degraded(self):
+        """Predictions carry the degraded flag and model name"""
+        result = RuleBasedSentimentModel().predict("I love it")
+
+        assert result["sentiment"] == "positive"
+        assert result["degraded"] is True
+        assert result["model"] == "rule-based"
+        assert "processing_time" in result
+
+    def test_predict_empty_text(self):
+        """Empty text is rejected like the AI model"""
+        with pytest.raises(ValueError):
+            RuleBasedSentimentModel().predict("   ")
+
+    def test_fallback_model_shared(self):
+        """The fallback model is compiled once"""
+        assert get_fallback_model() is get_fallback_model()
+        assert get_fallback_model().health_check()
+
+
+class TestDegradedEndpoints:
+    """Test that prediction endpoints degrade instead of failing"""
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+        return TestClient(app)
+
+    def test_predict_while_model_loading(self, client):
+        """Rule-based answer while the model is still loading"""
+        with patch('main.model_instance', None), patch('api.endpoints._model_instance', None):
+            response = client.post("/predict", json={"text": "정말 최고예요"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sentiment"] == "positive"
+        assert data["degraded"] is True
+
+    def test_batch_predict_while_model_loading(self, client):
+        """Batch endpoint also degrades"""
+        with patch('main.model_instance', None), patch('api.endpoints._model_instance', None):
+            response = client.post("/predict/batch", json={"texts": ["최고", "최악"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["sentiment"] for r in data["results"]] == ["positive", "negative"]
+        assert all(r["degraded"] for r in data["results"])
+
+    def test_fallback_disabled_returns_503(self, client):
+        """Without fallback, a missing model is still an error"""
+        settings = Mock(fallback_enabled=False)
+        with patch('main.model_instance', None), patch('api.endpoints._model_instance', None), \
+                patch('api.endpoints.get_settings', return_value=settings):
+            response = client.post("/predict", json={"text": "정말 최고예요"})
+
+        assert response.status_code == 503
+
+    def test_predict_when_queue_saturated(self, client):
+        """Rule-based answer when the inference queue is over the threshold"""
+        model = Mock()
+        batcher = Mock(running=True, queue_depth=10_000)
+        with patch('api.endpoints._model_instance', model), \
+                patch('main.get_batcher', return_value=batcher):
+            response = client.post("/predict", json={"text": "terrible"})
+
+        assert response.status_code == 200
+        assert response.json()["degraded"] is True
+        model.predict.assert_not_called()
+        batcher.submit.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.admission import AdmissionController
+from models.batcher import AdaptiveBatchController, MicroBatcher
+from models.token_cache import TokenizerCache
+from utils.config import Settings, get_settings
+from utils.runtime_config import ConfigError, RuntimeConfig
+import numpy as np
+import main
+
+
+@pytest.fixture
+def runtime_config():
+    """RuntimeConfig over a private Settings object (the cached settings stay untouched)"""
+    return RuntimeConfig(Settings())
+
+
+class TestRuntimeConfig:
+    """Test validation, atomic apply, rollback and the file watch"""
+
+    def test_apply_updates_settings_and_version(self, runtime_config):
+        entry = runtime_config.apply({"batch_max_wait_ms": "2.5", "log_level": "debug"}, source="test", actor="me")
+
+        assert runtime_config.settings.batch_max_wait_ms == 2.5
+        assert runtime_config.settings.log_level == "DEBUG"
+        assert entry["version"] == runtime_config.version == 1
+        assert entry["changes"]["batch_max_wait_ms"] == [5.0, 2.5]
+        assert list(runtime_config.history) == [entry]
+
+        # Re-applying the same values is a no-op
+        assert runtime_config.apply({"batch_max_wait_ms": 2.5}, source="test")["changes"] == {}
+        assert runtime_config.version == 1
+
+    def test_invalid_change_set_applies_nothing(self, runtime_config):
+        with pytest.raises(ConfigError) as e:
+            runtime_config.apply({
+                "batch_max_size": 16,             # valid, but the set is rejected as a whole
+                "batch_max_wait_ms": "soon",      # wrong type
+                "admission_slo_ms": 0,            # out of range
+                "model_name": "other",            # needs a restart
+                "no_such_setting": 1
+            }, source="test")
+
+        assert set(e.value.errors) == {"batch_max_wait_ms", "admission_slo_ms", "model_name", "no_such_setting"}
+        assert "restart" in e.value.errors["model_name"]
+        assert runtime_config.settings.batch_max_size == 32
+        assert (runtime_config.version, runtime_config.rejected) == (0, 1)
+
+    def test_cross_field_rule(self, runtime_config):
+        with pytest.raises(ConfigError):
+            runtime_config.apply({"batch_min_wait_ms": 100}, source="test")
+
+    def test_listener_failure_rolls_back(self, runtime_config):
+        seen = []
+
+        def listener(settings, changed):
+            seen.append(settings.batch_max_size)
+            if settings.batch_max_size == 7:
+                raise RuntimeError("cannot resize")
+
+        runtime_config.subscribe(listener)
+        with pytest.raises(ConfigError):
+            runtime_config.apply({"batch_max_size": 7}, source="test")
+        assert runtime_config.settings.batch_max_size == 32
+        assert seen == [7, 32]  # components were told about the restored value
+        assert runtime_config.version == 0
+
+    def test_audit_log(self, runtime_config, caplog):
+        with caplog.at_level(logging.INFO, logger="audit.config"):
+            runtime_config.apply({"shadow_fraction": 0.5}, source="api", actor="10.0.0.1")
+        record = next(r for r in caplog.records if r.name == "audit.config")
+        assert record.config_version == 1
+        assert record.actor == "10.0.0.1"
+        assert record.changes == {"shadow_fraction": [0.1, 0.5]}
+
+    def test_file_reload(self, runtime_config, tmp_path):
+        path = tmp_path / "runtime.json"
+        assert runtime_config.load_file(str(path)) is None  # missing file is ignored
+
+        path.write_text(json.dumps({"batch_max_size": 8}))
+        assert runtime_config.load_file(str(path))["changes"] == {"batch_max_size": [32, 8]}
+        assert runtime_config.load_file(str(path)) is None  # unchanged since last load
+
+        path.write_text("{not json")
+        os.utime(path, ns=(1, 1))
+        assert runtime_config.load_file(str(path)) is None
+        path.write_text(json.dumps({"batch_max_size": -1}))
+        os.utime(path, ns=(2, 2))
+        assert runtime_config.load_file(str(path)) is None
+        assert runtime_config.settings.batch_max_size == 8
+        assert runtime_config.rejected == 2
+        assert runtime_config.last_source == f"file:{path}"
+
+
+class TestComponentReconfigure:
+    """Test runtime reconfiguration of components that copy settings at startup"""
+
+    def test_token_cache_resize_evicts(self):
+        cache = TokenizerCache(max_bytes=100000)
+        encoding = (np.zeros(64, dtype=np.int64), np.ones(64, dtype=np.int64))
+        for i in range(10):
+            cache.put("tok", f"text {i}", encoding)
+        cache.resize(3000)
+        assert cache.bytes <= 3000
+        assert cache.get("tok", "text 9") is not None
+        assert cache.get("tok", "text 0") is None
+
+    def test_controller_reconfigure_clamps_decisions(self):
+        controller = AdaptiveBatchController(initial_wait=0.02, initial_batch=32)
+        controller.reconfigure(target_p99=0.1, min_wait=0.0, max_wait_limit=0.005, max_batch_limit=8)
+        assert controller.max_wait == 0.005
+        assert controller.max_batch == 8
+
+    def test_admission_reconfigure_keeps_in_flight(self):
+        controller = AdmissionController({"/predict": 2}, client_rate=0.0)
+        assert controller.try_admit("/predict") is None
+        controller.reconfigure({"/predict": 1, "/predict/new": 3}, max_in_flight=10, slo=0.5,
+                               client_rate=5.0, client_burst=2)
+        assert controller.try_admit("/predict") is not None  # 1 in flight already fills the new limit
+        controller.release("/predict")
+        assert controller.routes["/predict/new"].limit == 3
+        assert controller.slo == 0.5
+
+    def test_main_listener_pushes_into_components(self):
+        batcher = MicroBatcher(Mock(), controller=None)
+        admission = Mock()
+        settings = Settings(batch_max_wait_ms=1.0, batch_max_size=4)
+        with patch('main.batcher_instance', batcher), patch.object(main.app.state, "admission", admission):
+            main._apply_runtime_config(settings, {"batch_max_wait_ms", "batch_max_size", "admission_slo_ms"})
+        assert (batcher.max_wait, batcher.max_batch) == (0.001, 4)
+        assert admission.reconfigure.call_args.kwargs["slo"] == settings.admission_slo_ms / 1000
+
+
+class TestAdminApi:
+    """Test the token-protected admin endpoints"""
+
+    @pytest.fixture
+    def client(self, runtime_config):
+        with patch.object(get_settings(), "admin_token", "secret"), \
+                patch.object(main.app.state, "runtime_config", runtime_config):
+            yield TestClient(main.app)
+
+    def test_token_required(self, client):
+        assert client.get("/admin/config").status_code == 401
+        assert client.get("/admin/config", headers={"X-Admin-Token": "wrong"}).status_code == 401
+        with patch.object(get_settings(), "admin_token", None):
+            assert client.get("/admin/config", headers={"X-Admin-Token": "secret"}).status_code == 403
+
+    def test_change_and_history(self, client, runtime_config):
+        headers = {"X-Admin-Token": "secret"}
+        response = client.patch("/admin/config", json={"batch_max_wait_ms": 1.5}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["version"] == 1
+        assert runtime_config.settings.batch_max_wait_ms == 1.5
+
+        response = client.patch("/admin/config", json={"server_port": 9000}, headers=headers)
+        assert response.status_code == 400
+        assert "server_port" in response.json()["detail"]["errors"]
+
+        config = client.get("/admin/config", headers=headers).json()
+        assert config["values"]["batch_max_wait_ms"] == 1.5
+        assert "batch_max_wait_ms" in config["reloadable"]
+        history = client.get("/admin/config/history", headers=headers).json()
+        assert [entry["version"] for entry in history] == [1]
+        assert client.get("/metrics/config").json()["version"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+class TestPredictBatch:
+    """Test batched prediction"""
+
+    def test_batch_matches_single(self, tiny_improved_model):
+        """Batch results match one-by-one predictions"""
+        texts = ["good movie", "terrible day", "the movie was ok ."]
+        batch = tiny_improved_model.predict_batch(texts)
+
+        assert len(batch) == len(texts)
+        for text, result in zip(texts, batch):
+            single = tiny_improved_model.predict(text)
+            assert result["raw_label"] == single["raw_label"]
+            assert result["confidence"] == pytest.approx(single["confidence"], abs=1e-3)
+
+    def test_batch_rejects_empty_text(self, tiny_improved_model):
+        """Empty texts are rejected"""
+        with pytest.raises(ValueError):
+            tiny_improved_model.predict_batch(["good", "  "])
+
+class TestPredictScoresBatch:
+    """Test the batched score matrix API"""
+
+    def test_matrix_shapes(self, tiny_improved_model, monkeypatch):
+        """Raw (N, num_labels) and grouped (N, 3) float32 matrices"""
+        monkeypatch.setattr(tiny_improved_model.settings, "inference_batch_size", 2)
+        raw, grouped = tiny_improved_model.predict_scores_batch(["good", "bad movie", "ok", "great day"])
+
+        assert raw.shape == (4, 5) and raw.dtype == np.float32
+        assert grouped.shape == (4, 3) and grouped.dtype == np.float32
+        np.testing.assert_allclose(raw.sum(axis=1), 1.0, atol=1e-5)
+        np.testing.assert_allclose(grouped.sum(axis=1), 1.0, atol=1e-5)
+
+    def test_projection_groups_star_labels(self, tiny_improved_model):
+        """1-2 stars -> negative, 3 -> neutral, 4-5 -> positive"""
+        raw, grouped = tiny_improved_model.predict_scores_batch(["good movie"])
+
+        np.testing.assert_allclose(grouped[0, 0], raw[0, :2].sum(), atol=1e-6)
+        np.testing.assert_allclose(grouped[0, 1], raw[0, 2], atol=1e-6)
+        np.testing.assert_allclose(grouped[0, 2], raw[0, 3:].sum(), atol=1e-6)
+
+    def test_matches_predict_with_scores(self, tiny_improved_model):
+        """Batched rows equal single-text detailed predictions"""
+        texts = ["good movie", "terrible day"]
+        results = tiny_improved_model.scores_to_dicts(*tiny_improved_model.predict_scores_batch(texts))
+        for text, result in zip(texts, results):
+            single = tiny_improved_model.predict_with_scores(text)
+            assert result["sentiment"] == single["sentiment"]
+            assert result["scores"] == pytest.approx(single["scores"], abs=1e-3)
+            assert list(result["raw_scores"]) == list(single["raw_scores"])
+
+class TestPredictDocument:
+    """Test sliding-window long document prediction"""
+
+    def test_short_document_single_window(self, tiny_improved_model):
+        """A short document fits into one window"""
+        result = tiny_improved_model.predict_document("good movie", include_windows=True)
+
+        assert result["num_windows"] == 1
+        assert result["num_tokens"] == 2
+        assert result["sentiment"] in ("positive", "negative", "neutral")
+        assert sum(result["scores"].values()) == pytest.approx(1.0, abs=1e-3)
+        assert result["windows"][0]["start"] == 0
+        assert result["windows"][0]["end"] == len("good movie")
+
+    def test_long_document_overlapping_windows(self, tiny_improved_model, monkeypatch):
+        """Long documents are split into overlapping windows covering all tokens"""
+        monkeypatch.setattr(tiny_improved_model.settings, "document_window_tokens", 10)
+        monkeypatch.setattr(tiny_improved_model.settings, "document_window_stride", 3)
+
+        text = " ".join(["good movie", "bad day", "the movie was really great"] * 10)
+        num_tokens = len(text.split())
+        result = tiny_improved_model.predict_document(text, include_windows=True)
+
+        windows = result["windows"]
+        assert result["num_tokens"] == num_tokens
+        # 8 tokens per window (10 minus [CLS]/[SEP]), advancing by 8 - 3 = 5 over 90 tokens
+        assert result["num_windows"] == len(windows) == 18
+        assert all(w["num_tokens"] <= 8 for w in windows)
+        assert windows[-1]["end"] == len(text)
+        for previous, current in zip(windows, windows[1:]):
+            assert current["start"] < previous["end"]
+
+    def test_pooling_methods(self, tiny_improved_model, monkeypatch):
+        """Mean pooling averages windows and max pooling stays normalised"""
+        monkeypatch.setattr(tiny_improved_model.settings, "document_window_tokens", 10)
+        monkeypatch.setattr(tiny_improved_model.settings, "document_window_stride", 2)
+        text = " ".join(["terrible day", "good movie", "great"] * 8)
+
+        mean = tiny_improved_model.predict_document(text, pooling="mean", include_windows=True)
+        expected = sum(w["scores"]["positive"] for w in mean["windows"]) / mean["num_windows"]
+        assert mean["scores"]["positive"] == pytest.approx(expected, abs=1e-3)
+
+        for pooling in ("max", "length_weighted"):
+            result = tiny_improved_model.predict_document(text, pooling=pooling)
+            assert result["pooling"] == pooling
+            assert sum(result["scores"].values()) == pytest.approx(1.0, abs=1e-3)
+            assert "windows" not in result
+
+    def test_invalid_pooling(self, tiny_improved_model):
+        """Unknown pooling methods are rejected"""
+        with pytest.raises(ValueError):
+            tiny_improved_model.predict_document("good movie", pooling="median")
+
+    def test_document_too_long(self, tiny_improved_model, monkeypatch):
+        """Documents beyond max_document_length are rejected"""
+        monkeypatch.setattr(tiny_improved_model.settings, "max_document_length", 20)
+        with pytest.raises(ValueError):
+            tiny_improved_model.predict_document("good movie " * 10)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
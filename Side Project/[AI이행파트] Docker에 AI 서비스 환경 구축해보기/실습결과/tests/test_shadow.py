@@ -0,0 +1,191 @@
+import itertools
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.endpoints import shadowed
+from api.shadow import ShadowEvaluator, create_shadow_evaluator
+from models.replica_pool import ReplicaPool
+from main import app
+
+
+def result(sentiment, confidence=0.8, processing_time=0.01, **extra):
+    return {"sentiment": sentiment, "confidence": confidence, "processing_time": processing_time, **extra}
+
+
+def candidate_model(label_for=lambda text: "positive", confidence=0.6):
+    model = Mock()
+    model.predict_batch.side_effect = lambda texts: [result(label_for(text), confidence) for text in texts]
+    return model
+
+
+class TestShadowEvaluator:
+    """Test sampling, comparison and the bounded queue"""
+
+    def test_agreement_and_flip_matrix(self):
+        candidate = candidate_model(lambda text: "negative" if "bad" in text else "positive")
+        evaluator = ShadowEvaluator(candidate, fraction=1.0)
+        evaluator.offer(
+            ["good", "bad", "so bad", "okay"],
+            [result("positive", 0.9), result("negative", 0.7), result("neutral", 0.6), result("neutral", 0.5)],
+            batch_seconds=0.04
+        )
+        assert evaluator.drain()
+        stats = evaluator.get_stats()
+        evaluator.close()
+
+        assert stats["compared"] == 4
+        assert stats["agreement_rate"] == 0.5
+        assert stats["flip_matrix"] == {
+            "positive": {"positive": 1},
+            "negative": {"negative": 1},
+            "neutral": {"negative": 1, "positive": 1}
+        }
+        assert stats["mean_abs_confidence_delta"] == pytest.approx((0.3 + 0.1 + 0.0 + 0.1) / 4, abs=1e-4)
+        # Served batch time / served batch size, not the rounded processing_time
+        assert stats["latency"]["primary"]["mean_ms"] == pytest.approx(10.0)
+        assert stats["latency"]["mean_delta_ms"] is not None
+        assert stats["latency"]["batch_size"] == {"primary": 4, "candidate": 4}
+
+    def test_no_primary_latency_without_batch_time(self):
+        evaluator = ShadowEvaluator(candidate_model(), fraction=1.0)
+        evaluator.offer(["a"], [result("positive")])
+        assert evaluator.drain()
+        latency = evaluator.get_stats()["latency"]
+        evaluator.close()
+        assert latency["primary"]["mean_ms"] is None and latency["mean_delta_ms"] is None
+        assert latency["candidate"]["mean_ms"] is not None
+
+    def test_busy_shadow_never_delays_production(self):
+        """The shadow worker only runs the candidate, so it never holds a production replica"""
+        replicas = ReplicaPool(None, None, size=1, timeout=1.0)
+        primary = Mock()
+
+        def predict_batch(texts):
+            with replicas.acquire():
+                return [result("positive") for _ in texts]
+
+        primary.predict_batch.side_effect = predict_batch
+        busy, release = threading.Event(), threading.Event()
+
+        def slow_candidate(texts):
+            busy.set()
+            release.wait(5)
+            return [result("positive")] * len(texts)
+
+        candidate = Mock()
+        candidate.predict_batch.side_effect = slow_candidate
+        evaluator = ShadowEvaluator(candidate, fraction=1.0)
+        serve = shadowed(primary.predict_batch)
+
+        with patch('main.get_shadow_evaluator', return_value=evaluator):
+            serve(["a", "b"])
+            assert busy.wait(5)
+            started = time.perf_counter()
+            served = []
+            caller = threading.Thread(target=lambda: served.append(serve(["c"])))
+            caller.start()
+            caller.join(5)
+            elapsed = time.perf_counter() - started
+            release.set()
+            assert evaluator.drain()
+        evaluator.close()
+
+        assert served and elapsed < 0.5
+        assert primary.predict_batch.call_count == 2
+        assert replicas.waits == 0
+
+    def test_sampling_fraction(self):
+        values = itertools.cycle([0.05, 0.5, 0.95, 0.15])
+        evaluator = ShadowEvaluator(candidate_model(), fraction=0.2, rng=lambda: next(values))
+        evaluator.offer([f"t{i}" for i in range(8)], [result("positive")] * 8)
+        assert evaluator.drain()
+        assert (evaluator.offered, evaluator.sampled, evaluator.compared) == (8, 4, 4)
+        evaluator.close()
+
+    def test_degraded_and_failed_results_are_skipped(self):
+        evaluator = ShadowEvaluator(candidate_model(), fraction=1.0)
+        evaluator.offer(["a", "b"], [result("unknown", 0.0), result("neutral", degraded=True)])
+        assert evaluator.sampled == 0
+        evaluator.close()
+
+    def test_slow_candidate_never_blocks_offer(self):
+        """A stalled candidate fills the bounded queue; further samples are dropped immediately"""
+        release = threading.Event()
+        candidate = Mock()
+        candidate.predict_batch.side_effect = lambda texts: release.wait() and [result("positive")] * len(texts)
+        evaluator = ShadowEvaluator(candidate, fraction=1.0, queue_size=10, batch_size=4)
+
+        started = time.perf_counter()
+        for i in range(100):
+            evaluator.offer([f"t{i}"], [result("positive")])
+        assert time.perf_counter() - started < 0.1
+        assert evaluator.dropped >= 80
+
+        release.set()
+        assert evaluator.drain()
+        assert evaluator.compared == evaluator.sampled
+        evaluator.close()
+
+    def test_candidate_errors_are_counted(self):
+        candidate = Mock()
+        candidate.predict_batch.side_effect = RuntimeError("boom")
+        evaluator = ShadowEvaluator(candidate, fraction=1.0)
+        evaluator.offer(["a", "b"], [result("positive")] * 2)
+        assert evaluator.drain()
+        assert evaluator.errors == 2
+        assert evaluator.get_stats()["agreement_rate"] is None
+        evaluator.close()
+
+    def test_disabled_without_candidate(self):
+        settings = Mock(shadow_model=None, shadow_fraction=0.1)
+        assert create_shadow_evaluator(settings) is None
+        with pytest.raises(ValueError):
+            ShadowEvaluator(candidate_model(), fraction=1.5)
+
+
+class TestShadowEndpoints:
+    """Test that prediction routes feed the evaluator and /shadow/stats"""
+
+    @pytest.fixture
+    def model(self):
+        model = Mock()
+        model.predict.return_value = result("positive", 0.9)
+        model.predict_batch.side_effect = lambda texts: [result("negative", 0.7) for _ in texts]
+        return model
+
+    def test_fresh_predictions_are_shadowed(self, model):
+        evaluator = ShadowEvaluator(candidate_model(), fraction=1.0)
+        with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+                patch('main.get_batcher', return_value=None), \
+                patch('main.get_shadow_evaluator', return_value=evaluator):
+            client = TestClient(app)
+            client.post("/predict", json={"text": "great"})
+            client.post("/predict/batch", json={"texts": ["bad", "bad", "worse"]})
+            assert evaluator.drain()
+
+            stats = client.get("/shadow/stats").json()
+        evaluator.close()
+
+        assert stats["enabled"] is True
+        # Duplicates within the batch are inferred once and shadowed once
+        assert stats["compared"] == 3
+        assert stats["flip_matrix"] == {"positive": {"positive": 1}, "negative": {"positive": 2}}
+        # Timed where the model ran: one batch of 1 (/predict) and one of 2 (/predict/batch)
+        assert stats["latency"]["primary"]["mean_ms"] is not None
+        assert stats["latency"]["batch_size"]["primary"] == pytest.approx(5 / 3, abs=0.01)
+
+    def test_stats_disabled(self):
+        with patch('main.get_shadow_evaluator', return_value=None):
+            assert TestClient(app).get("/shadow/stats").json() == {"enabled": False}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,45 @@
+import subprocess
+import pytest
+import sys
+import os
+
+# Add src to path
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from models.registry import MODEL_CLASSES, get_model_class
+
+
+class TestLazyImports:
+    """Test that app startup does not pay for torch/transformers"""
+
+    def test_app_import_skips_heavy_modules(self):
+        """Importing main leaves torch and transformers unloaded"""
+        code = (
+            "import sys, main; "
+            "print(','.join(m for m in ('torch', 'transformers', 'numpy') if m in sys.modules))"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, timeout=120
+        )
+
+        assert completed.returncode == 0, completed.stderr
+        assert completed.stdout.strip() == ""
+
+
+class TestModelRegistry:
+    """Test the lazy model registry"""
+
+    def test_registered_paths_resolve(self):
+        """Every registry entry points at an importable class"""
+        for name in MODEL_CLASSES:
+            assert isinstance(get_model_class(name), type)
+
+    def test_unknown_model(self):
+        """Unknown names are rejected"""
+        with pytest.raises(ValueError):
+            get_model_class("does-not-exist")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
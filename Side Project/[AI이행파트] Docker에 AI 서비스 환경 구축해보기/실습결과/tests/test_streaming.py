@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.streaming import _StreamConnection
+from main import app
+
+
+def fake_predict_batch(texts):
+    return [
+        {"sentiment": "positive" if "good" in text else "negative", "confidence": 0.9, "processing_time": 0.0}
+        for text in texts
+    ]
+
+
+def receive_results(ws, count):
+    """Collect `count` results keyed by id"""
+    results = {}
+    while len(results) < count:
+        for result in ws.receive_json()["results"]:
+            results[result["id"]] = result
+    return results
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def model():
+    model = Mock()
+    model.predict_batch.side_effect = fake_predict_batch
+    with patch('main.model_instance', model), patch('api.endpoints._model_instance', model), \
+            patch('main.get_batcher', return_value=None):
+        yield model
+
+
+class TestWebSocketStreaming:
+    """Test the /ws/predict streaming endpoint"""
+
+    def test_results_tagged_with_ids(self, client, model):
+        """Single and multi-message frames are answered with the client ids"""
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json({"id": "a", "text": "good movie"})
+            ws.send_json([{"id": "b", "text": "bad day"}, {"id": 7, "text": "really good"}])
+            results = receive_results(ws, 3)
+
+        assert results["a"]["sentiment"] == "positive"
+        assert results["b"]["sentiment"] == "negative"
+        assert results[7]["sentiment"] == "positive"
+        assert results["a"]["degraded"] is False
+
+    def test_invalid_messages(self, client, model):
+        """Bad frames produce error results without closing the connection"""
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_text("not json")
+            assert ws.receive_json()["results"][0]["error"] == "Invalid JSON"
+
+            ws.send_json({"id": "empty", "text": "   "})
+            assert ws.receive_json()["results"] == [{"id": "empty", "error": "Text must not be empty"}]
+
+            ws.send_json({"id": "ok", "text": "good"})
+            assert ws.receive_json()["results"][0]["sentiment"] == "positive"
+
+    def test_missing_ids_are_assigned(self, client, model):
+        """Messages without ids get per-connection sequence numbers"""
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json([{"text": "good"}, {"text": "bad"}])
+            results = receive_results(ws, 2)
+
+        assert set(results) == {0, 1}
+
+    def test_many_messages_on_one_connection(self, client, model):
+        """Thousands of messages stream over one socket and are batched"""
+        total, frame = 5000, 250
+        with client.websocket_connect("/ws/predict") as ws:
+            for start in range(0, total, frame):
+                ws.send_json([{"id": i, "text": f"good comment {i}"} for i in range(start, start + frame)])
+            results = receive_results(ws, total)
+
+        assert set(results) == set(range(total))
+        # Messages are grouped into model batches rather than predicted one by one
+        assert model.predict_batch.call_count <= total // frame * 2
+
+    def test_flow_control(self, client, model):
+        """The server stops reading once max_in_flight messages are unanswered"""
+        release = threading.Event()
+        seen = []
+
+        def slow_predict_batch(texts):
+            seen.extend(texts)
+            release.wait(5)
+            return fake_predict_batch(texts)
+
+        model.predict_batch.side_effect = slow_predict_batch
+        with client.websocket_connect("/ws/predict?max_in_flight=4") as ws:
+            for i in range(10):
+                ws.send_json({"id": i, "text": f"good {i}"})
+            time.sleep(0.5)
+            in_flight_before_release = len(seen)
+            release.set()
+            results = receive_results(ws, 10)
+
+        assert in_flight_before_release == 4
+        assert set(results) == set(range(10))
+
+    def test_error_replies_hold_slots(self):
+        """Error replies count against max_in_flight, so a client that never reads cannot grow the outbox"""
+        frames = iter(["not json"] * 10)
+        blocked = asyncio.Event()
+
+        async def receive_text():
+            try:
+                return next(frames)
+            except StopIteration:
+                await blocked.wait()
+
+        async def send_text(_):
+            await blocked.wait()
+
+        websocket = SimpleNamespace(
+            receive_text=receive_text, send_text=send_text, client=None,
+            app=SimpleNamespace(state=SimpleNamespace())
+        )
+        connection = _StreamConnection(websocket, max_in_flight=3, max_frame_items=10)
+
+        async def run():
+            task = asyncio.create_task(connection.run())
+            await asyncio.sleep(0.1)
+            task.cancel()
+
+        asyncio.run(run())
+        # Three replies are held by the blocked send; the reader waits for a slot for the fourth frame
+        assert len(list(frames)) == 6
+
+    def test_text_length_limit(self, client, model):
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json([{"id": "long", "text": "good " * 200}, {"id": "ok", "text": "good"}])
+            results = receive_results(ws, 2)
+
+        assert results["long"] == {"id": "long", "error": "Text must be at most 512 characters"}
+        assert results["ok"]["sentiment"] == "positive"
+        assert model.predict_batch.call_args[0][0] == ["good"]
+
+    def test_frames_go_through_admission(self, client, model):
+        admission = app.state.admission
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json({"id": 1, "text": "good"})
+            receive_results(ws, 1)
+            assert admission.routes["/ws/predict"].in_flight == 0
+            assert admission.routes["/ws/predict"].admitted >= 1
+
+            with patch.object(admission, "try_admit", return_value=(503, "route_limit", 2.0)):
+                ws.send_json([{"id": 2, "text": "good"}, {"id": 3, "text": "bad"}])
+                results = receive_results(ws, 2)
+
+        assert results[2] == {
+            "id": 2, "error": "Service overloaded, retry later", "reason": "route_limit", "retry_after": 2
+        }
+        assert results[3]["error"] == "Service overloaded, retry later"
+        assert model.predict_batch.call_count == 1
+
+    def test_degrades_while_model_loading(self, client):
+        """Rule-based results (degraded) before the model is loaded"""
+        with patch('main.model_instance', None), patch('api.endpoints._model_instance', None):
+            with client.websocket_connect("/ws/predict") as ws:
+                ws.send_json({"id": 1, "text": "정말 최고예요"})
+                result = ws.receive_json()["results"][0]
+
+        assert result["sentiment"] == "positive"
+        assert result["degraded"] is True
+
+    def test_error_when_model_unavailable(self, client):
+        """Without fallback, messages get an error result instead of a closed socket"""
+        settings = Mock(fallback_enabled=False)
+        with patch('main.model_instance', None), patch('api.endpoints._model_instance', None), \
+                patch('api.endpoints.get_settings', return_value=settings):
+            with client.websocket_connect("/ws/predict") as ws:
+                ws.send_json({"id": 1, "text": "good"})
+                result = ws.receive_json()["results"][0]
+
+        assert result == {"id": 1, "error": "Model not loaded"}
+
+    def test_streaming_metrics(self, client, model):
+        with client.websocket_connect("/ws/predict") as ws:
+            ws.send_json({"id": 1, "text": "good"})
+            ws.receive_json()
+            metrics = client.get("/metrics/streaming").json()
+
+        assert metrics["active_connections"] >= 1
+        assert metrics["messages"] >= 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
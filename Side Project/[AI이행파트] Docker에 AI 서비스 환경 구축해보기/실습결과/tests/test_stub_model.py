@@ -0,0 +1,75 @@
+import asyncio
+import time
+import pytest
+from pydantic import ValidationError
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.registry import create_model
+from models.stub_model import StubSentimentModel
+from utils.config import Settings
+
+
+class TestStubSentimentModel:
+    """Test the deterministic stub model used for load tests"""
+
+    def test_results_depend_only_on_text_and_seed(self):
+        texts = [f"review number {i}" for i in range(200)]
+        first = StubSentimentModel().predict_batch(texts)
+        assert StubSentimentModel().predict_batch(list(reversed(texts))) == list(reversed(first))
+        assert StubSentimentModel(seed=1).predict_batch(texts) != first
+        # All labels occur so downstream aggregation is exercised
+        assert {r["sentiment"] for r in first} == {"negative", "neutral", "positive"}
+
+    def test_latency_model(self):
+        """Per-batch cost plus per-token cost over the padded batch"""
+        model = StubSentimentModel(latency_per_token_ms=0.5, latency_per_batch_ms=10)
+        # 2 texts padded to the longest: 2 x (3 words + 2 special tokens)
+        assert model.batch_latency(["a", "a b c"]) == pytest.approx((10 + 0.5 * 2 * 5) / 1000)
+        assert model.batch_latency([]) == 0.0
+
+    def test_batching_amortizes_latency(self):
+        model = StubSentimentModel(latency_per_batch_ms=20)
+        texts = [f"text {i}" for i in range(8)]
+
+        started = time.perf_counter()
+        model.predict_batch(texts)
+        batched = time.perf_counter() - started
+        started = time.perf_counter()
+        for text in texts:
+            model.predict(text)
+        sequential = time.perf_counter() - started
+
+        assert batched < 0.1 < sequential
+        assert model.get_model_info()["calls"] == 9
+
+    def test_defaults_from_settings(self):
+        with patch('models.stub_model.get_settings') as mock_settings:
+            mock_settings.return_value.stub_latency_per_token_ms = 0.1
+            mock_settings.return_value.stub_latency_per_batch_ms = 5.0
+            model = StubSentimentModel()
+        assert (model.latency_per_token_ms, model.latency_per_batch_ms) == (0.1, 5.0)
+
+    def test_server_backend(self):
+        """INFERENCE_BACKEND=stub serves the stub through the normal loading path"""
+        import main
+
+        assert isinstance(create_model("stub"), StubSentimentModel)
+        with patch.object(main.settings, "inference_backend", "stub"), \
+                patch.object(main.settings, "batching_enabled", False), \
+                patch('main.model_instance', None):
+            asyncio.run(main.load_model())
+            assert isinstance(main.model_instance, StubSentimentModel)
+
+    def test_unknown_backend_rejected(self):
+        """A typo in INFERENCE_BACKEND fails at startup instead of silently loading the default model"""
+        with pytest.raises(ValidationError):
+            Settings(inference_backend="proces")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
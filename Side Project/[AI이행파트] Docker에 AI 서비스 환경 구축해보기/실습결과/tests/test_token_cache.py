@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.token_cache import TokenizerCache
+
+
+def fake_encoding(length: int):
+    return np.arange(length, dtype=np.int32), np.ones(length, dtype=np.int8)
+
+
+class TestTokenizerCache:
+    """Test the memory-bounded LRU tokenizer cache"""
+
+    def test_hit_and_miss(self):
+        """Stored encodings are returned; unknown texts miss"""
+        cache = TokenizerCache(max_bytes=10_000)
+        cache.put("tok", "hello", fake_encoding(3))
+
+        assert cache.get("tok", "hello")[0].tolist() == [0, 1, 2]
+        assert cache.get("tok", "other") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_tokenizer_identity_in_key(self):
+        """A different tokenizer does not reuse another tokenizer's output"""
+        cache = TokenizerCache(max_bytes=10_000)
+        cache.put("tok-a", "hello", fake_encoding(3))
+
+        assert cache.get("tok-b", "hello") is None
+
+    def test_memory_bounded_lru_eviction(self):
+        """Least recently used entries are evicted to stay under max_bytes"""
+        cache = TokenizerCache(max_bytes=1_000)
+        for i in range(10):
+            cache.put("tok", f"text {i}", fake_encoding(20))
+            cache.get("tok", "text 0")  # keep the first entry hot
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 1_000
+        assert stats["evictions"] > 0
+        assert cache.get("tok", "text 0") is not None
+        assert cache.get("tok", "text 1") is None
+
+    def test_oversized_entry_not_cached(self):
+        """An entry larger than the whole budget is skipped"""
+        cache = TokenizerCache(max_bytes=100)
+        cache.put("tok", "long", fake_encoding(1000))
+
+        assert len(cache) == 0
+
+    def test_encode_tokenizes_only_misses(self):
+        """encode() calls the tokenizer once for uncached, de-duplicated texts"""
+        cache = TokenizerCache(max_bytes=10_000)
+        cache.put("tok", "cached", fake_encoding(2))
+        calls = []
+
+        def tokenize(texts):
+            calls.append(list(texts))
+            return [fake_encoding(len(text)) for text in texts]
+
+        encodings = cache.encode("tok", ["cached", "new", "new", "other"], tokenize)
+
+        assert calls == [["new", "other"]]
+        assert [len(ids) for ids, _ in encodings] == [2, 3, 3, 5]
+
+
+class TestModelTokenCache:
+    """Test that model inference paths share the cache"""
+
+    @pytest.fixture
+    def model(self, tiny_improved_model, monkeypatch):
+        monkeypatch.setattr(tiny_improved_model, "token_cache", TokenizerCache(max_bytes=1_000_000))
+        return tiny_improved_model
+
+    def test_paths_share_cache(self, model):
+        """predict, predict_batch and predict_with_scores reuse one tokenization"""
+        first = model.predict("good movie")
+        model.predict_with_scores("good movie")
+        batch = model.predict_batch(["good movie", "bad day"])
+
+        stats = model.token_cache.get_stats()
+        assert stats["misses"] == 2
+        assert stats["hits"] == 2
+        assert batch[0]["raw_label"] == first["raw_label"]
+
+    def test_cached_inference_matches_tokenizer(self, model):
+        """Padded cached encodings give the same probabilities as direct tokenization"""
+        texts = ["good", "the movie was terrible ."]
+        cached = model._predict_proba(texts)
+        model._predict_proba(texts)  # second call is served from the cache
+
+        inputs = model.tokenizer(texts, return_tensors="pt", padding=True)
+        direct = model.model(**inputs).logits.softmax(dim=-1).detach().numpy()
+        np.testing.assert_allclose(model._predict_proba(texts), direct, atol=1e-5)
+        np.testing.assert_allclose(cached, direct, atol=1e-5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
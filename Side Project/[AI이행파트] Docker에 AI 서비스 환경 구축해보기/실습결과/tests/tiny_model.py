@@ -0,0 +1,55 @@
+"""Test helpers: a tiny randomly initialised BERT that runs offline"""
+import sys
+import os
+from contextlib import ExitStack
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import torch
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+from utils.config import get_settings
+
+# Tiny word-level vocabulary so a real (randomly initialised) BERT can run offline
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+         "good", "bad", "great", "terrible", "day", "movie", "the", "was", "really", "ok", "."]
+
+STAR_LABELS = {0: '1 star', 1: '2 stars', 2: '3 stars', 3: '4 stars', 4: '5 stars'}
+
+def build_tiny_tokenizer():
+    return BertTokenizerFast(vocab={token: i for i, token in enumerate(VOCAB)})
+
+def build_tiny_model():
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=16,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=512,
+        num_labels=5,
+        id2label=STAR_LABELS,
+        label2id={v: k for k, v in STAR_LABELS.items()}
+    )
+    return BertForSequenceClassification(config).eval()
+
+def build_improved_model(**settings):
+    """
+    SentimentModelImproved backed by the tiny BERT instead of the Hub model
+
+    Keyword arguments override settings while the model loads
+    (e.g. model_replicas=4, calibration_path=..., emotion_head_path=...).
+    """
+    from models.sentiment_model_improved import SentimentModelImproved
+
+    with ExitStack() as stack:
+        for name, value in settings.items():
+            stack.enter_context(patch.object(get_settings(), name, value))
+        mock_tokenizer = stack.enter_context(patch('models.sentiment_model_improved.AutoTokenizer'))
+        mock_model = stack.enter_context(patch('models.sentiment_model_improved.AutoModelForSequenceClassification'))
+        mock_tokenizer.from_pretrained.return_value = build_tiny_tokenizer()
+        mock_model.from_pretrained.return_value = build_tiny_model()
+        return SentimentModelImproved()